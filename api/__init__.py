@@ -1,22 +1,46 @@
 from flask import Flask
-from flask_restx import Api
 from dotenv import load_dotenv
 from .auth.views import auth_namespace
 from .admin.views import admin_namespace
 from .courses.views import course_namespace
 from .students.views import student_namespace
+from .audit.views import audit_namespace
+from .jobs.views import job_namespace
+from .archive.views import archive_namespace
+from .terms.views import term_namespace
+from .analytics.views import analytics_namespace
 from .config.config import config_dict
 from .utils import db
+from .utils.analytics import analytics
+from .utils.audit import audit_log
 from .utils.blacklist import BLACKLIST
+from .utils.decorators import load_user
+from .utils.compression import compression
+from .utils.jobs import job_runner
+from .utils.metrics import metrics
+from .utils.notifications import notifications
+from .utils.ratelimit import rate_limits
+from .utils.routing import replica_router
+from .utils.tenants import tenants, tenant_claims, token_matches_tenant
+from .utils.seed import seed_command
+from .utils.snapshot import snapshot_cli
+from .utils.swagger import CachedSpecApi
 from .models.users import User
 from .models.admin import Admin
 from .models.grades import Grade
 from .models.courses import Course
 from .models.students import Student
 from .models.student_course import StudentCourse
+from .models.grade_audit import GradeAudit
+from .models.jobs import Job
+from .models.archive import ArchivedStudent, ArchivedEnrollment, ArchivedGrade, ArchivedTermGPA
+from .models.terms import Term, TermGPA
+from .models.idempotency import IdempotencyKey
+from .models.notifications import GradeNotification
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from werkzeug.exceptions import NotFound, MethodNotAllowed
+from werkzeug.middleware.proxy_fix import ProxyFix
 from http import HTTPStatus
 
 def create_app(config=config_dict['dev']):
@@ -26,12 +50,66 @@ def create_app(config=config_dict['dev']):
 
     app.config.from_object(config)
 
+    # Behind proxies every request comes from the proxy's address, which
+    # would put all clients in one login throttling bucket
+    proxies = app.config['TRUSTED_PROXIES']
+    if proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies)
+
     db.init_app(app)
 
+    replica_router.init_app(app)
+
+    tenants.init_app(app)
+
+    metrics.init_app(app)
+
     migrate = Migrate(app, db)
 
+    audit_log.init_app(app)
+
+    job_runner.init_app(app)
+
+    rate_limits.init_app(app)
+
+    compression.init_app(app)
+
+    analytics.init_app(app)
+
+    notifications.init_app(app)
+
+    app.cli.add_command(snapshot_cli)
+
+    app.cli.add_command(seed_command)
+
     jwt = JWTManager(app)
 
+    @jwt.user_lookup_loader
+    def user_lookup_callback(jwt_header, jwt_payload):
+        return load_user(jwt_payload['sub'])
+
+    @jwt.user_lookup_error_loader
+    def user_lookup_error_callback(jwt_header, jwt_payload):
+        return {
+            "message": "The user for this token no longer exists",
+            "error": "user_not_found"
+        }, HTTPStatus.UNAUTHORIZED
+
+    @jwt.additional_claims_loader
+    def add_tenant_claim(identity):
+        return tenant_claims()
+
+    @jwt.token_verification_loader
+    def verify_tenant_claim(jwt_header, jwt_payload):
+        return token_matches_tenant(jwt_payload)
+
+    @jwt.token_verification_failed_loader
+    def wrong_tenant_callback(jwt_header, jwt_payload):
+        return {
+            "message": "The token was issued by another school",
+            "error": "wrong_tenant"
+        }, HTTPStatus.UNAUTHORIZED
+
     @jwt.token_in_blocklist_loader
     def check_if_token_in_blacklist(jwt_header, jwt_payload):
         return jwt_payload['jti'] in BLACKLIST
@@ -80,18 +158,25 @@ def create_app(config=config_dict['dev']):
         }
     }
 
-    api = Api(
+    api = CachedSpecApi(
         app,
         title='Student Management API',
         description='A student management REST API service',
         authorizations=authorizations,
-        security='Bearer Auth'
+        security='Bearer Auth',
+        doc='/' if app.config['API_DOCS'] else False,
+        add_specs=app.config['API_DOCS']
         )
 
     api.add_namespace(auth_namespace, path='/auth')
     api.add_namespace(admin_namespace, path='/admin')
     api.add_namespace(course_namespace, path='/courses')
     api.add_namespace(student_namespace, path='/students')
+    api.add_namespace(audit_namespace, path='/audit')
+    api.add_namespace(job_namespace, path='/jobs')
+    api.add_namespace(archive_namespace, path='/archive')
+    api.add_namespace(term_namespace, path='/terms')
+    api.add_namespace(analytics_namespace, path='/analytics')
 
     @api.errorhandler(NotFound)
     def not_found(error):
@@ -110,7 +195,17 @@ def create_app(config=config_dict['dev']):
             'Grade': Grade,
             'Course': Course,
             'Student': Student,
-            'StudentCourse': StudentCourse
+            'StudentCourse': StudentCourse,
+            'GradeAudit': GradeAudit,
+            'Job': Job,
+            'ArchivedStudent': ArchivedStudent,
+            'ArchivedEnrollment': ArchivedEnrollment,
+            'ArchivedGrade': ArchivedGrade,
+            'ArchivedTermGPA': ArchivedTermGPA,
+            'Term': Term,
+            'TermGPA': TermGPA,
+            'IdempotencyKey': IdempotencyKey,
+            'GradeNotification': GradeNotification
         }
 
     return app
\ No newline at end of file
@@ -1,6 +1,8 @@
 from flask_restx import Namespace, Resource, fields
 from ..models.admin import Admin
 from ..utils.decorators import admin_required
+from ..utils.filters import apply_filters, filter_params
+from ..utils.sparse import fields_param, requested_fields, sparse_query, marshal_fields, sparse_select, row_dicts
 from werkzeug.security import generate_password_hash
 from http import HTTPStatus
 from flask_jwt_extended import get_jwt_identity
@@ -26,19 +28,42 @@ admin_model = admin_namespace.model(
     }
 )
 
+# Columns backing admin_model, for reading lists without ORM instances
+admin_columns = {
+    'id': Admin.id,
+    'first_name': Admin.first_name,
+    'last_name': Admin.last_name,
+    'email': Admin.email,
+    'user_type': Admin.user_type
+}
+
+admin_filters = {
+    'first_name': (Admin.first_name, 'eq'),
+    'last_name': (Admin.last_name, 'eq'),
+    'email': (Admin.email, 'eq')
+}
+
+admin_sorts = {
+    'id': Admin.id,
+    'first_name': Admin.first_name,
+    'last_name': Admin.last_name
+}
+
 @admin_namespace.route('')
 class GetAllAdmins(Resource):
 
-    @admin_namespace.marshal_with(admin_model)
+    @admin_namespace.response(HTTPStatus.OK, 'Success', [admin_model])
     @admin_namespace.doc(
-        description="Retrieve All Admins - Admins Only"
+        description="Retrieve All Admins - Admins Only",
+        params = {**filter_params(admin_filters, admin_sorts), **fields_param(admin_model)}
     )
     @admin_required()
     def get(self):
         """
             Retrieve All Admins - Admins Only
         """
-        admins = Admin.query.all()
+        names = requested_fields(admin_model)
+        admins = row_dicts(apply_filters(sparse_select(admin_columns, names), admin_filters, admin_sorts))
 
         return admins, HTTPStatus.OK
 
@@ -86,11 +111,12 @@ class AdminRegistration(Resource):
 @admin_namespace.route('/<int:admin_id>')
 class GetUpdateDeleteAdmins(Resource):
     
-    @admin_namespace.marshal_with(admin_model)
+    @admin_namespace.response(HTTPStatus.OK, 'Success', admin_model)
     @admin_namespace.doc(
         description = "Retrieve an Admin's Details by ID - Admins Only",
         params = {
-            'admin_id': "The Admin's ID"
+            'admin_id': "The Admin's ID",
+            **fields_param(admin_model)
         }
     )
     @admin_required()
@@ -98,9 +124,10 @@ class GetUpdateDeleteAdmins(Resource):
         """
             Retrieve an Admin's Details by ID - Admins Only
         """
-        admin = Admin.get_by_id(admin_id)
+        names = requested_fields(admin_model)
+        admin = sparse_query(Admin, names).get_or_404(admin_id)
         
-        return admin, HTTPStatus.OK
+        return marshal_fields(admin, admin_model, names), HTTPStatus.OK
     
     @admin_namespace.expect(admin_signup_model)
     @admin_namespace.doc(
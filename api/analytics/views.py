@@ -0,0 +1,167 @@
+from flask_restx import Namespace, Resource, fields, marshal
+from ..utils.analytics import analytics
+from ..utils.decorators import admin_required
+from http import HTTPStatus
+
+analytics_namespace = Namespace('analytics', description='Namespace for Grade Analytics')
+
+index_model = analytics_namespace.model(
+    'AnalyticsIndex', {
+        'courses': fields.Integer(description="Courses in the Index"),
+        'grades': fields.Integer(description="Grades in the Index"),
+        'bytes': fields.Integer(description="Memory Held by the Index's Columns"),
+        'bytes_per_grade': fields.Float(description="Memory per Grade"),
+        'built_at': fields.DateTime(description="Time the Index Was Last Built From the Database"),
+        'build_seconds': fields.Float(description="Time the Last Build Took"),
+        'stale': fields.Boolean(description="Whether the Index Is Rebuilt on the Next Query")
+    }
+)
+
+summary_fields = {
+    'count': fields.Integer(description="Grades Counted"),
+    'mean': fields.Float(description="Mean Grade in Percentage"),
+    'min': fields.Float(description="Lowest Grade in Percentage"),
+    'max': fields.Float(description="Highest Grade in Percentage")
+}
+
+histogram_bin_model = analytics_namespace.model(
+    'HistogramBin', {
+        'low': fields.Float(description="Lowest Grade in the Bin"),
+        'high': fields.Float(description="Grade the Bin Stops Below, the Last Bin Includes 100"),
+        'count': fields.Integer(description="Grades in the Bin")
+    }
+)
+
+distribution_model = analytics_namespace.model(
+    'GradeDistribution', {
+        **summary_fields,
+        'histogram': fields.List(fields.Nested(histogram_bin_model)),
+        'letters': fields.Raw(description="Grades per Letter Grade")
+    }
+)
+
+course_average_model = analytics_namespace.model(
+    'CourseAverage', {
+        'course_id': fields.Integer(description="Course ID"),
+        **summary_fields
+    }
+)
+
+at_risk_grade_model = analytics_namespace.model(
+    'AtRiskGrade', {
+        'student_id': fields.Integer(description="Student's User ID"),
+        'course_id': fields.Integer(description="Course ID"),
+        'grade_id': fields.Integer(description="Grade ID"),
+        'percent_grade': fields.Float(description="Grade in Percentage")
+    }
+)
+
+at_risk_model = analytics_namespace.model(
+    'AtRisk', {
+        'threshold': fields.Float(description="Grades Below This Are Listed"),
+        'total': fields.Integer(description="Grades Below the Threshold"),
+        'grades': fields.List(fields.Nested(at_risk_grade_model), description="Lowest Grades First")
+    }
+)
+
+distribution_parser = analytics_namespace.parser()
+distribution_parser.add_argument('course_id', type=int, location='args', help="One Course, All Courses by Default")
+distribution_parser.add_argument('term_id', type=int, location='args', help="Only Grades of This Term")
+distribution_parser.add_argument('bins', type=int, default=10, location='args', help="Histogram Bins, 1 to 100")
+
+averages_parser = analytics_namespace.parser()
+averages_parser.add_argument('term_id', type=int, location='args', help="Only Grades of This Term")
+
+at_risk_parser = analytics_namespace.parser()
+at_risk_parser.add_argument('threshold', type=float, default=50.0, location='args', help="Grades Below This, in Percentage")
+at_risk_parser.add_argument('course_id', type=int, location='args', help="One Course, All Courses by Default")
+at_risk_parser.add_argument('term_id', type=int, location='args', help="Only Grades of This Term")
+at_risk_parser.add_argument('limit', type=int, default=100, location='args', help="Grades Listed, Maximum 1000")
+
+
+def index_disabled():
+    return {"message": "The grade analytics index is disabled"}, HTTPStatus.SERVICE_UNAVAILABLE
+
+
+@analytics_namespace.route('/index')
+class GetAnalyticsIndex(Resource):
+
+    @analytics_namespace.response(HTTPStatus.OK, 'Success', index_model)
+    @analytics_namespace.doc(
+        description = "Get the Size and Memory Footprint of the Grade Analytics Index - Admins Only"
+    )
+    @admin_required()
+    def get(self):
+        """
+            Get the Grade Analytics Index's Footprint - Admins Only
+        """
+        if not analytics.enabled:
+            return index_disabled()
+
+        return marshal(analytics.index.stats(), index_model), HTTPStatus.OK
+
+
+@analytics_namespace.route('/distribution')
+class GetGradeDistribution(Resource):
+
+    @analytics_namespace.expect(distribution_parser)
+    @analytics_namespace.response(HTTPStatus.OK, 'Success', distribution_model)
+    @analytics_namespace.doc(
+        description = "Get the Grade Distribution of a Course or of All Courses - Admins Only"
+    )
+    @admin_required()
+    def get(self):
+        """
+            Get a Grade Distribution - Admins Only
+        """
+        if not analytics.enabled:
+            return index_disabled()
+
+        args = distribution_parser.parse_args()
+        bins = min(max(args['bins'], 1), 100)
+
+        return analytics.index.distribution(args['course_id'], args['term_id'], bins), HTTPStatus.OK
+
+
+@analytics_namespace.route('/courses')
+class GetCourseAverages(Resource):
+
+    @analytics_namespace.expect(averages_parser)
+    @analytics_namespace.response(HTTPStatus.OK, 'Success', [course_average_model])
+    @analytics_namespace.doc(
+        description = "Get the Grade Count, Mean and Extremes of Every Graded Course - Admins Only"
+    )
+    @admin_required()
+    def get(self):
+        """
+            Get Grade Averages by Course - Admins Only
+        """
+        if not analytics.enabled:
+            return index_disabled()
+
+        args = averages_parser.parse_args()
+
+        return analytics.index.course_averages(args['term_id']), HTTPStatus.OK
+
+
+@analytics_namespace.route('/at-risk')
+class GetAtRiskGrades(Resource):
+
+    @analytics_namespace.expect(at_risk_parser)
+    @analytics_namespace.response(HTTPStatus.OK, 'Success', at_risk_model)
+    @analytics_namespace.doc(
+        description = "List Grades Below a Threshold, Lowest First - Admins Only"
+    )
+    @admin_required()
+    def get(self):
+        """
+            List At-Risk Grades - Admins Only
+        """
+        if not analytics.enabled:
+            return index_disabled()
+
+        args = at_risk_parser.parse_args()
+        limit = min(max(args['limit'], 1), 1000)
+        grades, total = analytics.index.at_risk(args['threshold'], args['course_id'], args['term_id'], limit)
+
+        return {'threshold': args['threshold'], 'total': total, 'grades': grades}, HTTPStatus.OK
@@ -0,0 +1,129 @@
+from flask_restx import Namespace, Resource, fields
+from ..models.archive import ArchivedStudent, ArchivedEnrollment, ArchivedGrade, ArchivedTermGPA
+from ..utils.decorators import admin_required
+from ..utils.filters import apply_filters, filter_params
+from ..utils.grade_conversions import convert_grade_to_gpa
+from ..utils import db
+from sqlalchemy import select, and_
+from http import HTTPStatus
+
+archive_namespace = Namespace('archive', description='Namespace for Archived Students')
+
+archived_student_model = archive_namespace.model(
+    'ArchivedStudent', {
+        'id': fields.Integer(description="Student's Former User ID"),
+        'first_name': fields.String(description="First Name"),
+        'last_name': fields.String(description="Last Name"),
+        'email': fields.String(description="Student's Email"),
+        'matric_no': fields.String(description="Student's Matriculation Number"),
+        'archived_at': fields.DateTime(description="Time the Student Was Archived")
+    }
+)
+
+archived_student_filters = {
+    'matric_prefix': (ArchivedStudent.matric_no, 'prefix'),
+    'last_name': (ArchivedStudent.last_name, 'eq'),
+    'email': (ArchivedStudent.email, 'eq')
+}
+
+archived_student_sorts = {
+    'id': ArchivedStudent.id,
+    'matric_no': ArchivedStudent.matric_no
+}
+
+
+@archive_namespace.route('/students')
+class GetArchivedStudents(Resource):
+
+    @archive_namespace.marshal_with(archived_student_model)
+    @archive_namespace.doc(
+        description = "Retrieve Archived Students - Admins Only",
+        params = filter_params(archived_student_filters, archived_student_sorts)
+    )
+    @admin_required()
+    def get(self):
+        """
+            Retrieve Archived Students - Admins Only
+        """
+        students = apply_filters(
+            ArchivedStudent.query, archived_student_filters, archived_student_sorts, default_sort='matric_no'
+        ).all()
+
+        return students, HTTPStatus.OK
+
+
+@archive_namespace.route('/students/<int:student_id>/transcript')
+class GetArchivedTranscript(Resource):
+
+    @archive_namespace.doc(
+        description = "Retrieve an Archived Student's Transcript - Admins Only",
+        params = {
+            'student_id': "The Student's Former User ID"
+        }
+    )
+    @admin_required()
+    def get(self, student_id):
+        """
+            Retrieve an Archived Student's Transcript - Admins Only
+        """
+        student = ArchivedStudent.get_by_id(student_id)
+
+        # Enrollments and their grades in one query, one grade per course and term
+        rows = db.session.execute(
+            select(
+                ArchivedEnrollment.course_id, ArchivedEnrollment.course_name, ArchivedEnrollment.term_id,
+                ArchivedGrade.percent_grade, ArchivedGrade.letter_grade
+            )
+            .outerjoin(ArchivedGrade, and_(
+                ArchivedGrade.student_id == ArchivedEnrollment.student_id,
+                ArchivedGrade.course_id == ArchivedEnrollment.course_id,
+                ArchivedGrade.term_id.is_not_distinct_from(ArchivedEnrollment.term_id)
+            ))
+            .where(ArchivedEnrollment.student_id == student_id)
+            .order_by(ArchivedEnrollment.id, ArchivedGrade.id)
+        ).all()
+
+        grades_resp = []
+        seen_enrollments = set()
+        total_gpa = 0
+
+        for course_id, course_name, term_id, percent_grade, letter_grade in rows:
+            if (course_id, term_id) in seen_enrollments:
+                continue
+            seen_enrollments.add((course_id, term_id))
+
+            grade_resp = {}
+            grade_resp['course_id'] = course_id
+            grade_resp['course_name'] = course_name
+            grade_resp['term_id'] = term_id
+            grade_resp['percent_grade'] = percent_grade
+            grade_resp['letter_grade'] = letter_grade
+            if letter_grade is not None:
+                total_gpa += convert_grade_to_gpa(letter_grade)
+            grades_resp.append(grade_resp)
+
+        cgpa = None
+        if grades_resp:
+            cgpa = float("{:.2f}".format(total_gpa / len(grades_resp)))
+
+        student_resp = {}
+        student_resp['id'] = student.id
+        student_resp['first_name'] = student.first_name
+        student_resp['last_name'] = student.last_name
+        student_resp['email'] = student.email
+        student_resp['matric_no'] = student.matric_no
+        student_resp['archived_at'] = student.archived_at.isoformat()
+
+        term_gpas = ArchivedTermGPA.query.filter_by(student_id=student_id).order_by(ArchivedTermGPA.term_id).all()
+        terms_resp = [
+            {'term_id': row.term_id, 'courses': row.courses, 'graded': row.graded, 'gpa': row.gpa}
+            for row in term_gpas
+        ]
+
+        transcript_resp = {}
+        transcript_resp['profile'] = student_resp
+        transcript_resp['grades'] = grades_resp
+        transcript_resp['terms'] = terms_resp
+        transcript_resp['cgpa'] = cgpa
+
+        return transcript_resp, HTTPStatus.OK
@@ -0,0 +1,55 @@
+from flask_restx import Namespace, Resource, fields
+from ..models.grade_audit import GradeAudit
+from ..utils.decorators import admin_required
+from ..utils.filters import apply_filters, filter_params
+from http import HTTPStatus
+
+audit_namespace = Namespace('audit', description='Namespace for Audit Records')
+
+grade_audit_model = audit_namespace.model(
+    'GradeAudit', {
+        'id': fields.Integer(description="Audit Record ID"),
+        'grade_id': fields.Integer(description="Grade ID"),
+        'student_id': fields.Integer(description="Student's User ID"),
+        'course_id': fields.Integer(description="Course ID"),
+        'action': fields.String(description="Change Made: create, update or delete"),
+        'old_percent_grade': fields.Float(description="Grade in Percentage Before the Change"),
+        'new_percent_grade': fields.Float(description="Grade in Percentage After the Change"),
+        'old_letter_grade': fields.String(description="Letter Grade Before the Change"),
+        'new_letter_grade': fields.String(description="Letter Grade After the Change"),
+        'admin_id': fields.Integer(description="ID of the Admin Who Made the Change"),
+        'created_at': fields.DateTime(description="Time of the Change")
+    }
+)
+
+grade_audit_filters = {
+    'grade_id': (GradeAudit.grade_id, 'eq'),
+    'student_id': (GradeAudit.student_id, 'eq'),
+    'admin_id': (GradeAudit.admin_id, 'eq'),
+    'action': (GradeAudit.action, 'eq')
+}
+
+grade_audit_sorts = {
+    'id': GradeAudit.id,
+    'created_at': GradeAudit.created_at
+}
+
+
+@audit_namespace.route('/grades')
+class GetGradeAudit(Resource):
+
+    @audit_namespace.marshal_with(grade_audit_model)
+    @audit_namespace.doc(
+        description = "Retrieve the Grade Audit Trail - Admins Only",
+        params = filter_params(grade_audit_filters, grade_audit_sorts)
+    )
+    @admin_required()
+    def get(self):
+        """
+            Retrieve the Grade Audit Trail - Admins Only
+        """
+        records = apply_filters(
+                GradeAudit.query, grade_audit_filters, grade_audit_sorts, default_sort='-id'
+            ).all()
+
+        return records, HTTPStatus.OK
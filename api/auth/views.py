@@ -1,7 +1,10 @@
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from ..models.users import User
 from ..utils.blacklist import BLACKLIST
 from ..utils.decorators import admin_required
+from ..utils.filters import apply_filters, filter_params
+from ..utils.ratelimit import rate_limits
 from werkzeug.security import check_password_hash
 from http import HTTPStatus
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt
@@ -26,18 +29,33 @@ login_model = auth_namespace.model(
     }
 )
 
+user_filters = {
+    'user_type': (User.user_type, 'eq'),
+    'first_name': (User.first_name, 'eq'),
+    'last_name': (User.last_name, 'eq'),
+    'email': (User.email, 'eq')
+}
+
+user_sorts = {
+    'id': User.id,
+    'first_name': User.first_name,
+    'last_name': User.last_name,
+    'user_type': User.user_type
+}
+
 @auth_namespace.route('/users')
 class GetAllUsers(Resource):
     @auth_namespace.marshal_with(user_model)
     @auth_namespace.doc(
-        description = "Retrieve All Users - Admins Only"
+        description = "Retrieve All Users - Admins Only",
+        params = filter_params(user_filters, user_sorts)
     )
     @admin_required()
     def get(self):
         """
             Retrieve All Users - Admins Only
         """
-        users = User.query.all()
+        users = apply_filters(User.query, user_filters, user_sorts).all()
 
         return users, HTTPStatus.OK
 
@@ -56,6 +74,12 @@ class Login(Resource):
         email = data['email']
         password = data['password']
 
+        # Throttle by client address and by account before any password hashing
+        for limiter_name, key in (('login_ip', request.remote_addr), ('login_account', email.lower())):
+            allowed, retry_after = rate_limits.get(limiter_name).hit(key)
+            if not allowed:
+                return {"message": "Too Many Login Attempts"}, HTTPStatus.TOO_MANY_REQUESTS, {'Retry-After': str(retry_after)}
+
         user = User.query.filter_by(email=email).first()
 
         if (user is not None) and check_password_hash(user.password_hash, password):
@@ -69,6 +93,21 @@ class Login(Resource):
 
             return response, HTTPStatus.CREATED
 
+        return {"message": "Invalid Credentials"}, HTTPStatus.UNAUTHORIZED
+
+
+@auth_namespace.route('/limits')
+class GetRateLimits(Resource):
+    @auth_namespace.doc(
+        description = "Retrieve Rate Limiter Hit Counters - Admins Only"
+    )
+    @admin_required()
+    def get(self):
+        """
+            Retrieve Rate Limiter Hit Counters - Admins Only
+        """
+        return rate_limits.stats(), HTTPStatus.OK
+
 
 @auth_namespace.route('/refresh')
 class Refresh(Resource):
@@ -1,4 +1,6 @@
+import json
 import os
+import tempfile
 from decouple import config
 from datetime import timedelta
 
@@ -8,11 +10,77 @@ uri = os.environ.get('DATABASE_URL') # or other relevant config var
 if uri and uri.startswith('postgres://'):
     uri = uri.replace('postgres://', 'postgresql://', 1)
 
+replica_uri = os.environ.get('DATABASE_REPLICA_URL')
+if replica_uri and replica_uri.startswith('postgres://'):
+    replica_uri = replica_uri.replace('postgres://', 'postgresql://', 1)
+
 class Config:
     SECRET_KEY = config('SECRET_KEY', 'secret')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=30)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=14)
     JWT_SECRET_KEY = config('JWT_SECRET_KEY')
+    SQLALCHEMY_REPLICA_URI = replica_uri
+    REPLICA_PIN_SECONDS = 5
+    API_DOCS = True
+    # Attempts allowed per period in seconds, refilled continuously
+    RATE_LIMITS = {
+        'login_ip': (20, 60),
+        'login_account': (5, 60)
+    }
+    RATELIMIT_STORAGE = config('RATELIMIT_STORAGE', 'memory')
+    RATELIMIT_STORAGE_URI = config('RATELIMIT_STORAGE_URI', None)
+    # Reverse proxies in front of the app whose X-Forwarded-For, -Proto and
+    # -Host headers are trusted, 0 when clients connect directly
+    TRUSTED_PROXIES = config('TRUSTED_PROXIES', 0, cast=int)
+    AUDIT_BACKGROUND = True
+    AUDIT_BATCH_SIZE = 500
+    AUDIT_SHUTDOWN_TIMEOUT = 10
+    JOBS_EAGER = False
+    JOBS_MAX_WORKERS = 2
+    JOBS_RESULT_DIR = config('JOBS_RESULT_DIR', os.path.join(BASE_DIR, 'job_results'))
+    METRICS_ENABLED = config('METRICS_ENABLED', True, cast=bool)
+    # Set when running several worker processes, e.g. under gunicorn
+    METRICS_MULTIPROC_DIR = config('METRICS_MULTIPROC_DIR', None)
+    METRICS_FLUSH_INTERVAL = 5
+    COMPRESS_ENABLED = config('COMPRESS_ENABLED', True, cast=bool)
+    # Responses smaller than this many bytes are sent uncompressed
+    COMPRESS_MIN_SIZE = 1024
+    COMPRESS_MIMETYPES = ['application/json', 'text/csv', 'text/plain', 'text/html', 'text/css', 'application/javascript']
+    COMPRESS_GZIP_LEVEL = 6
+    COMPRESS_BR_LEVEL = 4
+    COMPRESS_ZSTD_LEVEL = 3
+    # How long a stored Idempotency-Key response is replayed for
+    IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+    ANALYTICS_INDEX_ENABLED = config('ANALYTICS_INDEX_ENABLED', True, cast=bool)
+    # Seconds before the index is rebuilt to pick up other processes' writes, 0 for never
+    ANALYTICS_MAX_AGE = config('ANALYTICS_MAX_AGE', 300, cast=int)
+    ANALYTICS_BATCH_SIZE = 10000
+    # Grade notifications are delivered through the log, file or http sink
+    NOTIFY_SINK = config('NOTIFY_SINK', 'log')
+    NOTIFY_FILE_PATH = config('NOTIFY_FILE_PATH', os.path.join(BASE_DIR, 'notifications.jsonl'))
+    NOTIFY_HTTP_URL = config('NOTIFY_HTTP_URL', 'http://127.0.0.1:8025/notifications')
+    NOTIFY_HTTP_TIMEOUT = 5
+    NOTIFY_BACKGROUND = True
+    NOTIFY_BATCH_SIZE = 200
+    NOTIFY_POLL_INTERVAL = 5
+    NOTIFY_SHUTDOWN_TIMEOUT = 10
+    # Seconds a dispatcher may spend delivering a claimed batch before
+    # another dispatcher claims it again
+    NOTIFY_LEASE = 900
+    # Failed deliveries are retried after 2, 4, 8... seconds, up to 10 minutes apart
+    NOTIFY_MAX_ATTEMPTS = 8
+    NOTIFY_RETRY_BASE = 2
+    NOTIFY_RETRY_MAX = 600
+    # Schools served by this deployment, as a JSON object of name to database
+    # URL. Empty runs a single school on SQLALCHEMY_DATABASE_URI.
+    TENANTS = config('TENANTS', '{}', cast=json.loads)
+    TENANT_HEADER = 'X-Tenant'
+    # Resolve tenants from subdomains of this domain, e.g. greenfield.zeschool.com
+    TENANT_DOMAIN = config('TENANT_DOMAIN', None)
+    TENANT_JWT_CLAIM = 'tenant'
+    # Tenant engines kept open at once, and the connection pool of each
+    TENANT_ENGINE_LIMIT = config('TENANT_ENGINE_LIMIT', 16, cast=int)
+    TENANT_ENGINE_OPTIONS = {'pool_size': 2, 'max_overflow': 3, 'pool_recycle': 1800}
 
 class DevConfig(Config):
     DEBUG = True
@@ -25,11 +93,16 @@ class TestConfig(Config):
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = True
     SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    AUDIT_BACKGROUND = False
+    JOBS_EAGER = True
+    NOTIFY_BACKGROUND = False
+    JOBS_RESULT_DIR = os.path.join(tempfile.gettempdir(), 'ze_school_jobs')
 
 class ProdConfig(Config):
     SQLALCHEMY_DATABASE_URI = uri
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     DEBUG = config('DEBUG', False, cast=bool)
+    API_DOCS = config('API_DOCS', True, cast=bool)
     
 config_dict = {
     'dev': DevConfig,
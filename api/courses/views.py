@@ -1,8 +1,18 @@
+import csv
+import io
+from flask import request, make_response
 from flask_restx import Namespace, Resource, fields
+from sqlalchemy import and_, case, func, literal_column, or_
 from ..models.courses import Course
+from ..models.grades import Grade
 from ..models.students import Student
 from ..models.student_course import StudentCourse
+from ..models.terms import Term
 from ..utils.decorators import admin_required
+from ..utils.filters import apply_filters, filter_params
+from ..utils.terms import closed_term_conflict
+from ..utils import db
+from ..utils.sparse import fields_param, requested_fields, sparse_query, marshal_fields, sparse_select, row_dicts
 from http import HTTPStatus
 from flask_jwt_extended import jwt_required
 
@@ -23,20 +33,89 @@ course_student_model = course_namespace.model(
     }
 )
 
+# Columns backing course_model, for reading lists without ORM instances
+course_columns = {
+    'id': Course.id,
+    'name': Course.name,
+    'teacher': Course.teacher
+}
+
+course_student_columns = {
+    'id': Student.id,
+    'first_name': Student.first_name,
+    'last_name': Student.last_name,
+    'matric_no': Student.matric_no
+}
+
+gradebook_row_model = course_namespace.model(
+    'GradebookRow', {
+        'student_id': fields.Integer(description="Student's User ID"),
+        'first_name': fields.String(description="First Name"),
+        'last_name': fields.String(description="Last Name"),
+        'matric_no': fields.String(description="Student's Matriculation Number"),
+        'term_id': fields.Integer(description="Term of the Enrollment"),
+        'grade_id': fields.Integer(description="Grade ID, Empty if Not Graded"),
+        'percent_grade': fields.Float(description="Grade in Percentage"),
+        'letter_grade': fields.String(description="Grade in Letter")
+    }
+)
+
+gradebook_model = course_namespace.model(
+    'Gradebook', {
+        'course': fields.Nested(course_model),
+        'page': fields.Integer(description="Page Number"),
+        'per_page': fields.Integer(description="Rows per Page"),
+        'has_next': fields.Boolean(description="Whether Another Page Exists"),
+        'rows': fields.List(fields.Nested(gradebook_row_model), description="One Row per Enrollment")
+    }
+)
+
+gradebook_parser = course_namespace.parser()
+gradebook_parser.add_argument('page', type=int, default=1, location='args', help="Page Number")
+gradebook_parser.add_argument('per_page', type=int, default=100, location='args', help="Rows per Page, Maximum 1000")
+gradebook_parser.add_argument('term_id', type=int, location='args', help="Only Enrollments in This Term")
+gradebook_parser.add_argument('format', type=str, default='json', choices=('json', 'csv'), location='args', help="json or csv")
+
+# Every enrolled student with their grade, if any, as one row per enrollment
+gradebook_columns = {
+    'student_id': Student.id,
+    'first_name': Student.first_name,
+    'last_name': Student.last_name,
+    'matric_no': Student.matric_no,
+    'term_id': StudentCourse.term_id,
+    'grade_id': Grade.id,
+    'percent_grade': Grade.percent_grade,
+    'letter_grade': Grade.letter_grade
+}
+
+course_filters = {
+    'name': (Course.name, 'eq'),
+    'name_prefix': (Course.name, 'prefix'),
+    'teacher': (Course.teacher, 'eq')
+}
+
+course_sorts = {
+    'id': Course.id,
+    'name': Course.name,
+    'teacher': Course.teacher
+}
+
 
 @course_namespace.route('')
 class GetCreateCourses(Resource):
 
-    @course_namespace.marshal_with(course_model)
+    @course_namespace.response(HTTPStatus.OK, 'Success', [course_model])
     @course_namespace.doc(
-        description = "Get All Courses"
+        description = "Get All Courses",
+        params = {**filter_params(course_filters, course_sorts), **fields_param(course_model)}
     )
     @jwt_required()
     def get(self):
         """
             Get All Courses
         """
-        courses = Course.query.all()
+        names = requested_fields(course_model)
+        courses = row_dicts(apply_filters(sparse_select(course_columns, names), course_filters, course_sorts))
 
         return courses, HTTPStatus.OK
     
@@ -75,11 +154,12 @@ class GetCreateCourses(Resource):
 @course_namespace.route('/<int:course_id>')
 class GetUpdateDeleteCourse(Resource):
     
-    @course_namespace.marshal_with(course_model)
+    @course_namespace.response(HTTPStatus.OK, 'Success', course_model)
     @course_namespace.doc(
         description = "Retrieve a Course's Details by ID - Admins Only",
         params = {
-            'course_id': "The Course's ID"
+            'course_id': "The Course's ID",
+            **fields_param(course_model)
         }
     )
     @admin_required()
@@ -87,9 +167,10 @@ class GetUpdateDeleteCourse(Resource):
         """
             Retrieve a Course's Details by ID - Admins Only
         """
-        course = Course.get_by_id(course_id)
+        names = requested_fields(course_model)
+        course = sparse_query(Course, names).get_or_404(course_id)
         
-        return course, HTTPStatus.OK
+        return marshal_fields(course, course_model, names), HTTPStatus.OK
     
     @course_namespace.expect(course_model)
     @course_namespace.marshal_with(course_model)
@@ -126,9 +207,8 @@ class GetUpdateDeleteCourse(Resource):
         """
             Delete a Course by ID - Admins Only
         """
-        course = Course.get_by_id(course_id)
-
-        course.delete()
+        if not Course.delete_by_id(course_id):
+            return {"error": "Not Found"}, HTTPStatus.NOT_FOUND
 
         return {"message": "Course Successfully Deleted"}, HTTPStatus.OK
 
@@ -147,19 +227,81 @@ class GetAllCourseStudents(Resource):
         """
             Get All Students Enrolled for a Course - Admins Only
         """
-        students = StudentCourse.get_students_in_course(course_id)
-        resp = []
+        # A student enrolled in the course in several terms is listed once
+        students = row_dicts(
+            sparse_select(course_student_columns, None)
+            .join(StudentCourse, StudentCourse.student_id == Student.id)
+            .where(StudentCourse.course_id == course_id)
+            .distinct()
+        )
 
-        for student in students:
-            student_resp = {}
-            student_resp['id'] = student.id
-            student_resp['first_name'] = student.first_name
-            student_resp['last_name'] = student.last_name
-            student_resp['matric_no'] = student.matric_no
+        return students, HTTPStatus.OK
 
-            resp.append(student_resp)
 
-        return resp, HTTPStatus.OK
+@course_namespace.route('/<int:course_id>/gradebook')
+class GetCourseGradebook(Resource):
+
+    @course_namespace.expect(gradebook_parser)
+    @course_namespace.response(HTTPStatus.OK, 'Success', gradebook_model)
+    @course_namespace.doc(
+        description = "Get a Course's Gradebook of Enrolled Students and Their Grades, as JSON or CSV - Admins Only",
+        params = {
+            'course_id': "The Course's ID"
+        }
+    )
+    @admin_required()
+    def get(self, course_id):
+        """
+            Get a Course's Gradebook - Admins Only
+        """
+        course = Course.get_by_id(course_id)
+
+        args = gradebook_parser.parse_args()
+        page = max(args['page'], 1)
+        per_page = min(max(args['per_page'], 1), 1000)
+
+        # One join over enrollments, students and grades. Grades match on
+        # coalesce(term_id, 0) like their unique index, so the lookup uses it.
+        stmt = (
+            sparse_select(gradebook_columns, None)
+            .select_from(StudentCourse)
+            .join(Student, Student.id == StudentCourse.student_id)
+            .outerjoin(Grade, and_(
+                Grade.student_id == StudentCourse.student_id,
+                Grade.course_id == StudentCourse.course_id,
+                func.coalesce(Grade.term_id, literal_column('0')) == func.coalesce(StudentCourse.term_id, literal_column('0'))
+            ))
+            .where(StudentCourse.course_id == course.id)
+        )
+        if args['term_id'] is not None:
+            stmt = stmt.where(StudentCourse.term_id == args['term_id'])
+
+        # Fetch one extra row to know whether another page exists
+        stmt = stmt.order_by(Student.last_name, Student.first_name, Student.id, StudentCourse.term_id)
+        rows = row_dicts(stmt.limit(per_page + 1).offset((page - 1) * per_page))
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+
+        if args['format'] == 'csv':
+            output = io.StringIO()
+            writer = csv.DictWriter(output, fieldnames=list(gradebook_columns))
+            writer.writeheader()
+            writer.writerows(rows)
+
+            response = make_response(output.getvalue(), HTTPStatus.OK)
+            response.headers['Content-Type'] = 'text/csv; charset=utf-8'
+            response.headers['Content-Disposition'] = f'attachment; filename="course_{course.id}_gradebook_{page}.csv"'
+            response.headers['X-Has-Next'] = 'true' if has_next else 'false'
+            return response
+
+        gradebook_resp = {}
+        gradebook_resp['course'] = {'id': course.id, 'name': course.name, 'teacher': course.teacher}
+        gradebook_resp['page'] = page
+        gradebook_resp['per_page'] = per_page
+        gradebook_resp['has_next'] = has_next
+        gradebook_resp['rows'] = rows
+
+        return gradebook_resp, HTTPStatus.OK
 
 
 @course_namespace.route('/<int:course_id>/students/<int:student_id>')
@@ -168,7 +310,8 @@ class AddDropCourseStudent(Resource):
     @course_namespace.doc(
         description = "Enroll a Student for a Course - Admins Only",
         params = {
-            'course_id': "The Course's ID"
+            'course_id': "The Course's ID",
+            'term_id': "The Term to Enroll For, Defaults to the Current Open Term"
         }
     )
     @admin_required()
@@ -178,9 +321,19 @@ class AddDropCourseStudent(Resource):
         """
         course = Course.get_by_id(course_id)
         student = Student.get_by_id(student_id)
+
+        # Enroll for the requested term, else the current one if a term is open
+        term_id = request.args.get('term_id', type=int)
+        if term_id is not None:
+            term = Term.get_by_id(term_id)
+        else:
+            term = Term.current()
+
+        if term is not None and term.status != 'open':
+            return {"message": f"{term.name} is closed"}, HTTPStatus.CONFLICT
         
         student_in_course = StudentCourse.query.filter_by(
-                student_id=student.id, course_id=course.id
+                student_id=student.id, course_id=course.id, term_id=term.id if term else None
             ).first()
         if student_in_course:
             return {
@@ -189,7 +342,8 @@ class AddDropCourseStudent(Resource):
         
         course_student =  StudentCourse(
             course_id = course_id,
-            student_id = student_id
+            student_id = student_id,
+            term_id = term.id if term else None
         )
 
         course_student.save()
@@ -202,6 +356,7 @@ class AddDropCourseStudent(Resource):
         course_student_resp['student_first_name'] = student.first_name
         course_student_resp['student_last_name'] = student.last_name
         course_student_resp['student_matric_no'] = student.matric_no
+        course_student_resp['term_id'] = course_student.term_id
 
         return course_student_resp, HTTPStatus.CREATED
 
@@ -209,7 +364,8 @@ class AddDropCourseStudent(Resource):
         description = 'Remove a Student from a Course - Admins Only',
         params = {
             'course_id': "The Course's ID",
-            'student_id': "The Student's ID"
+            'student_id': "The Student's ID",
+            'term_id': "The Term to Drop, Defaults to the Latest Enrollment in an Open Term"
         }
     )
     @admin_required()
@@ -219,20 +375,30 @@ class AddDropCourseStudent(Resource):
         """
 
         # Confirm existence of student and course
-        course = Course.query.filter_by(id=course_id).first()
-        student = Student.query.filter_by(id=student_id).first()
+        course = db.session.get(Course, course_id)
+        student = db.session.get(Student, student_id)
         if not student or not course:
             return {"message": "Student or Course Not Found"}, HTTPStatus.NOT_FOUND
         
-        # Check if student is not registered for the course
-        student_in_course = StudentCourse.query.filter_by(
-                student_id=student.id, course_id=course.id
-            ).first()
+        # Drop the requested term's enrollment, else the latest one still open to changes
+        enrollments = StudentCourse.query.filter_by(student_id=student.id, course_id=course.id)
+        term_id = request.args.get('term_id', type=int)
+        if term_id is not None:
+            enrollments = enrollments.filter_by(term_id=term_id)
+        else:
+            still_open = or_(StudentCourse.term_id.is_(None), Term.status == 'open')
+            enrollments = enrollments.outerjoin(Term, Term.id == StudentCourse.term_id) \
+                .order_by(case((still_open, 0), else_=1))
+        student_in_course = enrollments.order_by(StudentCourse.id.desc()).first()
         if not student_in_course:
             return {
                 "message": f"{student.first_name} {student.last_name} is not registered for {course.name}"
             }, HTTPStatus.NOT_FOUND
 
+        conflict = closed_term_conflict(student_in_course.term_id)
+        if conflict:
+            return conflict
+
         # Remove the student from the course
         student_in_course.delete()
 
@@ -0,0 +1,271 @@
+import csv
+import os
+from datetime import datetime
+from sqlalchemy import delete, distinct, func, insert, literal, select, update
+from werkzeug.security import generate_password_hash
+from ..models.users import User
+from ..models.grades import Grade
+from ..models.courses import Course
+from ..models.students import Student
+from ..models.student_course import StudentCourse
+from ..models.archive import ArchivedStudent, ArchivedEnrollment, ArchivedGrade, ArchivedTermGPA
+from ..models.terms import Term, TermGPA
+from ..utils import db
+from ..utils.audit import audit_log
+from ..utils.grade_conversions import get_letter_grade
+from ..utils.terms import term_gpa_rows, term_gpa
+from ..utils.unit_of_work import unit_of_work, save_all
+
+# Each task receives a JobContext first and returns a short result summary.
+# Work is done in keyset-paginated chunks with one unit of work per chunk,
+# which keeps memory flat and saves the job's progress as it goes.
+
+
+def recompute_grades(job, created_by:int=None, chunk_size:int=500) -> str:
+    total = db.session.scalar(select(func.count(Grade.id)))
+    job.progress(0, total)
+
+    done = changed = skipped = last_id = 0
+    while True:
+        with unit_of_work():
+            grades = Grade.query.filter(Grade.id > last_id).order_by(Grade.id).limit(chunk_size).all()
+            if not grades:
+                break
+
+            # Grades of closing or closed terms are frozen, as they are for the grade views.
+            # Term.closed share-locks each open term so it cannot start closing mid-chunk.
+            frozen = {term_id for term_id in {grade.term_id for grade in grades} if Term.closed(term_id)}
+
+            for grade in grades:
+                if grade.term_id in frozen:
+                    skipped += 1
+                    continue
+
+                letter_grade = get_letter_grade(grade.percent_grade)
+                if grade.letter_grade != letter_grade:
+                    old_letter_grade = grade.letter_grade
+                    grade.letter_grade = letter_grade
+                    audit_log.record(
+                        'update', grade, admin_id=created_by,
+                        old_percent_grade=grade.percent_grade, old_letter_grade=old_letter_grade
+                    )
+                    changed += 1
+
+            last_id = grades[-1].id
+            done += len(grades)
+            job.progress(done)
+
+    return f"Recomputed {done} grades, {changed} changed, {skipped} in closed terms skipped"
+
+
+def export_grades(job, chunk_size:int=1000) -> str:
+    total = db.session.scalar(select(func.count(Grade.id)))
+    job.progress(0, total)
+
+    os.makedirs(job.result_dir, exist_ok=True)
+    path = os.path.join(job.result_dir, f"{job.id}.csv")
+
+    done = last_id = 0
+    with open(path, 'w', newline='') as export_file:
+        writer = csv.writer(export_file)
+        writer.writerow([
+            'grade_id', 'student_id', 'matric_no', 'first_name', 'last_name',
+            'course_id', 'course_name', 'percent_grade', 'letter_grade'
+        ])
+
+        while True:
+            rows = db.session.execute(
+                select(
+                    Grade.id, Student.id, Student.matric_no, Student.first_name, Student.last_name,
+                    Course.id, Course.name, Grade.percent_grade, Grade.letter_grade
+                )
+                .join(Student, Student.id == Grade.student_id)
+                .join(Course, Course.id == Grade.course_id)
+                .where(Grade.id > last_id)
+                .order_by(Grade.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+
+            writer.writerows(rows)
+            last_id = rows[-1][0]
+            done += len(rows)
+            job.progress(done)
+            db.session.commit()
+
+    job.set_result_path(path)
+
+    return f"Exported {done} grades"
+
+
+def import_students(job, students:list, chunk_size:int=100) -> str:
+    job.progress(0, len(students))
+
+    imported = skipped = 0
+    for start in range(0, len(students), chunk_size):
+        chunk = students[start:start + chunk_size]
+
+        with unit_of_work():
+            # Skip accounts whose email or matric number is already taken
+            emails = {row[0] for row in db.session.execute(
+                select(User.email).where(User.email.in_([data['email'] for data in chunk]))
+            )}
+            matric_nos = {row[0] for row in db.session.execute(
+                select(Student.matric_no).where(Student.matric_no.in_([data['matric_no'] for data in chunk]))
+            )}
+
+            new_students = []
+            for data in chunk:
+                if data['email'] in emails or data['matric_no'] in matric_nos:
+                    skipped += 1
+                    continue
+
+                new_students.append(Student(
+                    first_name = data['first_name'],
+                    last_name = data['last_name'],
+                    email = data['email'],
+                    password_hash = generate_password_hash(data['password']),
+                    matric_no = data['matric_no'],
+                    user_type = 'student'
+                ))
+                emails.add(data['email'])
+                matric_nos.add(data['matric_no'])
+
+            save_all(new_students)
+            imported += len(new_students)
+            job.progress(start + len(chunk))
+
+    return f"Imported {imported} students, skipped {skipped} existing"
+
+
+# Move a graduating cohort, selected by matric number prefix, into the archive
+# tables. Each chunk is copied with INSERT ... SELECT and then deleted from the
+# hot tables in the same transaction, so no row is ever in both or neither.
+def archive_cohort(job, matric_prefix:str, chunk_size:int=500) -> str:
+    in_cohort = Student.matric_no.startswith(matric_prefix, autoescape=True)
+    total = db.session.scalar(select(func.count(Student.id)).where(in_cohort))
+    job.progress(0, total)
+
+    done = enrollments = grades = last_id = 0
+    while True:
+        with unit_of_work():
+            ids = db.session.scalars(
+                select(Student.id).where(in_cohort, Student.id > last_id).order_by(Student.id).limit(chunk_size)
+            ).all()
+            if not ids:
+                break
+
+            archived_at = datetime.utcnow()
+            db.session.execute(
+                insert(ArchivedStudent).from_select(
+                    ['id', 'first_name', 'last_name', 'email', 'matric_no', 'archived_at'],
+                    select(
+                        Student.id, Student.first_name, Student.last_name, Student.email,
+                        Student.matric_no, literal(archived_at, db.DateTime())
+                    ).where(Student.id.in_(ids))
+                )
+            )
+            enrollments += db.session.execute(
+                insert(ArchivedEnrollment).from_select(
+                    ['id', 'student_id', 'course_id', 'course_name', 'term_id'],
+                    select(
+                        StudentCourse.id, StudentCourse.student_id, StudentCourse.course_id, Course.name,
+                        StudentCourse.term_id
+                    )
+                    .outerjoin(Course, Course.id == StudentCourse.course_id)
+                    .where(StudentCourse.student_id.in_(ids))
+                )
+            ).rowcount
+            grades += db.session.execute(
+                insert(ArchivedGrade).from_select(
+                    ['id', 'student_id', 'course_id', 'course_name', 'term_id', 'percent_grade', 'letter_grade'],
+                    select(
+                        Grade.id, Grade.student_id, Grade.course_id, Course.name, Grade.term_id,
+                        Grade.percent_grade, Grade.letter_grade
+                    )
+                    .outerjoin(Course, Course.id == Grade.course_id)
+                    .where(Grade.student_id.in_(ids))
+                )
+            ).rowcount
+            db.session.execute(
+                insert(ArchivedTermGPA).from_select(
+                    ['term_id', 'student_id', 'courses', 'graded', 'gpa', 'computed_at'],
+                    select(
+                        TermGPA.term_id, TermGPA.student_id, TermGPA.courses, TermGPA.graded,
+                        TermGPA.gpa, TermGPA.computed_at
+                    ).where(TermGPA.student_id.in_(ids))
+                )
+            )
+
+            db.session.execute(delete(TermGPA).where(TermGPA.student_id.in_(ids)))
+            db.session.execute(delete(Grade).where(Grade.student_id.in_(ids)))
+            db.session.execute(delete(StudentCourse).where(StudentCourse.student_id.in_(ids)))
+            db.session.execute(delete(Student.__table__).where(Student.__table__.c.id.in_(ids)))
+            db.session.execute(delete(User).where(User.id.in_(ids)))
+
+            last_id = ids[-1]
+            done += len(ids)
+            job.progress(done)
+
+    return f"Archived {done} students, {enrollments} enrollments and {grades} grades"
+
+
+# Close a term and precompute every enrolled student's term GPA, so that
+# reads of a closed term never aggregate its grades again. The term is
+# already closing, which stops grade changes; it reopens if the job fails.
+def close_term(job, term_id:int, chunk_size:int=500) -> str:
+    try:
+        return _close_term(job, term_id, chunk_size)
+    except Exception:
+        db.session.rollback()
+        with unit_of_work():
+            db.session.execute(update(Term).where(Term.id == term_id, Term.status == 'closing').values(status='open'))
+        raise
+
+
+def _close_term(job, term_id:int, chunk_size:int) -> str:
+    total = db.session.scalar(
+        select(func.count(distinct(StudentCourse.student_id))).where(StudentCourse.term_id == term_id)
+    )
+    job.progress(0, total)
+
+    with unit_of_work():
+        db.session.execute(delete(TermGPA).where(TermGPA.term_id == term_id))
+
+    done = last_id = 0
+    while True:
+        with unit_of_work():
+            ids = db.session.scalars(
+                select(StudentCourse.student_id).distinct()
+                .where(StudentCourse.term_id == term_id, StudentCourse.student_id > last_id)
+                .order_by(StudentCourse.student_id)
+                .limit(chunk_size)
+            ).all()
+            if not ids:
+                break
+
+            computed_at = datetime.utcnow()
+            rows = [
+                {
+                    'term_id': term_id,
+                    'student_id': student_id,
+                    'courses': courses,
+                    'graded': graded,
+                    'gpa': term_gpa(courses, points),
+                    'computed_at': computed_at
+                }
+                for student_id, courses, graded, points in term_gpa_rows(term_id, ids)
+            ]
+            db.session.execute(insert(TermGPA), rows)
+
+            last_id = ids[-1]
+            done += len(ids)
+            job.progress(done)
+
+    with unit_of_work():
+        term = db.session.get(Term, term_id)
+        term.status = 'closed'
+        term.closed_at = datetime.utcnow()
+
+    return f"Closed {term.name}, computed {done} term GPAs"
@@ -0,0 +1,200 @@
+import os
+from flask import send_file
+from flask_restx import Namespace, Resource, fields
+from ..models.jobs import Job
+from ..students.views import student_signup_model
+from ..utils.decorators import admin_required
+from ..utils.filters import apply_filters, filter_params
+from ..utils.jobs import job_runner
+from .tasks import recompute_grades, export_grades, import_students, archive_cohort
+from http import HTTPStatus
+from flask_jwt_extended import get_jwt_identity
+
+job_namespace = Namespace('jobs', description='Namespace for Background Jobs')
+
+job_model = job_namespace.model(
+    'Job', {
+        'id': fields.String(description="Job ID"),
+        'name': fields.String(description="Job Name"),
+        'status': fields.String(description="Job Status: queued, running, succeeded or failed"),
+        'progress': fields.Integer(description="Items Processed So Far"),
+        'total': fields.Integer(description="Total Items to Process"),
+        'result': fields.String(description="Summary of the Job's Result"),
+        'result_path': fields.String(description="Location of the Job's Result File"),
+        'error': fields.String(description="Error Message if the Job Failed"),
+        'created_by': fields.Integer(description="ID of the Admin Who Started the Job"),
+        'created_at': fields.DateTime(description="Time the Job Was Queued"),
+        'started_at': fields.DateTime(description="Time the Job Started"),
+        'finished_at': fields.DateTime(description="Time the Job Finished")
+    }
+)
+
+student_import_model = job_namespace.model(
+    'StudentImport', {
+        'students': fields.List(fields.Nested(student_signup_model), required=True, description="Students to Register")
+    }
+)
+
+cohort_archive_model = job_namespace.model(
+    'CohortArchive', {
+        'matric_prefix': fields.String(required=True, description="Matriculation Number Prefix of the Graduating Cohort, e.g. ZSCH/19/")
+    }
+)
+
+job_filters = {
+    'name': (Job.name, 'eq'),
+    'status': (Job.status, 'eq')
+}
+
+job_sorts = {
+    'created_at': Job.created_at
+}
+
+
+# Accepted response pointing the client at the job's status endpoint
+def job_accepted(job):
+    job_resp = {}
+    job_resp['id'] = job.id
+    job_resp['name'] = job.name
+    job_resp['status'] = job.status
+
+    return job_resp, HTTPStatus.ACCEPTED, {'Location': f'/jobs/{job.id}'}
+
+
+@job_namespace.route('')
+class GetAllJobs(Resource):
+
+    @job_namespace.marshal_with(job_model)
+    @job_namespace.doc(
+        description = "Retrieve All Jobs - Admins Only",
+        params = filter_params(job_filters, job_sorts)
+    )
+    @admin_required()
+    def get(self):
+        """
+            Retrieve All Jobs - Admins Only
+        """
+        jobs = apply_filters(Job.query, job_filters, job_sorts, default_sort='-created_at').all()
+
+        return jobs, HTTPStatus.OK
+
+
+@job_namespace.route('/grades/recompute')
+class RecomputeGrades(Resource):
+
+    @job_namespace.doc(
+        description = "Start Recomputing All Letter Grades - Admins Only"
+    )
+    @admin_required()
+    def post(self):
+        """
+            Start Recomputing All Letter Grades - Admins Only
+        """
+        admin_id = get_jwt_identity()
+        job = job_runner.submit('recompute_grades', recompute_grades, created_by=admin_id)
+
+        return job_accepted(job)
+
+
+@job_namespace.route('/grades/export')
+class ExportGrades(Resource):
+
+    @job_namespace.doc(
+        description = "Start Exporting All Grades as CSV - Admins Only"
+    )
+    @admin_required()
+    def post(self):
+        """
+            Start Exporting All Grades as CSV - Admins Only
+        """
+        job = job_runner.submit('export_grades', export_grades, created_by=get_jwt_identity())
+
+        return job_accepted(job)
+
+
+@job_namespace.route('/students/import')
+class ImportStudents(Resource):
+
+    @job_namespace.expect(student_import_model)
+    @job_namespace.doc(
+        description = "Start a Bulk Student Import - Admins Only"
+    )
+    @admin_required()
+    def post(self):
+        """
+            Start a Bulk Student Import - Admins Only
+        """
+        data = job_namespace.payload
+
+        job = job_runner.submit(
+            'import_students', import_students, created_by=get_jwt_identity(), students=data['students']
+        )
+
+        return job_accepted(job)
+
+
+@job_namespace.route('/students/archive')
+class ArchiveCohort(Resource):
+
+    @job_namespace.expect(cohort_archive_model)
+    @job_namespace.doc(
+        description = "Start Archiving a Graduating Cohort - Admins Only"
+    )
+    @admin_required()
+    def post(self):
+        """
+            Start Archiving a Graduating Cohort - Admins Only
+        """
+        data = job_namespace.payload
+
+        matric_prefix = data['matric_prefix'].strip()
+        if not matric_prefix:
+            return {"message": "Matriculation Number Prefix Required"}, HTTPStatus.BAD_REQUEST
+
+        job = job_runner.submit(
+            'archive_cohort', archive_cohort, created_by=get_jwt_identity(), matric_prefix=matric_prefix
+        )
+
+        return job_accepted(job)
+
+
+@job_namespace.route('/<string:job_id>')
+class GetJob(Resource):
+
+    @job_namespace.marshal_with(job_model)
+    @job_namespace.doc(
+        description = "Retrieve a Job's Status and Progress - Admins Only",
+        params = {
+            'job_id': "The Job's ID"
+        }
+    )
+    @admin_required()
+    def get(self, job_id):
+        """
+            Retrieve a Job's Status and Progress - Admins Only
+        """
+        job = Job.get_by_id(job_id)
+
+        return job, HTTPStatus.OK
+
+
+@job_namespace.route('/<string:job_id>/result')
+class GetJobResult(Resource):
+
+    @job_namespace.doc(
+        description = "Download a Job's Result File - Admins Only",
+        params = {
+            'job_id': "The Job's ID"
+        }
+    )
+    @admin_required()
+    def get(self, job_id):
+        """
+            Download a Job's Result File - Admins Only
+        """
+        job = Job.get_by_id(job_id)
+
+        if job.status != 'succeeded' or not job.result_path or not os.path.exists(job.result_path):
+            return {"message": "Job Result Not Available"}, HTTPStatus.NOT_FOUND
+
+        return send_file(job.result_path, as_attachment=True)
@@ -1,5 +1,6 @@
 from .users import User
 from ..utils import db
+from ..utils.unit_of_work import commit
 
 class Admin(User):
     __tablename__ = 'admin'
@@ -11,14 +12,14 @@ class Admin(User):
 
     def save(self):
         db.session.add(self)
-        db.session.commit()
+        commit()
 
     def update(self):
-        db.session.commit()
+        commit()
 
     def delete(self):
         db.session.delete(self)
-        db.session.commit()
+        commit()
         
     @classmethod
     def get_by_id(cls, id):
@@ -0,0 +1,64 @@
+from ..utils import db
+from datetime import datetime
+
+# Archived rows keep their original IDs and plain ID columns rather than
+# foreign keys, so they stay valid after the hot rows and courses are gone.
+# The hot tables never reuse IDs, so later cohorts cannot collide with them.
+# Course names are copied in so transcripts read without the courses table.
+class ArchivedStudent(db.Model):
+    __tablename__ = 'archived_students'
+    id = db.Column(db.Integer(), primary_key=True)
+    first_name = db.Column(db.String(50), nullable=False)
+    last_name = db.Column(db.String(50), nullable=False)
+    email = db.Column(db.String(50), nullable=False)
+    matric_no = db.Column(db.String(30), index=True)
+    archived_at = db.Column(db.DateTime(), nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Archived Student {self.matric_no}>"
+
+    @classmethod
+    def get_by_id(cls, id):
+        return cls.query.get_or_404(id)
+
+
+class ArchivedEnrollment(db.Model):
+    __tablename__ = 'archived_student_course'
+    id = db.Column(db.Integer(), primary_key=True)
+    student_id = db.Column(db.Integer(), nullable=False, index=True)
+    course_id = db.Column(db.Integer())
+    course_name = db.Column(db.String(100))
+    term_id = db.Column(db.Integer())
+
+    def __repr__(self):
+        return f"<Archived Student Course {self.id}>"
+
+
+class ArchivedGrade(db.Model):
+    __tablename__ = 'archived_grades'
+    id = db.Column(db.Integer(), primary_key=True)
+    student_id = db.Column(db.Integer(), nullable=False, index=True)
+    course_id = db.Column(db.Integer())
+    course_name = db.Column(db.String(100))
+    term_id = db.Column(db.Integer())
+    percent_grade = db.Column(db.Float(), nullable=False)
+    letter_grade = db.Column(db.String(5), nullable=True)
+
+    def __repr__(self):
+        return f"<Archived {self.percent_grade}%>"
+
+
+# Term GPAs precomputed for closed terms, kept because the grades behind
+# them are archived with the student
+class ArchivedTermGPA(db.Model):
+    __tablename__ = 'archived_term_gpa'
+    id = db.Column(db.Integer(), primary_key=True)
+    term_id = db.Column(db.Integer(), nullable=False)
+    student_id = db.Column(db.Integer(), nullable=False, index=True)
+    courses = db.Column(db.Integer(), nullable=False)
+    graded = db.Column(db.Integer(), nullable=False)
+    gpa = db.Column(db.Float(), nullable=True)
+    computed_at = db.Column(db.DateTime(), nullable=False)
+
+    def __repr__(self):
+        return f"<Archived Term GPA {self.term_id} {self.student_id}>"
@@ -1,4 +1,6 @@
+from sqlalchemy import delete
 from ..utils import db
+from ..utils.unit_of_work import commit
 
 class Course(db.Model):
     __tablename__ = 'courses'
@@ -11,15 +13,23 @@ class Course(db.Model):
         
     def save(self):
         db.session.add(self)
-        db.session.commit()
+        commit()
     
     def update(self):
-        db.session.commit()
+        commit()
 
     def delete(self):
         db.session.delete(self)
-        db.session.commit()
+        commit()
 
     @classmethod
     def get_by_id(cls, id):
-        return cls.query.get_or_404(id)
\ No newline at end of file
+        return cls.query.get_or_404(id)
+
+    # Delete a course in one statement; the database cascades the delete to
+    # its student_course and grades rows. Returns False if not found.
+    @classmethod
+    def delete_by_id(cls, id) -> bool:
+        result = db.session.execute(delete(cls).where(cls.id == id))
+        commit()
+        return result.rowcount > 0
\ No newline at end of file
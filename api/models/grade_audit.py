@@ -0,0 +1,25 @@
+from ..utils import db
+from datetime import datetime
+
+# Audit rows keep plain IDs rather than foreign keys so the history
+# outlives deleted grades, students and courses
+class GradeAudit(db.Model):
+    __tablename__ = 'grade_audit'
+    id = db.Column(db.Integer(), primary_key=True)
+    grade_id = db.Column(db.Integer(), nullable=False, index=True)
+    student_id = db.Column(db.Integer(), index=True)
+    course_id = db.Column(db.Integer())
+    action = db.Column(db.String(10), nullable=False)
+    old_percent_grade = db.Column(db.Float(), nullable=True)
+    new_percent_grade = db.Column(db.Float(), nullable=True)
+    old_letter_grade = db.Column(db.String(5), nullable=True)
+    new_letter_grade = db.Column(db.String(5), nullable=True)
+    admin_id = db.Column(db.Integer(), index=True)
+    created_at = db.Column(db.DateTime(), nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<Grade Audit {self.grade_id} {self.action}>"
+
+    @classmethod
+    def get_by_id(cls, id):
+        return cls.query.get_or_404(id)
@@ -1,27 +1,82 @@
+from sqlalchemy.dialects import postgresql, sqlite
 from ..utils import db
+from ..utils.analytics import track_grade
+from ..utils.unit_of_work import commit
+
+# INSERT ... ON CONFLICT constructs of the databases we run on
+UPSERT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert
+}
 
 class Grade(db.Model):
     __tablename__ = 'grades'
     id = db.Column(db.Integer(), primary_key=True)
-    student_id = db.Column(db.Integer(), db.ForeignKey('students.id'))
-    course_id = db.Column(db.Integer(), db.ForeignKey('courses.id'))
-    percent_grade = db.Column(db.Float(), nullable=False)
+    student_id = db.Column(db.Integer(), db.ForeignKey('students.id', ondelete='CASCADE'))
+    course_id = db.Column(db.Integer(), db.ForeignKey('courses.id', ondelete='CASCADE'), index=True)
+    term_id = db.Column(db.Integer(), db.ForeignKey('terms.id'), nullable=True)
+    percent_grade = db.Column(db.Float(), nullable=False, index=True)
     letter_grade = db.Column(db.String(5), nullable=True)
 
+    # A student has one grade per course and term. Grades from before terms
+    # existed have no term, so the key counts those as term 0: NULLs never
+    # conflict in a unique index. The second index serves both
+    # whole-career and single-term lookups of a student's grades. IDs are
+    # never reused, as the archive and audit trail refer to them.
+    __table_args__ = (
+        db.Index(
+            'uq_grades_student_id_course_id_term_id',
+            'student_id', 'course_id', db.func.coalesce(term_id, db.literal_column('0')),
+            unique=True
+        ),
+        db.Index('ix_grades_student_id_term_id', 'student_id', 'term_id'),
+        {'sqlite_autoincrement': True}
+    )
+
     def __repr__(self):
         return f"<{self.percent_grade}%>"
         
     def save(self):
         db.session.add(self)
-        db.session.commit()
+        commit()
     
     def update(self):
-        db.session.commit()
+        commit()
 
     def delete(self):
         db.session.delete(self)
-        db.session.commit()
+        commit()
 
     @classmethod
     def get_by_id(cls, id):
-        return cls.query.get_or_404(id)
\ No newline at end of file
+        return cls.query.get_or_404(id)
+
+    @classmethod
+    def get_by_enrollment(cls, student_id, course_id, term_id, for_update=False):
+        query = cls.query.filter_by(student_id=student_id, course_id=course_id, term_id=term_id)
+        if for_update:
+            query = query.with_for_update()
+        return query.first()
+
+    # Insert the student's grade in a course and term, or overwrite the
+    # existing one, in a single statement keyed on the unique index
+    @classmethod
+    def upsert(cls, student_id, course_id, term_id, percent_grade, letter_grade):
+        table = cls.__table__
+        insert = UPSERT_INSERTS[db.session.get_bind().dialect.name]
+        stmt = insert(table).values(
+            student_id=student_id, course_id=course_id, term_id=term_id,
+            percent_grade=percent_grade, letter_grade=letter_grade
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.student_id, table.c.course_id, db.func.coalesce(table.c.term_id, db.literal_column('0'))],
+            set_={
+                'percent_grade': stmt.excluded.percent_grade,
+                'letter_grade': stmt.excluded.letter_grade
+            }
+        ).returning(table.c.id).execution_options(analytics_tracked=True)
+
+        grade_id = db.session.execute(stmt).scalar_one()
+        grade = db.session.get(cls, grade_id, populate_existing=True)
+        track_grade(grade)
+        return grade
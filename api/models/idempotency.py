@@ -0,0 +1,40 @@
+from ..utils import db
+from ..utils.unit_of_work import commit
+from datetime import datetime
+
+# Responses to requests sent with an Idempotency-Key header, so that a
+# retried request gets the original response instead of running again.
+# status_code stays empty while the first request is still running.
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_keys'
+    id = db.Column(db.Integer(), primary_key=True)
+    key = db.Column(db.String(100), nullable=False)
+    user_id = db.Column(db.Integer(), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    method = db.Column(db.String(10), nullable=False)
+    path = db.Column(db.String(200), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer(), nullable=True)
+    response = db.Column(db.Text(), nullable=True)
+    created_at = db.Column(db.DateTime(), nullable=False, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'key', name='uq_idempotency_keys_user_id_key'),
+    )
+
+    def __repr__(self):
+        return f"<Idempotency Key {self.key}>"
+
+    def save(self):
+        db.session.add(self)
+        commit()
+
+    def update(self):
+        commit()
+
+    def delete(self):
+        db.session.delete(self)
+        commit()
+
+    @classmethod
+    def get_by_key(cls, user_id, key):
+        return cls.query.filter_by(user_id=user_id, key=key).first()
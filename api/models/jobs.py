@@ -0,0 +1,36 @@
+from ..utils import db
+from ..utils.unit_of_work import commit
+from datetime import datetime
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    id = db.Column(db.String(32), primary_key=True)
+    name = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)
+    progress = db.Column(db.Integer(), nullable=False, default=0)
+    total = db.Column(db.Integer(), nullable=True)
+    result = db.Column(db.Text(), nullable=True)
+    result_path = db.Column(db.Text(), nullable=True)
+    error = db.Column(db.Text(), nullable=True)
+    created_by = db.Column(db.Integer(), nullable=True)
+    created_at = db.Column(db.DateTime(), nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime(), nullable=True)
+    finished_at = db.Column(db.DateTime(), nullable=True)
+
+    def __repr__(self):
+        return f"<Job {self.name} {self.status}>"
+
+    def save(self):
+        db.session.add(self)
+        commit()
+
+    def update(self):
+        commit()
+
+    def delete(self):
+        db.session.delete(self)
+        commit()
+
+    @classmethod
+    def get_by_id(cls, id):
+        return cls.query.get_or_404(id)
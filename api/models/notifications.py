@@ -0,0 +1,55 @@
+import json
+from ..utils import db
+from ..utils.unit_of_work import commit
+from datetime import datetime
+
+# Outbox of notifications to students about their grades. Rows are added in
+# the same transaction as the grade change they describe and delivered
+# afterwards by the notification dispatcher, so a grade is never published
+# without its notification and the upload never waits on delivery.
+class GradeNotification(db.Model):
+    __tablename__ = 'grade_notifications'
+    id = db.Column(db.Integer(), primary_key=True)
+    student_id = db.Column(db.Integer(), db.ForeignKey('students.id', ondelete='CASCADE'), nullable=False, index=True)
+    event = db.Column(db.String(20), nullable=False)
+    payload = db.Column(db.Text(), nullable=False)
+    status = db.Column(db.String(10), nullable=False, default='pending')
+    attempts = db.Column(db.Integer(), nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime(), nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text(), nullable=True)
+    created_at = db.Column(db.DateTime(), nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime(), nullable=True)
+
+    # The dispatcher's lookup of pending notifications that are due
+    __table_args__ = (
+        db.Index('ix_grade_notifications_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+    def __repr__(self):
+        return f"<Grade Notification {self.event} {self.status}>"
+
+    def save(self):
+        db.session.add(self)
+        commit()
+
+    @classmethod
+    def get_by_id(cls, id):
+        return cls.query.get_or_404(id)
+
+    # Add a notification about the grade to the current transaction
+    @classmethod
+    def queue(cls, event:str, grade, course):
+        notification = cls(
+            student_id = grade.student_id,
+            event = event,
+            payload = json.dumps({
+                'grade_id': grade.id,
+                'course_id': course.id,
+                'course_name': course.name,
+                'term_id': grade.term_id,
+                'percent_grade': grade.percent_grade,
+                'letter_grade': grade.letter_grade
+            })
+        )
+        notification.save()
+        return notification
@@ -0,0 +1,11 @@
+from ..utils import db
+
+# Token bucket state shared by every worker when RATELIMIT_STORAGE is 'database'
+class RateLimitBucket(db.Model):
+    __tablename__ = 'rate_limits'
+    key = db.Column(db.String(255), primary_key=True)
+    tokens = db.Column(db.Float(), nullable=False)
+    updated_at = db.Column(db.Float(), nullable=False)
+
+    def __repr__(self):
+        return f"<Rate Limit {self.key}>"
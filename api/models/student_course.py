@@ -1,35 +1,46 @@
 from ..utils import db
+from ..utils.unit_of_work import commit
 from .students import Student
 from .courses import Course
 
 class StudentCourse(db.Model):
     __tablename__ = 'student_course'
     id = db.Column(db.Integer(), primary_key=True)
-    student_id = db.Column(db.Integer(), db.ForeignKey('students.id'))
-    course_id = db.Column(db.Integer(), db.ForeignKey('courses.id'))
+    student_id = db.Column(db.Integer(), db.ForeignKey('students.id', ondelete='CASCADE'))
+    course_id = db.Column(db.Integer(), db.ForeignKey('courses.id', ondelete='CASCADE'), index=True)
+    term_id = db.Column(db.Integer(), db.ForeignKey('terms.id'), nullable=True)
+
+    # Serves both whole-career and single-term lookups of a student's courses.
+    # IDs are never reused, as archived enrollments keep them.
+    __table_args__ = (
+        db.Index('ix_student_course_student_id_term_id', 'student_id', 'term_id'),
+        {'sqlite_autoincrement': True}
+    )
 
     def __repr__(self):
         return f"<Student Course {self.id}>"
         
     def save(self):
         db.session.add(self)
-        db.session.commit()
+        commit()
     
     def update(self):
-        db.session.commit()
+        commit()
 
     def delete(self):
         db.session.delete(self)
-        db.session.commit()
+        commit()
 
     @classmethod
     def get_by_id(cls, id):
         return cls.query.get_or_404(id)
     
     @classmethod
-    def get_courses_by_student(cls, student_id):
-        courses = Course.query.join(StudentCourse).join(Student).filter(Student.id == student_id).all()
-        return courses
+    def get_courses_by_student(cls, student_id, term_id=None):
+        query = Course.query.join(StudentCourse).join(Student).filter(Student.id == student_id)
+        if term_id is not None:
+            query = query.filter(StudentCourse.term_id == term_id)
+        return query.all()
     
     @classmethod
     def get_students_in_course(cls, course_id):
@@ -1,12 +1,15 @@
+from sqlalchemy import delete
 from .users import User
 from ..utils import db
+from ..utils.unit_of_work import commit
 
 class Student(User):
     __tablename__ = 'students'
-    id = db.Column(db.Integer(), db.ForeignKey('users.id'), primary_key=True)
+    id = db.Column(db.Integer(), db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
     matric_no = db.Column(db.String(30), unique=True)
-    course = db.relationship('Course', secondary='student_course', lazy=True)
-    grade = db.relationship('Grade', backref='student_grade', lazy=True)
+    # Enrollments and grades are removed by ON DELETE CASCADE, not loaded and deleted here
+    course = db.relationship('Course', secondary='student_course', lazy=True, passive_deletes=True)
+    grade = db.relationship('Grade', backref='student_grade', lazy=True, passive_deletes=True)
 
     __mapper_args__ = {
         'polymorphic_identity': 'student'
@@ -17,15 +20,31 @@ class Student(User):
         
     def save(self):
         db.session.add(self)
-        db.session.commit()
+        commit()
     
     def update(self):
-        db.session.commit()
+        commit()
 
     def delete(self):
         db.session.delete(self)
-        db.session.commit()
+        commit()
 
     @classmethod
     def get_by_id(cls, id):
-        return cls.query.get_or_404(id)
\ No newline at end of file
+        return cls.query.get_or_404(id)
+
+    # Delete a student in one statement; the database cascades the delete to
+    # the students, student_course and grades rows. Returns False if not found.
+    @classmethod
+    def delete_by_id(cls, id) -> bool:
+        result = db.session.execute(delete(User).where(User.id == id, User.user_type == 'student'))
+        commit()
+        return result.rowcount > 0
+
+
+# Prefix index for matric number search on databases without FTS5
+db.Index(
+    'ix_students_matric_no_lower',
+    db.func.lower(Student.__table__.c.matric_no).label('matric_no_lower'),
+    postgresql_ops={'matric_no_lower': 'text_pattern_ops'}
+).ddl_if(dialect='postgresql')
\ No newline at end of file
@@ -0,0 +1,69 @@
+from ..utils import db
+from sqlalchemy import select, update
+from ..utils.unit_of_work import commit
+from datetime import datetime
+
+class Term(db.Model):
+    __tablename__ = 'terms'
+    id = db.Column(db.Integer(), primary_key=True)
+    name = db.Column(db.String(50), nullable=False, unique=True)
+    starts_on = db.Column(db.Date(), nullable=False)
+    ends_on = db.Column(db.Date(), nullable=False)
+    status = db.Column(db.String(10), nullable=False, default='open')
+    closed_at = db.Column(db.DateTime(), nullable=True)
+
+    def __repr__(self):
+        return f"<Term {self.name}>"
+
+    def save(self):
+        db.session.add(self)
+        commit()
+
+    def update(self):
+        commit()
+
+    @classmethod
+    def get_by_id(cls, id):
+        return cls.query.get_or_404(id)
+
+    # The latest open term, which new enrollments default to
+    @classmethod
+    def current(cls):
+        return cls.query.filter_by(status='open').order_by(cls.starts_on.desc(), cls.id.desc()).first()
+
+    # The term, if it is closing or closed and so takes no more grade changes.
+    # The term row is share-locked until the write commits, so a close request
+    # waits for grade writes already under way.
+    @classmethod
+    def closed(cls, id):
+        if id is None:
+            return None
+        term = db.session.execute(select(cls).where(cls.id == id).with_for_update(read=True)).scalar()
+        return term if term is not None and term.status != 'open' else None
+
+    # Move an open term to closing, returning False when it is not open. The
+    # conditional update lets only one of several close requests through.
+    @classmethod
+    def start_closing(cls, id) -> bool:
+        result = db.session.execute(update(cls).where(cls.id == id, cls.status == 'open').values(status='closing'))
+        commit()
+        return result.rowcount == 1
+
+
+# Term GPAs precomputed when a term is closed, one row per enrolled student
+class TermGPA(db.Model):
+    __tablename__ = 'term_gpa'
+    id = db.Column(db.Integer(), primary_key=True)
+    term_id = db.Column(db.Integer(), db.ForeignKey('terms.id', ondelete='CASCADE'), nullable=False)
+    student_id = db.Column(db.Integer(), db.ForeignKey('students.id', ondelete='CASCADE'), nullable=False, index=True)
+    courses = db.Column(db.Integer(), nullable=False)
+    graded = db.Column(db.Integer(), nullable=False)
+    gpa = db.Column(db.Float(), nullable=True)
+    computed_at = db.Column(db.DateTime(), nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('term_id', 'student_id', name='uq_term_gpa_term_id_student_id'),
+    )
+
+    def __repr__(self):
+        return f"<Term GPA {self.term_id} {self.student_id}>"
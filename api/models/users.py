@@ -1,13 +1,19 @@
 from ..utils import db
+from ..utils.unit_of_work import commit
 
 class User(db.Model):
     __tablename__ = 'users'
     id = db.Column(db.Integer(), primary_key=True)
-    first_name = db.Column(db.String(50), nullable=False)
-    last_name = db.Column(db.String(50), nullable=False)
+    first_name = db.Column(db.String(50), nullable=False, index=True)
+    last_name = db.Column(db.String(50), nullable=False, index=True)
     email = db.Column(db.String(50), nullable=False, unique=True)
     password_hash = db.Column(db.Text(), nullable=False)
-    user_type = db.Column(db.String(20))
+    user_type = db.Column(db.String(20), index=True)
+
+    # IDs are never reused, so archived students and tokens of deleted
+    # users never match a new account. PostgreSQL sequences never reuse
+    # IDs anyway; SQLite needs AUTOINCREMENT for it.
+    __table_args__ = {'sqlite_autoincrement': True}
 
     __mapper_args__ = {
         'polymorphic_on': user_type,
@@ -19,15 +25,24 @@ class User(db.Model):
 
     def save(self):
         db.session.add(self)
-        db.session.commit()        
+        commit()
     
     def update(self):
-        db.session.commit()
+        commit()
 
     def delete(self):
         db.session.delete(self)
-        db.session.commit()
+        commit()
 
     @classmethod
     def get_by_id(cls, id):
-        return cls.query.get_or_404(id)
\ No newline at end of file
+        return cls.query.get_or_404(id)
+
+
+# Prefix indexes for student search on databases without FTS5
+for name in ('first_name', 'last_name', 'email'):
+    db.Index(
+        f'ix_users_{name}_lower',
+        db.func.lower(User.__table__.c[name]).label(f'{name}_lower'),
+        postgresql_ops={f'{name}_lower': 'text_pattern_ops'}
+    ).ddl_if(dialect='postgresql')
\ No newline at end of file
@@ -3,11 +3,24 @@ from ..models.grades import Grade
 from ..models.courses import Course
 from ..models.students import Student
 from ..models.student_course import StudentCourse
+from ..models.terms import Term, TermGPA
 from ..utils.decorators import admin_required, get_user_type
 from ..utils.grade_conversions import get_letter_grade, convert_grade_to_gpa
+from ..utils.search import search_students
+from ..utils.filters import apply_filters, filter_params
+from ..utils.sparse import fields_param, requested_fields, sparse_query, marshal_fields, sparse_select, row_dicts
+from ..utils.audit import audit_log
+from ..utils.notifications import notifications
+from ..utils.unit_of_work import unit_of_work
+from ..utils.idempotency import idempotent, IDEMPOTENCY_HEADER
+from ..utils.terms import term_gpa_rows, term_gpa, closed_term_conflict
+from ..utils import db
+from sqlalchemy import select, and_
+from sqlalchemy.exc import IntegrityError
+from flask import request
 from werkzeug.security import generate_password_hash
 from http import HTTPStatus
-from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
 
 student_namespace = Namespace('students', description='Namespace for Students')
 
@@ -32,6 +45,20 @@ student_model = student_namespace.model(
     }
 )
 
+student_search_model = student_namespace.model(
+    'StudentSearch', {
+        'page': fields.Integer(description="Page Number"),
+        'per_page': fields.Integer(description="Results per Page"),
+        'has_next': fields.Boolean(description="Whether Another Page Exists"),
+        'results': fields.List(fields.Nested(student_model), description="Matching Students, Best Match First")
+    }
+)
+
+search_parser = student_namespace.parser()
+search_parser.add_argument('q', type=str, required=True, location='args', help="Partial Name, Email or Matriculation Number")
+search_parser.add_argument('page', type=int, default=1, location='args', help="Page Number")
+search_parser.add_argument('per_page', type=int, default=20, location='args', help="Results per Page, Maximum 100")
+
 student_course_model = student_namespace.model(
     'StudentCourse', {
         'student_id': fields.Integer(description="Student's User ID"),
@@ -53,33 +80,142 @@ grade_update_model = student_namespace.model(
     }
 )
 
+# Columns backing student_model, for reading lists without ORM instances
+student_columns = {
+    'id': Student.id,
+    'first_name': Student.first_name,
+    'last_name': Student.last_name,
+    'email': Student.email,
+    'matric_no': Student.matric_no,
+    'user_type': Student.user_type
+}
+
+student_filters = {
+    'matric_prefix': (Student.matric_no, 'prefix'),
+    'first_name': (Student.first_name, 'eq'),
+    'last_name': (Student.last_name, 'eq'),
+    'email': (Student.email, 'eq')
+}
+
+student_sorts = {
+    'id': Student.id,
+    'first_name': Student.first_name,
+    'last_name': Student.last_name,
+    'matric_no': Student.matric_no
+}
+
+grade_filters = {
+    'student_id': (Grade.student_id, 'eq'),
+    'course_id': (Grade.course_id, 'eq'),
+    'letter_grade': (Grade.letter_grade, 'eq'),
+    'min_percent': (Grade.percent_grade, 'min'),
+    'max_percent': (Grade.percent_grade, 'max'),
+    'term_id': (Grade.term_id, 'eq')
+}
+
+grade_sorts = {
+    'id': Grade.id,
+    'student_id': Grade.student_id,
+    'course_id': Grade.course_id,
+    'percent_grade': Grade.percent_grade
+}
+
+grade_list_model = student_namespace.model(
+    'GradeList', {
+        'id': fields.Integer(description="Grade ID"),
+        'student_id': fields.Integer(description="Student's User ID"),
+        'course_id': fields.Integer(description="Course ID"),
+        'term_id': fields.Integer(description="Term ID"),
+        'percent_grade': fields.Float(description="Grade in Percentage"),
+        'letter_grade': fields.String(description="Grade in Letter")
+    }
+)
+
+grade_list_columns = {
+    'id': Grade.id,
+    'student_id': Grade.student_id,
+    'course_id': Grade.course_id,
+    'term_id': Grade.term_id,
+    'percent_grade': Grade.percent_grade,
+    'letter_grade': Grade.letter_grade
+}
+
 # Verify student or admin access
 def is_student_or_admin(student_id:int) -> bool:
-    claims = get_jwt()
-    active_user_id = get_jwt_identity()
-    if (get_user_type(claims['sub']) == 'admin') or (active_user_id == student_id):
+    if (get_user_type() == 'admin') or (current_user.id == student_id):
         return True
     else:
         return False
 
+# A student's enrollments with their grade, if any, in enrollment order. A
+# course retaken in a later term is a separate enrollment with its own grade.
+def enrollment_grades(student_id:int, term_id:int=None) -> list:
+    stmt = (
+        select(
+            Course.name, StudentCourse.term_id, Grade.id, Grade.percent_grade, Grade.letter_grade
+        )
+        .select_from(StudentCourse)
+        .join(Course, Course.id == StudentCourse.course_id)
+        .outerjoin(Grade, and_(
+            Grade.student_id == StudentCourse.student_id,
+            Grade.course_id == StudentCourse.course_id,
+            Grade.term_id.is_not_distinct_from(StudentCourse.term_id)
+        ))
+        .where(StudentCourse.student_id == student_id)
+        .order_by(StudentCourse.id)
+    )
+    if term_id is not None:
+        stmt = stmt.where(StudentCourse.term_id == term_id)
+    return db.session.execute(stmt).all()
+
 
 @student_namespace.route('')
 class GetAllStudents(Resource):
 
-    @student_namespace.marshal_with(student_model)
+    @student_namespace.response(HTTPStatus.OK, 'Success', [student_model])
     @student_namespace.doc(
-        description = "Retrieve All Students - Admins Only"
+        description = "Retrieve All Students - Admins Only",
+        params = {**filter_params(student_filters, student_sorts), **fields_param(student_model)}
     )
     @admin_required()
     def get(self):
         """
             Retrieve All Students - Admins Only
         """
-        students = Student.query.all()
+        names = requested_fields(student_model)
+        students = row_dicts(apply_filters(sparse_select(student_columns, names), student_filters, student_sorts))
 
         return students, HTTPStatus.OK
 
 
+@student_namespace.route('/search')
+class SearchStudents(Resource):
+
+    @student_namespace.expect(search_parser)
+    @student_namespace.marshal_with(student_search_model)
+    @student_namespace.doc(
+        description = "Search Students by Name, Email or Matriculation Number - Admins Only"
+    )
+    @admin_required()
+    def get(self):
+        """
+            Search Students by Name, Email or Matriculation Number - Admins Only
+        """
+        args = search_parser.parse_args()
+        page = max(args['page'], 1)
+        per_page = min(max(args['per_page'], 1), 100)
+
+        results, has_next = search_students(args['q'], page=page, per_page=per_page)
+
+        search_resp = {}
+        search_resp['page'] = page
+        search_resp['per_page'] = per_page
+        search_resp['has_next'] = has_next
+        search_resp['results'] = results
+
+        return search_resp, HTTPStatus.OK
+
+
 @student_namespace.route('/register')
 class StudentRegistration(Resource):
 
@@ -125,10 +261,12 @@ class StudentRegistration(Resource):
 @student_namespace.route('/<int:student_id>')
 class GetUpdateDeleteStudents(Resource):
     
+    @student_namespace.response(HTTPStatus.OK, 'Success', student_model)
     @student_namespace.doc(
         description = "Retrieve a Student's Details by ID - Admins or Specific Student Only",
         params = {
-            'student_id': "The Student's ID"
+            'student_id': "The Student's ID",
+            **fields_param(student_model)
         }
     )
     @jwt_required()
@@ -137,18 +275,11 @@ class GetUpdateDeleteStudents(Resource):
             Retrieve a Student's Details by ID - Admins or Specific Student Only
         """
         if is_student_or_admin(student_id):
-            
-            student = Student.get_by_id(student_id)
 
-            student_resp = {}  
-            student_resp['id'] = student.id
-            student_resp['first_name'] = student.first_name
-            student_resp['last_name'] = student.last_name
-            student_resp['email'] = student.email
-            student_resp['matric_no'] = student.matric_no
-            student_resp['user_type'] = student.user_type
+            names = requested_fields(student_model)
+            student = sparse_query(Student, names).get_or_404(student_id)
 
-            return student_resp, HTTPStatus.OK
+            return marshal_fields(student, student_model, names), HTTPStatus.OK
         
         else:
             return {"message": "Admins or Specific Student Only"}, HTTPStatus.FORBIDDEN
@@ -202,9 +333,8 @@ class GetUpdateDeleteStudents(Resource):
         """
             Delete a Student by ID - Admins Only
         """
-        student = Student.get_by_id(student_id)
-
-        student.delete()
+        if not Student.delete_by_id(student_id):
+            return {"error": "Not Found"}, HTTPStatus.NOT_FOUND
 
         return {"message": "Student Successfully Deleted"}, HTTPStatus.OK
     
@@ -248,7 +378,8 @@ class GetAddUpdateGrades(Resource):
     @student_namespace.doc(
         description = "Retrieve a Student's Grades - Admins or Specific Student Only",
         params = {
-            'student_id': "The Student's ID"
+            'student_id': "The Student's ID",
+            'term_id': "Only Grades From This Term"
         }
     )
     @jwt_required()
@@ -259,25 +390,23 @@ class GetAddUpdateGrades(Resource):
         if is_student_or_admin(student_id):
 
             # Confirm existence of student
-            student = Student.query.filter_by(id=student_id).first()
+            student = db.session.get(Student, student_id)
             if not student:
                 return {"message": "Student Not Found"}, HTTPStatus.NOT_FOUND
             
-            # Retrieve the student's grades        
-            courses = StudentCourse.get_courses_by_student(student_id)
+            # Retrieve the student's grades, optionally for a single term
+            term_id = request.args.get('term_id', type=int)
             resp = []
 
-            for course in courses:
+            for course_name, enrollment_term_id, grade_id, percent_grade, letter_grade in enrollment_grades(student_id, term_id):
                 grade_resp = {}
-                grade_in_course = Grade.query.filter_by(
-                        student_id=student_id, course_id=course.id
-                    ).first()
-                grade_resp['course_name'] = course.name
-
-                if grade_in_course:
-                    grade_resp['grade_id'] = grade_in_course.id
-                    grade_resp['percent_grade'] = grade_in_course.percent_grade
-                    grade_resp['letter_grade'] = grade_in_course.letter_grade
+                grade_resp['course_name'] = course_name
+                grade_resp['term_id'] = enrollment_term_id
+
+                if grade_id is not None:
+                    grade_resp['grade_id'] = grade_id
+                    grade_resp['percent_grade'] = percent_grade
+                    grade_resp['letter_grade'] = letter_grade
                 else:
                     grade_resp['percent_grade'] = None
                     grade_resp['letter_grade'] = None
@@ -291,12 +420,15 @@ class GetAddUpdateGrades(Resource):
         
     @student_namespace.expect(grade_model)
     @student_namespace.doc(
-        description = "Upload a Student's Grade in a Course - Admins Only",
+        description = "Upload a Student's Grade in a Course - Admins Only. "
+            f"Send an {IDEMPOTENCY_HEADER} header to make retries safe",
         params = {
             'student_id': "The Student's ID"
         }
     )
     @admin_required()
+    @unit_of_work()
+    @idempotent()
     def post(self, student_id):
         """
             Upload a Student's Grade in a Course - Admins Only
@@ -307,19 +439,43 @@ class GetAddUpdateGrades(Resource):
         course = Course.get_by_id(id=data['course_id'])
         
         # Confirm that the student is taking the course
-        student_course = StudentCourse.query.filter_by(student_id=student_id, course_id=course.id).first()
+        student_course = StudentCourse.query.filter_by(
+                student_id=student_id, course_id=course.id
+            ).order_by(StudentCourse.id.desc()).first()
         if not student_course:
             return {"message": f"{student.first_name} {student.last_name} is not taking {course.name}"}, HTTPStatus.NOT_FOUND
+
+        conflict = closed_term_conflict(student_course.term_id)
+        if conflict:
+            return conflict
+
+        # A student has one grade per course and term, changed through PUT
+        grade_exists = {
+            "message": f"{student.first_name} {student.last_name} already has a grade in {course.name}, "
+                f"use PUT /students/{student_id}/grades/{course.id} to change it"
+        }, HTTPStatus.CONFLICT
+        if Grade.get_by_enrollment(student_id, course.id, student_course.term_id):
+            return grade_exists
         
         # Add a new grade
         new_grade = Grade(
             student_id = student_id,
             course_id = data['course_id'],
+            term_id = student_course.term_id,
             percent_grade = data['percent_grade'],
             letter_grade = get_letter_grade(data['percent_grade'])
         )
 
-        new_grade.save()
+        try:
+            new_grade.save()
+        except IntegrityError:
+            # Another request graded the student in between
+            db.session.rollback()
+            return grade_exists
+
+        audit_log.record('create', new_grade, admin_id=get_jwt_identity())
+
+        notifications.queue('published', new_grade, course)
 
         grade_resp = {}
         grade_resp['grade_id'] = new_grade.id
@@ -336,6 +492,94 @@ class GetAddUpdateGrades(Resource):
         return grade_resp, HTTPStatus.CREATED
         
 
+@student_namespace.route('/<int:student_id>/grades/<int:course_id>')
+class UpsertGrade(Resource):
+
+    @student_namespace.expect(grade_update_model)
+    @student_namespace.doc(
+        description = "Set a Student's Grade in a Course, Creating or Replacing It - Admins Only",
+        params = {
+            'student_id': "The Student's ID",
+            'course_id': "The Course's ID",
+            'term_id': "The Term of the Enrollment to Grade, Defaults to the Latest"
+        }
+    )
+    @admin_required()
+    @unit_of_work()
+    def put(self, student_id, course_id):
+        """
+            Set a Student's Grade in a Course - Admins Only
+        """
+        data = student_namespace.payload
+
+        student = Student.get_by_id(student_id)
+        course = Course.get_by_id(id=course_id)
+
+        # Confirm that the student is taking the course, in the given term if any
+        enrollments = StudentCourse.query.filter_by(student_id=student_id, course_id=course.id)
+        term_id = request.args.get('term_id', type=int)
+        if term_id is not None:
+            enrollments = enrollments.filter_by(term_id=term_id)
+        student_course = enrollments.order_by(StudentCourse.id.desc()).first()
+        if not student_course:
+            return {"message": f"{student.first_name} {student.last_name} is not taking {course.name}"}, HTTPStatus.NOT_FOUND
+
+        conflict = closed_term_conflict(student_course.term_id)
+        if conflict:
+            return conflict
+
+        # Lock the current grade, if any, so the audit trail records the value it replaces
+        old_grade = Grade.get_by_enrollment(student_id, course.id, student_course.term_id, for_update=True)
+        old_percent_grade = old_grade.percent_grade if old_grade else None
+        old_letter_grade = old_grade.letter_grade if old_grade else None
+
+        grade = Grade.upsert(
+            student_id = student_id,
+            course_id = course.id,
+            term_id = student_course.term_id,
+            percent_grade = data['percent_grade'],
+            letter_grade = get_letter_grade(data['percent_grade'])
+        )
+
+        if old_grade:
+            audit_log.record(
+                'update', grade, admin_id=get_jwt_identity(),
+                old_percent_grade=old_percent_grade, old_letter_grade=old_letter_grade
+            )
+        else:
+            audit_log.record('create', grade, admin_id=get_jwt_identity())
+
+        notifications.queue('updated' if old_grade else 'published', grade, course)
+
+        grade_resp = {}
+        grade_resp['grade_id'] = grade.id
+        grade_resp['student_id'] = grade.student_id
+        grade_resp['course_id'] = grade.course_id
+        grade_resp['term_id'] = grade.term_id
+        grade_resp['percent_grade'] = grade.percent_grade
+        grade_resp['letter_grade'] = grade.letter_grade
+
+        return grade_resp, HTTPStatus.OK if old_grade else HTTPStatus.CREATED
+
+
+@student_namespace.route('/grades')
+class GetAllGrades(Resource):
+
+    @student_namespace.response(HTTPStatus.OK, 'Success', [grade_list_model])
+    @student_namespace.doc(
+        description = "Retrieve All Grades - Admins Only",
+        params = filter_params(grade_filters, grade_sorts)
+    )
+    @admin_required()
+    def get(self):
+        """
+            Retrieve All Grades - Admins Only
+        """
+        grades = row_dicts(apply_filters(sparse_select(grade_list_columns, None), grade_filters, grade_sorts))
+
+        return grades, HTTPStatus.OK
+
+
 @student_namespace.route('/grades/<int:grade_id>')
 class UpdateDeleteGrade(Resource):
 
@@ -347,6 +591,7 @@ class UpdateDeleteGrade(Resource):
         }
     )
     @admin_required()
+    @unit_of_work()
     def put(self, grade_id):
         """
             Update a Grade - Admins Only
@@ -354,12 +599,26 @@ class UpdateDeleteGrade(Resource):
         data = student_namespace.payload
 
         grade = Grade.get_by_id(grade_id)
+
+        conflict = closed_term_conflict(grade.term_id)
+        if conflict:
+            return conflict
+
+        old_percent_grade = grade.percent_grade
+        old_letter_grade = grade.letter_grade
         
         grade.percent_grade = data['percent_grade']
         grade.letter_grade = get_letter_grade(data['percent_grade'])
         
         grade.update()
 
+        audit_log.record(
+            'update', grade, admin_id=get_jwt_identity(),
+            old_percent_grade=old_percent_grade, old_letter_grade=old_letter_grade
+        )
+
+        notifications.queue('updated', grade, db.session.get(Course, grade.course_id))
+
         grade_resp = {}
         grade_resp['grade_id'] = grade.id
         grade_resp['student_id'] = grade.student_id
@@ -376,14 +635,24 @@ class UpdateDeleteGrade(Resource):
         }
     )
     @admin_required()
+    @unit_of_work()
     def delete(self, grade_id):
         """
             Delete a Grade - Admins Only
         """
         grade = Grade.get_by_id(grade_id)
-        
+
+        conflict = closed_term_conflict(grade.term_id)
+        if conflict:
+            return conflict
+
         grade.delete()
 
+        audit_log.record(
+            'delete', grade, admin_id=get_jwt_identity(),
+            old_percent_grade=grade.percent_grade, old_letter_grade=grade.letter_grade
+        )
+
         return {"message": "Grade Successfully Deleted"}, HTTPStatus.OK
         
     
@@ -405,23 +674,162 @@ class GetStudentCGPA(Resource):
 
             student = Student.get_by_id(student_id)
             
-            courses = StudentCourse.get_courses_by_student(student_id)
+            enrollments = enrollment_grades(student_id)
             total_gpa = 0
             
-            for course in courses:
-                grade = Grade.query.filter_by(
-                        student_id=student_id, course_id=course.id
-                    ).first()
-                
-                if grade:
-                    letter_grade = grade.letter_grade
+            for course_name, term_id, grade_id, percent_grade, letter_grade in enrollments:
+                if grade_id is not None:
                     gpa = convert_grade_to_gpa(letter_grade)
                     total_gpa += gpa
                 
-            cgpa = total_gpa / len(courses)
+            cgpa = total_gpa / len(enrollments)
             round_cgpa = float("{:.2f}".format(cgpa))
 
             return {"message": f"{student.first_name} {student.last_name}'s CGPA is {round_cgpa}"}, HTTPStatus.OK
     
         else:
-            return {"message": "Admins or Specific Student Only"}, HTTPStatus.FORBIDDEN
\ No newline at end of file
+            return {"message": "Admins or Specific Student Only"}, HTTPStatus.FORBIDDEN
+
+
+@student_namespace.route('/<int:student_id>/summary')
+class GetStudentSummary(Resource):
+
+    @student_namespace.doc(
+        description = "Retrieve a Student's Profile, Courses, Grades and CGPA - Admins or Specific Student Only",
+        params = {
+            'student_id': "The Student's ID"
+        }
+    )
+    @jwt_required()
+    def get(self, student_id):
+        """
+            Retrieve a Student's Profile, Courses, Grades and CGPA - Admins or Specific Student Only
+        """
+        if is_student_or_admin(student_id):
+
+            student = Student.get_by_id(student_id)
+
+            # Enrollments and their grades in one query, one grade per course and
+            # term so that a course retaken in a later term counts each time
+            rows = db.session.execute(
+                select(
+                    Course.id, Course.name, Course.teacher, StudentCourse.term_id,
+                    Grade.id, Grade.percent_grade, Grade.letter_grade
+                )
+                .join(StudentCourse, StudentCourse.course_id == Course.id)
+                .outerjoin(Grade, and_(
+                    Grade.student_id == StudentCourse.student_id,
+                    Grade.course_id == Course.id,
+                    Grade.term_id.is_not_distinct_from(StudentCourse.term_id)
+                ))
+                .where(StudentCourse.student_id == student_id)
+                .order_by(StudentCourse.id, Grade.id)
+            ).all()
+
+            courses_resp = []
+            grades_resp = []
+            seen_courses = set()
+            seen_enrollments = set()
+            total_gpa = 0
+
+            for course_id, course_name, teacher, term_id, grade_id, percent_grade, letter_grade in rows:
+                if (course_id, term_id) in seen_enrollments:
+                    continue
+                seen_enrollments.add((course_id, term_id))
+
+                if course_id not in seen_courses:
+                    seen_courses.add(course_id)
+
+                    course_resp = {}
+                    course_resp['id'] = course_id
+                    course_resp['name'] = course_name
+                    course_resp['teacher'] = teacher
+                    courses_resp.append(course_resp)
+
+                grade_resp = {}
+                grade_resp['course_name'] = course_name
+                grade_resp['term_id'] = term_id
+                if grade_id is not None:
+                    grade_resp['grade_id'] = grade_id
+                    grade_resp['percent_grade'] = percent_grade
+                    grade_resp['letter_grade'] = letter_grade
+                    total_gpa += convert_grade_to_gpa(letter_grade)
+                else:
+                    grade_resp['percent_grade'] = None
+                    grade_resp['letter_grade'] = None
+                grades_resp.append(grade_resp)
+
+            cgpa = None
+            if grades_resp:
+                cgpa = float("{:.2f}".format(total_gpa / len(grades_resp)))
+
+            student_resp = {}
+            student_resp['id'] = student.id
+            student_resp['first_name'] = student.first_name
+            student_resp['last_name'] = student.last_name
+            student_resp['email'] = student.email
+            student_resp['matric_no'] = student.matric_no
+            student_resp['user_type'] = student.user_type
+
+            summary_resp = {}
+            summary_resp['profile'] = student_resp
+            summary_resp['courses'] = courses_resp
+            summary_resp['grades'] = grades_resp
+            summary_resp['cgpa'] = cgpa
+
+            return summary_resp, HTTPStatus.OK
+
+        else:
+            return {"message": "Admins or Specific Student Only"}, HTTPStatus.FORBIDDEN
+
+
+@student_namespace.route('/<int:student_id>/terms/<int:term_id>/gpa')
+class GetStudentTermGPA(Resource):
+
+    @student_namespace.doc(
+        description = "Retrieve a Student's GPA for a Term - Admins or Specific Student Only",
+        params = {
+            'student_id': "The Student's ID",
+            'term_id': "The Term's ID"
+        }
+    )
+    @jwt_required()
+    def get(self, student_id, term_id):
+        """
+            Retrieve a Student's GPA for a Term - Admins or Specific Student Only
+        """
+        if is_student_or_admin(student_id):
+
+            student = Student.get_by_id(student_id)
+            term = Term.get_by_id(term_id)
+
+            # Closed terms were aggregated by the rollover job; open terms are aggregated now
+            term_gpa_row = None
+            if term.status == 'closed':
+                term_gpa_row = TermGPA.query.filter_by(term_id=term.id, student_id=student.id).first()
+
+            if term_gpa_row is not None:
+                courses = term_gpa_row.courses
+                graded = term_gpa_row.graded
+                gpa = term_gpa_row.gpa
+            else:
+                rows = term_gpa_rows(term.id, [student.id])
+                if rows:
+                    _, courses, graded, points = rows[0]
+                else:
+                    courses, graded, points = 0, 0, 0.0
+                gpa = term_gpa(courses, points)
+
+            term_gpa_resp = {}
+            term_gpa_resp['student_id'] = student.id
+            term_gpa_resp['term_id'] = term.id
+            term_gpa_resp['term_name'] = term.name
+            term_gpa_resp['term_status'] = term.status
+            term_gpa_resp['courses'] = courses
+            term_gpa_resp['graded'] = graded
+            term_gpa_resp['gpa'] = gpa
+
+            return term_gpa_resp, HTTPStatus.OK
+
+        else:
+            return {"message": "Admins or Specific Student Only"}, HTTPStatus.FORBIDDEN
@@ -0,0 +1,165 @@
+from flask_restx import Namespace, Resource, fields, marshal
+from ..models.terms import Term, TermGPA
+from ..jobs.tasks import close_term
+from ..jobs.views import job_accepted
+from ..utils.decorators import admin_required
+from ..utils.filters import apply_filters, filter_params
+from ..utils.jobs import job_runner
+from http import HTTPStatus
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+term_namespace = Namespace('terms', description='Namespace for Academic Terms')
+
+term_model = term_namespace.model(
+    'Term', {
+        'id': fields.Integer(description="Term's ID"),
+        'name': fields.String(required=True, description="Term's Name, e.g. 2023/2024 First Semester"),
+        'starts_on': fields.Date(required=True, description="First Day of the Term"),
+        'ends_on': fields.Date(required=True, description="Last Day of the Term"),
+        'status': fields.String(description="Term Status: open, closing or closed"),
+        'closed_at': fields.DateTime(description="Time the Term Was Closed")
+    }
+)
+
+term_gpa_model = term_namespace.model(
+    'TermGPA', {
+        'student_id': fields.Integer(description="Student's User ID"),
+        'courses': fields.Integer(description="Courses Taken in the Term"),
+        'graded': fields.Integer(description="Courses Graded in the Term"),
+        'gpa': fields.Float(description="Term GPA"),
+        'computed_at': fields.DateTime(description="Time the GPA Was Computed")
+    }
+)
+
+term_gpa_filters = {
+    'student_id': (TermGPA.student_id, 'eq'),
+    'min_gpa': (TermGPA.gpa, 'min'),
+    'max_gpa': (TermGPA.gpa, 'max')
+}
+
+term_gpa_sorts = {
+    'student_id': TermGPA.student_id,
+    'gpa': TermGPA.gpa
+}
+
+
+@term_namespace.route('')
+class GetCreateTerms(Resource):
+
+    @term_namespace.marshal_with(term_model)
+    @term_namespace.doc(
+        description = "Retrieve All Terms"
+    )
+    @jwt_required()
+    def get(self):
+        """
+            Retrieve All Terms
+        """
+        terms = Term.query.order_by(Term.starts_on.desc(), Term.id.desc()).all()
+
+        return terms, HTTPStatus.OK
+
+    @term_namespace.expect(term_model)
+    @term_namespace.doc(
+        description = "Open a New Term - Admins Only"
+    )
+    @admin_required()
+    def post(self):
+        """
+            Open a New Term - Admins Only
+        """
+        data = term_namespace.payload
+
+        try:
+            starts_on = fields.Date().parse(data['starts_on'])
+            ends_on = fields.Date().parse(data['ends_on'])
+        except ValueError:
+            return {"message": "Dates Must Be in YYYY-MM-DD Format"}, HTTPStatus.BAD_REQUEST
+
+        if ends_on < starts_on:
+            return {"message": "A Term Cannot End Before It Starts"}, HTTPStatus.BAD_REQUEST
+
+        # Check if term already exists
+        term = Term.query.filter_by(name=data['name']).first()
+        if term:
+            return {"message": "Term Already Exists"}, HTTPStatus.CONFLICT
+
+        new_term = Term(
+            name = data['name'],
+            starts_on = starts_on,
+            ends_on = ends_on
+        )
+
+        new_term.save()
+
+        return marshal(new_term, term_model), HTTPStatus.CREATED
+
+
+@term_namespace.route('/<int:term_id>')
+class GetTerm(Resource):
+
+    @term_namespace.marshal_with(term_model)
+    @term_namespace.doc(
+        description = "Retrieve a Term by ID",
+        params = {
+            'term_id': "The Term's ID"
+        }
+    )
+    @jwt_required()
+    def get(self, term_id):
+        """
+            Retrieve a Term by ID
+        """
+        term = Term.get_by_id(term_id)
+
+        return term, HTTPStatus.OK
+
+
+@term_namespace.route('/<int:term_id>/close')
+class CloseTerm(Resource):
+
+    @term_namespace.doc(
+        description = "Close a Term and Precompute Its GPAs - Admins Only",
+        params = {
+            'term_id': "The Term's ID"
+        }
+    )
+    @admin_required()
+    def post(self, term_id):
+        """
+            Close a Term and Precompute Its GPAs - Admins Only
+        """
+        term = Term.get_by_id(term_id)
+        if not Term.start_closing(term.id):
+            return {"message": f"{term.name} Is Already Closing or Closed"}, HTTPStatus.CONFLICT
+
+        job = job_runner.submit('close_term', close_term, created_by=get_jwt_identity(), term_id=term.id)
+
+        return job_accepted(job)
+
+
+@term_namespace.route('/<int:term_id>/gpa')
+class GetTermGPAs(Resource):
+
+    @term_namespace.response(HTTPStatus.OK, 'Success', [term_gpa_model])
+    @term_namespace.doc(
+        description = "Retrieve the Precomputed GPAs of a Closed Term - Admins Only",
+        params = {
+            'term_id': "The Term's ID",
+            **filter_params(term_gpa_filters, term_gpa_sorts)
+        }
+    )
+    @admin_required()
+    def get(self, term_id):
+        """
+            Retrieve the Precomputed GPAs of a Closed Term - Admins Only
+        """
+        term = Term.get_by_id(term_id)
+        if term.status != 'closed':
+            return {"message": f"{term.name} Is Still Open"}, HTTPStatus.CONFLICT
+
+        term_gpas = apply_filters(
+            TermGPA.query.filter_by(term_id=term.id), term_gpa_filters, term_gpa_sorts, default_sort='student_id'
+        ).all()
+
+        return marshal(term_gpas, term_gpa_model), HTTPStatus.OK
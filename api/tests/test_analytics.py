@@ -0,0 +1,194 @@
+import unittest
+from .. import create_app
+from ..config.config import config_dict
+from ..utils import db
+from ..models.admin import Admin
+from ..models.grades import Grade
+from flask_jwt_extended import create_access_token
+
+class AnalyticsTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self.app = create_app(config=config_dict['test'])
+
+        self.appctx = self.app.app_context()
+
+        self.appctx.push()
+
+        self.client = self.app.test_client()
+
+        db.create_all()
+
+
+    def tearDown(self):
+
+        db.drop_all()
+
+        self.appctx.pop()
+
+        self.app = None
+
+        self.client = None
+
+
+    def test_grade_analytics(self):
+
+        # Activate a test admin
+        admin_signup_data = {
+            "first_name": "Test",
+            "last_name": "Admin",
+            "email": "testadmin@gmail.com",
+            "password": "password"
+        }
+
+        response = self.client.post('/admin/register', json=admin_signup_data)
+
+        admin = Admin.query.filter_by(email='testadmin@gmail.com').first()
+
+        token = create_access_token(identity=admin.id)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+
+        # Three students in two courses
+        for number in range(1, 4):
+            student_signup_data = {
+                "first_name": "Test",
+                "last_name": f"Student{number}",
+                "email": f"teststudent{number}@gmail.com",
+                "password": "password",
+                "matric_no": f"ZSCH/23/03/000{number}"
+            }
+
+            response = self.client.post('/students/register', json=student_signup_data, headers=headers)
+
+        for name, teacher in (("First Course", "First Teacher"), ("Second Course", "Second Teacher")):
+            response = self.client.post('/courses', json={"name": name, "teacher": teacher}, headers=headers)
+
+        for course_id in (1, 2):
+            for student_id in (2, 3, 4):
+                response = self.client.post(f'/courses/{course_id}/students/{student_id}', headers=headers)
+
+
+        # Grades written before the index is first read are picked up by its build
+        response = self.client.post('/students/2/grades', json={"course_id": 1, "percent_grade": 92.0}, headers=headers)
+
+        response = self.client.post('/students/3/grades', json={"course_id": 1, "percent_grade": 45.0}, headers=headers)
+
+        response = self.client.get('/analytics/index', headers=headers)
+
+        assert response.status_code == 200
+
+        assert response.json["grades"] == 2
+
+        assert response.json["bytes"] > 0
+
+        assert response.json["stale"] is False
+
+        built_at = response.json["built_at"]
+
+
+        # Later writes are applied as they commit, without a rebuild: an ORM
+        # insert, a Core upsert and an ORM update
+        response = self.client.post('/students/4/grades', json={"course_id": 1, "percent_grade": 71.5}, headers=headers)
+
+        response = self.client.put('/students/2/grades/2', json={"percent_grade": 38.0}, headers=headers)
+
+        assert response.status_code == 201
+
+        response = self.client.put('/students/grades/2', json={"percent_grade": 55.0}, headers=headers)
+
+        response = self.client.get('/analytics/distribution?course_id=1', headers=headers)
+
+        assert response.status_code == 200
+
+        assert response.json["count"] == 3
+
+        assert response.json["mean"] == 72.83
+
+        assert response.json["min"] == 55.0
+
+        assert response.json["max"] == 92.0
+
+        assert response.json["letters"] == {"A": 1, "B": 0, "C": 1, "D": 0, "E": 1, "F": 0}
+
+        assert response.json["histogram"][5] == {"low": 50.0, "high": 60.0, "count": 1}
+
+        # The first read built the index, the later one found it ready
+        response = self.client.get('/metrics')
+
+        assert 'cache_requests_total{cache="grade_analytics",result="miss"} 1' in response.text
+
+        assert 'cache_requests_total{cache="grade_analytics",result="hit"} 1' in response.text
+
+        response = self.client.get('/analytics/courses', headers=headers)
+
+        assert response.json == [
+            {"course_id": 1, "count": 3, "mean": 72.83, "min": 55.0, "max": 92.0},
+            {"course_id": 2, "count": 1, "mean": 38.0, "min": 38.0, "max": 38.0}
+        ]
+
+        response = self.client.get('/analytics/at-risk?threshold=60', headers=headers)
+
+        assert response.json == {
+            "threshold": 60.0,
+            "total": 2,
+            "grades": [
+                {"student_id": 2, "course_id": 2, "grade_id": 4, "percent_grade": 38.0},
+                {"student_id": 3, "course_id": 1, "grade_id": 2, "percent_grade": 55.0}
+            ]
+        }
+
+        response = self.client.get('/analytics/at-risk?threshold=60&course_id=2&limit=1', headers=headers)
+
+        assert response.json["total"] == 1
+
+        response = self.client.get('/analytics/index', headers=headers)
+
+        assert response.json["grades"] == 4
+
+        assert response.json["built_at"] == built_at
+
+
+        # Deleting a grade removes it, a rolled back change never shows up
+        response = self.client.delete('/students/grades/4', headers=headers)
+
+        db.session.add(Grade(student_id=2, course_id=2, percent_grade=10.0))
+        db.session.flush()
+        db.session.rollback()
+
+        response = self.client.get('/analytics/distribution?course_id=2', headers=headers)
+
+        assert response.json["count"] == 0
+
+        assert response.json["mean"] is None
+
+
+        # Deleting a student cascades to their grades in the database, so the
+        # index is rebuilt before the next query
+        response = self.client.delete('/students/2', headers=headers)
+
+        assert response.status_code == 200
+
+        response = self.client.get('/analytics/index', headers=headers)
+
+        assert response.json["grades"] == 2
+
+        assert response.json["stale"] is False
+
+        response = self.client.get('/analytics/distribution', headers=headers)
+
+        assert response.json["count"] == 2
+
+        assert response.json["mean"] == 63.25
+
+
+        # Students cannot read the analytics
+        student_token = create_access_token(identity=3)
+
+        response = self.client.get('/analytics/courses', headers={"Authorization": f"Bearer {student_token}"})
+
+        assert response.status_code == 403
@@ -0,0 +1,167 @@
+import unittest
+from .. import create_app
+from ..config.config import config_dict
+from ..utils import db
+from ..utils.search import search_students
+from ..models.admin import Admin
+from ..models.users import User
+from ..models.grades import Grade
+from ..models.students import Student
+from ..models.student_course import StudentCourse
+from ..models.terms import TermGPA
+from flask_jwt_extended import create_access_token
+
+class ArchiveTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self.app = create_app(config=config_dict['test'])
+
+        self.appctx = self.app.app_context()
+
+        self.appctx.push()
+
+        self.client = self.app.test_client()
+
+        db.create_all()
+
+
+    def tearDown(self):
+
+        db.drop_all()
+
+        self.appctx.pop()
+
+        self.app = None
+
+        self.client = None
+
+
+    def test_archive(self):
+
+        # Activate a test admin
+        admin_signup_data = {
+            "first_name": "Test",
+            "last_name": "Admin",
+            "email": "testadmin@gmail.com",
+            "password": "password"
+        }
+
+        response = self.client.post('/admin/register', json=admin_signup_data)
+
+        admin = Admin.query.filter_by(email='testadmin@gmail.com').first()
+
+        token = create_access_token(identity=admin.id)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+
+        # Import a graduating cohort and a current one
+        student_import_data = {
+            "students": [
+                {
+                    "first_name": "Test",
+                    "last_name": f"Student{number}",
+                    "email": f"teststudent{number}@gmail.com",
+                    "password": "password",
+                    "matric_no": matric_no
+                }
+                for number, matric_no in enumerate(["ZSCH/19/03/0001", "ZSCH/19/03/0002", "ZSCH/23/03/0001"], start=1)
+            ]
+        }
+
+        response = self.client.post('/terms', json={"name": "2019/2020 First Semester", "starts_on": "2019-09-01", "ends_on": "2020-01-31"}, headers=headers)
+
+        response = self.client.post('/jobs/students/import', json=student_import_data, headers=headers)
+
+        response = self.client.post('/courses', json={"name": "Test Course", "teacher": "Test Teacher"}, headers=headers)
+
+        for student_id in (2, 3, 4):
+            response = self.client.post(f'/courses/1/students/{student_id}', headers=headers)
+
+        response = self.client.post('/students/2/grades', json={"course_id": 1, "percent_grade": 72.0}, headers=headers)
+
+        response = self.client.post('/students/4/grades', json={"course_id": 1, "percent_grade": 55.0}, headers=headers)
+
+        response = self.client.post('/terms/1/close', headers=headers)
+
+        assert TermGPA.query.count() == 3
+
+
+        # Archive the 2019 cohort
+        response = self.client.post('/jobs/students/archive', json={"matric_prefix": "ZSCH/19/"}, headers=headers)
+
+        assert response.status_code == 202
+
+        response = self.client.get(f'/jobs/{response.json["id"]}', headers=headers)
+
+        assert response.json["status"] == "succeeded"
+
+        assert response.json["result"] == "Archived 2 students, 2 enrollments and 1 grades"
+
+
+        # The cohort is gone from the hot tables, the other students are not
+        assert [student.matric_no for student in Student.query.all()] == ["ZSCH/23/03/0001"]
+
+        assert User.query.filter(User.id.in_([2, 3])).count() == 0
+
+        assert StudentCourse.query.count() == 1
+
+        assert [grade.student_id for grade in Grade.query.all()] == [4]
+
+        assert [term_gpa.student_id for term_gpa in TermGPA.query.all()] == [4]
+
+        assert search_students("ZSCH/19") == ([], False)
+
+
+        # Archived students and transcripts are still readable
+        response = self.client.get('/archive/students?matric_prefix=ZSCH/19/', headers=headers)
+
+        assert response.status_code == 200
+
+        assert [student["matric_no"] for student in response.json] == ["ZSCH/19/03/0001", "ZSCH/19/03/0002"]
+
+        response = self.client.get('/archive/students/2/transcript', headers=headers)
+
+        assert response.status_code == 200
+
+        assert response.json["profile"]["matric_no"] == "ZSCH/19/03/0001"
+
+        assert response.json["grades"] == [{
+            "course_id": 1,
+            "course_name": "Test Course",
+            "term_id": 1,
+            "percent_grade": 72.0,
+            "letter_grade": "C"
+        }]
+
+        assert response.json["terms"] == [{
+            "term_id": 1,
+            "courses": 1,
+            "graded": 1,
+            "gpa": 2.3
+        }]
+
+        assert response.json["cgpa"] == 2.3
+
+        response = self.client.get('/archive/students/4/transcript', headers=headers)
+
+        assert response.status_code == 404
+
+
+        # Archiving the newest rows does not free their IDs for new ones
+        response = self.client.post('/jobs/students/archive', json={"matric_prefix": "ZSCH/23/"}, headers=headers)
+
+        response = self.client.post('/students/register', json={
+            "first_name": "Test",
+            "last_name": "Student5",
+            "email": "teststudent5@gmail.com",
+            "password": "password",
+            "matric_no": "ZSCH/24/03/0001"
+        }, headers=headers)
+
+        assert response.status_code == 201
+
+        assert response.json["id"] == 5
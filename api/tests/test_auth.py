@@ -0,0 +1,169 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from .. import create_app
+from ..config.config import config_dict
+from ..utils import db
+from ..utils.ratelimit import MemoryBackend
+from ..models.admin import Admin
+from flask_jwt_extended import create_access_token
+
+class AuthTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self.app = create_app(config=config_dict['test'])
+
+        self.appctx = self.app.app_context()
+
+        self.appctx.push()
+
+        self.client = self.app.test_client()
+
+        db.create_all()
+
+
+    def tearDown(self):
+
+        db.drop_all()
+
+        self.appctx.pop()
+
+        self.app = None
+
+        self.client = None
+
+
+    def test_login_throttling(self):
+
+        # Register an admin
+        admin_signup_data = {
+            "first_name": "Test",
+            "last_name": "Admin",
+            "email": "testadmin@gmail.com",
+            "password": "password"
+        }
+
+        response = self.client.post('/admin/register', json=admin_signup_data)
+
+
+        # Wrong passwords are rejected
+        bad_login_data = {
+            "email": "testadmin@gmail.com",
+            "password": "wrong"
+        }
+
+        for attempt in range(5):
+            response = self.client.post('/auth/login', json=bad_login_data)
+
+            assert response.status_code == 401
+
+
+        # Further attempts on the account are throttled before any hashing
+        with mock.patch('api.auth.views.check_password_hash') as check_password_hash:
+            response = self.client.post('/auth/login', json=bad_login_data)
+
+            assert check_password_hash.call_count == 0
+
+        assert response.status_code == 429
+
+        assert int(response.headers["Retry-After"]) >= 1
+
+
+        # Other accounts from the same address are unaffected until the address limit
+        response = self.client.post('/auth/login', json={"email": "nobody@gmail.com", "password": "wrong"})
+
+        assert response.status_code == 401
+
+
+        # Hit counters are kept per limiter
+        admin = Admin.query.filter_by(email='testadmin@gmail.com').first()
+
+        token = create_access_token(identity=admin.id)
+
+        response = self.client.get('/auth/limits', headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 200
+
+        assert response.json == {
+            "login_ip": {"allowed": 7, "throttled": 0},
+            "login_account": {"allowed": 6, "throttled": 1}
+        }
+
+
+    def test_shared_database_limits(self):
+
+        tmpdir = tempfile.TemporaryDirectory()
+
+        class SharedLimitConfig(config_dict['test']):
+            RATE_LIMITS = {
+                'login_ip': (20, 60),
+                'login_account': (2, 60)
+            }
+            RATELIMIT_STORAGE = 'database'
+            RATELIMIT_STORAGE_URI = 'sqlite:///' + os.path.join(tmpdir.name, 'limits.sqlite3')
+
+        # Two apps stand in for two worker processes sharing the limit store
+        workers = [create_app(config=SharedLimitConfig) for _ in range(2)]
+
+        statuses = []
+        for worker in workers + workers:
+            with worker.app_context():
+                db.create_all()
+                response = worker.test_client().post(
+                    '/auth/login', json={"email": "nobody@gmail.com", "password": "wrong"}
+                )
+                statuses.append(response.status_code)
+
+        assert statuses == [401, 401, 429, 429]
+
+        for worker in workers:
+            worker.extensions['rate_limits']['login_account'].backend.engine.dispose()
+
+        tmpdir.cleanup()
+
+
+    def test_trusted_proxy_addresses(self):
+
+        class ProxiedConfig(config_dict['test']):
+            RATE_LIMITS = {
+                'login_ip': (2, 60),
+                'login_account': (5, 60)
+            }
+            TRUSTED_PROXIES = 1
+
+        app = create_app(config=ProxiedConfig)
+
+        with app.app_context():
+            db.create_all()
+
+            client = app.test_client()
+
+            # Clients behind the proxy are throttled by their own address
+            statuses = []
+            for address in ("203.0.113.1", "203.0.113.1", "203.0.113.1", "203.0.113.2"):
+                response = client.post(
+                    '/auth/login', json={"email": f"nobody{len(statuses)}@gmail.com", "password": "wrong"},
+                    headers={"X-Forwarded-For": address}
+                )
+                statuses.append(response.status_code)
+
+            assert statuses == [401, 401, 429, 401]
+
+            db.drop_all()
+
+
+    def test_memory_backend_eviction(self):
+
+        backend = MemoryBackend(max_keys=3)
+
+        # An address spraying many accounts keeps its own partly drained
+        # bucket, as every attempt uses it again
+        for number in range(10):
+            allowed, tokens = backend.take("login_ip:attacker", 20.0, 0.0, 0.0)
+            backend.take(f"login_account:victim{number}@gmail.com", 5.0, 0.0, 0.0)
+
+        assert tokens == 10.0
+
+        assert len(backend.buckets) == 3
@@ -0,0 +1,116 @@
+import gzip
+import json
+import unittest
+from .. import create_app
+from ..config.config import config_dict
+from ..utils import db
+from ..utils.compression import compression
+from ..models.admin import Admin
+from flask import Response
+from flask_jwt_extended import create_access_token
+
+class CompressionTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self.app = create_app(config=config_dict['test'])
+
+        self.appctx = self.app.app_context()
+
+        self.appctx.push()
+
+        self.client = self.app.test_client()
+
+        db.create_all()
+
+
+    def tearDown(self):
+
+        db.drop_all()
+
+        self.appctx.pop()
+
+        self.app = None
+
+        self.client = None
+
+
+    def test_compression(self):
+
+        # Serve a streamed CSV, as file exports do
+        @self.app.route('/stream')
+        def stream():
+            return Response((f"{i},row {i}\n" for i in range(1000)), mimetype='text/csv')
+
+        # Activate a test admin
+        admin_signup_data = {
+            "first_name": "Test",
+            "last_name": "Admin",
+            "email": "testadmin@gmail.com",
+            "password": "password"
+        }
+
+        response = self.client.post('/admin/register', json=admin_signup_data)
+
+        admin = Admin.query.filter_by(email='testadmin@gmail.com').first()
+
+        token = create_access_token(identity=admin.id)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+        for i in range(50):
+            response = self.client.post('/courses', json={"name": f"Course {i}", "teacher": f"Teacher {i}"}, headers=headers)
+
+
+        # Large responses are compressed when the client accepts gzip
+        response = self.client.get('/courses', headers=headers)
+
+        assert 'Content-Encoding' not in response.headers
+
+        assert 'Accept-Encoding' in response.headers['Vary']
+
+        uncompressed = response.data
+
+        response = self.client.get('/courses', headers={**headers, "Accept-Encoding": "gzip"})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+
+        assert int(response.headers['Content-Length']) == len(response.data) < len(uncompressed)
+
+        assert json.loads(gzip.decompress(response.data)) == json.loads(uncompressed)
+
+
+        # Clients refusing gzip get the identity encoding
+        response = self.client.get('/courses', headers={**headers, "Accept-Encoding": "gzip;q=0"})
+
+        assert 'Content-Encoding' not in response.headers
+
+
+        # Small responses are sent as they are
+        response = self.client.get('/courses/1', headers={**headers, "Accept-Encoding": "gzip"})
+
+        assert 'Content-Encoding' not in response.headers
+
+        assert response.json["name"] == "Course 0"
+
+
+        # Streamed responses are compressed incrementally
+        response = self.client.get('/stream', headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+
+        assert 'Content-Length' not in response.headers
+
+        lines = gzip.decompress(response.data).decode().splitlines()
+
+        assert len(lines) == 1000 and lines[-1] == "999,row 999"
+
+
+        # Ratio and time are recorded per encoding
+        stats = compression.stats()
+
+        assert stats['gzip']['responses'] == 2
+
+        assert 0 < stats['gzip']['ratio'] < 1
@@ -4,7 +4,10 @@ from ..config.config import config_dict
 from ..utils import db
 from ..models.admin import Admin
 from ..models.courses import Course
+from ..models.grades import Grade
+from ..models.student_course import StudentCourse
 from flask_jwt_extended import create_access_token
+from sqlalchemy import event
 
 class CourseTestCase(unittest.TestCase):
     
@@ -145,7 +148,8 @@ class CourseTestCase(unittest.TestCase):
             "student_id": 2,
             "student_first_name": "Test",
             "student_last_name": "Student",
-            "student_matric_no": "ZSCH/23/03/0001"
+            "student_matric_no": "ZSCH/23/03/0001",
+            "term_id": None
         }
 
 
@@ -169,4 +173,315 @@ class CourseTestCase(unittest.TestCase):
 
         # Delete a course
         response = self.client.delete('/courses/1', headers=headers)
-        assert response.status_code == 200
\ No newline at end of file
+        assert response.status_code == 200
+
+    def test_course_filters(self):
+
+        # Activate a test admin
+        admin_signup_data = {
+            "first_name": "Test",
+            "last_name": "Admin",
+            "email": "testadmin@gmail.com",
+            "password": "password"
+        }
+
+        response = self.client.post('/admin/register', json=admin_signup_data)
+
+        admin = Admin.query.filter_by(email='testadmin@gmail.com').first()
+
+        token = create_access_token(identity=admin.id)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+
+        # Register test courses
+        for name, teacher in [("Biology", "Teacher B"), ("Algebra", "Teacher A"), ("Chemistry", "Teacher C")]:
+            response = self.client.post('/courses', json={"name": name, "teacher": teacher}, headers=headers)
+
+
+        # Filter courses by teacher
+        response = self.client.get('/courses?teacher=Teacher A', headers=headers)
+
+        assert response.status_code == 200
+
+        assert response.json == [{
+            "id": 2,
+            "name": "Algebra",
+            "teacher": "Teacher A"
+        }]
+
+
+        # Sort courses by name, descending
+        response = self.client.get('/courses?sort=-name', headers=headers)
+
+        assert response.status_code == 200
+
+        assert [course["name"] for course in response.json] == ["Chemistry", "Biology", "Algebra"]
+
+
+        # Filter by name prefix and sort ascending
+        response = self.client.get('/courses?name_prefix=b&sort=name', headers=headers)
+
+        assert [course["name"] for course in response.json] == ["Biology"]
+
+
+        # Sorting outside the allow-list is rejected
+        response = self.client.get('/courses?sort=password', headers=headers)
+
+        assert response.status_code == 400
+
+
+        # Filter users by type
+        response = self.client.get('/auth/users?user_type=admin&sort=-id', headers=headers)
+
+        assert response.status_code == 200
+
+        assert [user["email"] for user in response.json] == ["testadmin@gmail.com"]
+
+
+    def test_course_fields(self):
+
+        # Activate a test admin
+        admin_signup_data = {
+            "first_name": "Test",
+            "last_name": "Admin",
+            "email": "testadmin@gmail.com",
+            "password": "password"
+        }
+
+        response = self.client.post('/admin/register', json=admin_signup_data)
+
+        admin = Admin.query.filter_by(email='testadmin@gmail.com').first()
+
+        token = create_access_token(identity=admin.id)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+        response = self.client.post('/courses', json={"name": "Biology", "teacher": "Teacher B"}, headers=headers)
+
+
+        # Only the requested fields are selected and returned
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = self.client.get('/courses?fields=id,name', headers=headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        assert response.status_code == 200
+
+        assert response.json == [{"id": 1, "name": "Biology"}]
+
+        course_selects = [statement for statement in statements if 'FROM courses' in statement]
+
+        assert course_selects and all('courses.teacher' not in statement for statement in course_selects)
+
+
+        # Detail resources accept fields too
+        response = self.client.get('/courses/1?fields=teacher', headers=headers)
+
+        assert response.json == {"teacher": "Teacher B"}
+
+        response = self.client.get(f'/admin/{admin.id}?fields=email', headers=headers)
+
+        assert response.json == {"email": "testadmin@gmail.com"}
+
+
+        # Fields outside the Swagger model are rejected
+        response = self.client.get('/courses?fields=id,password', headers=headers)
+
+        assert response.status_code == 400
+
+        response = self.client.get('/admin?fields=password_hash', headers=headers)
+
+        assert response.status_code == 400
+
+
+    def test_course_delete_cascades(self):
+
+        # Activate a test admin
+        admin_signup_data = {
+            "first_name": "Test",
+            "last_name": "Admin",
+            "email": "testadmin@gmail.com",
+            "password": "password"
+        }
+
+        response = self.client.post('/admin/register', json=admin_signup_data)
+
+        admin = Admin.query.filter_by(email='testadmin@gmail.com').first()
+
+        token = create_access_token(identity=admin.id)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+
+        # Enroll and grade students in a course
+        response = self.client.post('/courses', json={"name": "Biology", "teacher": "Teacher B"}, headers=headers)
+
+        response = self.client.post('/jobs/students/import', json={"students": [
+            {
+                "first_name": "Test",
+                "last_name": f"Student{number}",
+                "email": f"teststudent{number}@gmail.com",
+                "password": "password",
+                "matric_no": f"ZSCH/23/03/000{number}"
+            }
+            for number in range(1, 4)
+        ]}, headers=headers)
+
+        for student_id in (2, 3, 4):
+            response = self.client.post(f'/courses/1/students/{student_id}', headers=headers)
+            response = self.client.post(f'/students/{student_id}/grades', json={"course_id": 1, "percent_grade": 70.0}, headers=headers)
+
+        assert StudentCourse.query.count() == 3 and Grade.query.count() == 3
+
+
+        # Deleting the course is a single DELETE, cascaded by the database
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = self.client.delete('/courses/1', headers=headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        assert response.status_code == 200
+
+        assert [statement for statement in statements if statement.startswith('DELETE')] == [
+            "DELETE FROM courses WHERE courses.id = ?"
+        ]
+
+        assert StudentCourse.query.count() == 0 and Grade.query.count() == 0
+
+        response = self.client.delete('/courses/1', headers=headers)
+
+        assert response.status_code == 404
+
+    def test_course_gradebook(self):
+
+        # Activate a test admin
+        admin_signup_data = {
+            "first_name": "Test",
+            "last_name": "Admin",
+            "email": "testadmin@gmail.com",
+            "password": "password"
+        }
+
+        response = self.client.post('/admin/register', json=admin_signup_data)
+
+        admin = Admin.query.filter_by(email='testadmin@gmail.com').first()
+
+        token = create_access_token(identity=admin.id)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+
+        # Enroll three students and grade two of them
+        response = self.client.post('/courses', json={"name": "Test Course", "teacher": "Test Teacher"}, headers=headers)
+
+        for number, last_name in enumerate(("Okafor", "Adeyemi", "Balogun"), start=1):
+            student_signup_data = {
+                "first_name": "Test",
+                "last_name": last_name,
+                "email": f"student{number}@gmail.com",
+                "password": "password",
+                "matric_no": f"ZSCH/23/03/000{number}"
+            }
+
+            response = self.client.post('/students/register', json=student_signup_data, headers=headers)
+
+            response = self.client.post(f'/courses/1/students/{number + 1}', headers=headers)
+
+        response = self.client.put('/students/2/grades/1', json={"percent_grade": 91.0}, headers=headers)
+
+        response = self.client.put('/students/3/grades/1', json={"percent_grade": 64.5}, headers=headers)
+
+
+        # The whole grid comes from one query, sorted by name
+        statements = []
+
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', count_statement)
+
+        response = self.client.get('/courses/1/gradebook', headers=headers)
+
+        event.remove(db.engine, 'before_cursor_execute', count_statement)
+
+        assert response.status_code == 200
+
+        assert sum('student_course' in statement for statement in statements) == 1
+
+        assert response.json["course"] == {"id": 1, "name": "Test Course", "teacher": "Test Teacher"}
+
+        assert response.json["has_next"] is False
+
+        assert response.json["rows"] == [
+            {
+                "student_id": 3, "first_name": "Test", "last_name": "Adeyemi", "matric_no": "ZSCH/23/03/0002",
+                "term_id": None, "grade_id": 2, "percent_grade": 64.5, "letter_grade": "D"
+            },
+            {
+                "student_id": 4, "first_name": "Test", "last_name": "Balogun", "matric_no": "ZSCH/23/03/0003",
+                "term_id": None, "grade_id": None, "percent_grade": None, "letter_grade": None
+            },
+            {
+                "student_id": 2, "first_name": "Test", "last_name": "Okafor", "matric_no": "ZSCH/23/03/0001",
+                "term_id": None, "grade_id": 1, "percent_grade": 91.0, "letter_grade": "A"
+            }
+        ]
+
+
+        # Pages
+        response = self.client.get('/courses/1/gradebook?per_page=2', headers=headers)
+
+        assert [row["student_id"] for row in response.json["rows"]] == [3, 4]
+
+        assert response.json["has_next"] is True
+
+        response = self.client.get('/courses/1/gradebook?per_page=2&page=2', headers=headers)
+
+        assert [row["student_id"] for row in response.json["rows"]] == [2]
+
+        assert response.json["has_next"] is False
+
+
+        # CSV
+        response = self.client.get('/courses/1/gradebook?format=csv', headers=headers)
+
+        assert response.status_code == 200
+
+        assert response.mimetype == 'text/csv'
+
+        assert response.headers["X-Has-Next"] == "false"
+
+        lines = response.get_data(as_text=True).splitlines()
+
+        assert lines[0] == "student_id,first_name,last_name,matric_no,term_id,grade_id,percent_grade,letter_grade"
+
+        assert lines[1] == "3,Test,Adeyemi,ZSCH/23/03/0002,,2,64.5,D"
+
+        assert len(lines) == 4
+
+
+        # Unknown courses
+        response = self.client.get('/courses/9/gradebook', headers=headers)
+
+        assert response.status_code == 404
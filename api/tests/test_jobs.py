@@ -0,0 +1,157 @@
+import unittest
+from .. import create_app
+from ..config.config import config_dict
+from ..utils import db
+from ..models.admin import Admin
+from ..models.grades import Grade
+from ..models.students import Student
+from flask_jwt_extended import create_access_token
+
+class JobTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self.app = create_app(config=config_dict['test'])
+
+        self.appctx = self.app.app_context()
+
+        self.appctx.push()
+
+        self.client = self.app.test_client()
+
+        db.create_all()
+
+
+    def tearDown(self):
+
+        db.drop_all()
+
+        self.appctx.pop()
+
+        self.app = None
+
+        self.client = None
+
+
+    def test_jobs(self):
+
+        # Activate a test admin
+        admin_signup_data = {
+            "first_name": "Test",
+            "last_name": "Admin",
+            "email": "testadmin@gmail.com",
+            "password": "password"
+        }
+
+        response = self.client.post('/admin/register', json=admin_signup_data)
+
+        admin = Admin.query.filter_by(email='testadmin@gmail.com').first()
+
+        token = create_access_token(identity=admin.id)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+
+        # Start a bulk student import
+        student_import_data = {
+            "students": [
+                {
+                    "first_name": "Test",
+                    "last_name": f"Student{number}",
+                    "email": f"teststudent{number}@gmail.com",
+                    "password": "password",
+                    "matric_no": f"ZSCH/23/03/000{number}"
+                }
+                for number in range(1, 4)
+            ]
+        }
+
+        response = self.client.post('/jobs/students/import', json=student_import_data, headers=headers)
+
+        assert response.status_code == 202
+
+        job_id = response.json["id"]
+
+        assert response.headers["Location"] == f"/jobs/{job_id}"
+
+
+        # Poll the import job
+        response = self.client.get(f'/jobs/{job_id}', headers=headers)
+
+        assert response.status_code == 200
+
+        assert response.json["status"] == "succeeded"
+
+        assert response.json["progress"] == 3
+
+        assert response.json["total"] == 3
+
+        assert response.json["result"] == "Imported 3 students, skipped 0 existing"
+
+        assert Student.query.count() == 3
+
+
+        # Re-running the import skips existing students
+        response = self.client.post('/jobs/students/import', json=student_import_data, headers=headers)
+
+        response = self.client.get(f'/jobs/{response.json["id"]}', headers=headers)
+
+        assert response.json["result"] == "Imported 0 students, skipped 3 existing"
+
+
+        # Recompute letter grades
+        response = self.client.post('/courses', json={"name": "Test Course", "teacher": "Test Teacher"}, headers=headers)
+
+        response = self.client.post('/courses/1/students/2', headers=headers)
+
+        response = self.client.post('/students/2/grades', json={"course_id": 1, "percent_grade": 72.0}, headers=headers)
+
+        grade = Grade.query.first()
+
+        grade.letter_grade = "F"
+
+        db.session.commit()
+
+        response = self.client.post('/jobs/grades/recompute', headers=headers)
+
+        response = self.client.get(f'/jobs/{response.json["id"]}', headers=headers)
+
+        assert response.json["status"] == "succeeded"
+
+        assert response.json["result"] == "Recomputed 1 grades, 1 changed, 0 in closed terms skipped"
+
+        assert Grade.query.first().letter_grade == "C"
+
+
+        # Export grades and download the result
+        response = self.client.post('/jobs/grades/export', headers=headers)
+
+        job_id = response.json["id"]
+
+        response = self.client.get(f'/jobs/{job_id}', headers=headers)
+
+        assert response.json["status"] == "succeeded"
+
+        assert response.json["result"] == "Exported 1 grades"
+
+        response = self.client.get(f'/jobs/{job_id}/result', headers=headers)
+
+        assert response.status_code == 200
+
+        lines = response.data.decode().splitlines()
+
+        assert lines[0].startswith("grade_id,student_id,matric_no")
+
+        assert lines[1] == "1,2,ZSCH/23/03/0001,Test,Student1,1,Test Course,72.0,C"
+
+        response.close()
+
+
+        # List jobs
+        response = self.client.get('/jobs?name=import_students', headers=headers)
+
+        assert response.status_code == 200
+
+        assert len(response.json) == 2
@@ -0,0 +1,146 @@
+import json
+import os
+import tempfile
+import unittest
+from .. import create_app
+from ..config.config import config_dict
+from ..utils import db
+from ..models.admin import Admin
+from flask_jwt_extended import create_access_token
+
+class MetricsTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self.app = create_app(config=config_dict['test'])
+
+        self.appctx = self.app.app_context()
+
+        self.appctx.push()
+
+        self.client = self.app.test_client()
+
+        db.create_all()
+
+
+    def tearDown(self):
+
+        db.drop_all()
+
+        self.appctx.pop()
+
+        self.app = None
+
+        self.client = None
+
+
+    def test_metrics(self):
+
+        # Activate a test admin
+        admin_signup_data = {
+            "first_name": "Test",
+            "last_name": "Admin",
+            "email": "testadmin@gmail.com",
+            "password": "password"
+        }
+
+        response = self.client.post('/admin/register', json=admin_signup_data)
+
+        admin = Admin.query.filter_by(email='testadmin@gmail.com').first()
+
+        token = create_access_token(identity=admin.id)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+        response = self.client.get('/courses', headers=headers)
+
+        response = self.client.get('/courses/1', headers=headers)
+
+        response = self.client.get('/swagger.json')
+
+        response = self.client.get('/swagger.json')
+
+
+        # Requests are counted and timed per namespace and route
+        response = self.client.get('/metrics')
+
+        assert response.status_code == 200
+
+        assert response.content_type.startswith('text/plain; version=0.0.4')
+
+        text = response.data.decode()
+
+        assert '# TYPE http_requests_total counter' in text
+
+        assert 'http_requests_total{namespace="courses",route="/courses",method="GET",status="200"} 1' in text
+
+        assert 'http_requests_total{namespace="courses",route="/courses/<int:course_id>",method="GET",status="404"} 1' in text
+
+        assert 'http_request_duration_seconds_bucket{namespace="courses",route="/courses",method="GET",le="+Inf"} 1' in text
+
+        assert 'http_request_duration_seconds_count{namespace="admin",route="/admin/register",method="POST"} 1' in text
+
+
+        # Database queries, cache lookups and rate limiters are exported too
+        assert 'db_queries_total{engine="primary"}' in text
+
+        assert 'cache_requests_total{cache="swagger_spec",result="miss"} 1' in text
+
+        assert 'cache_requests_total{cache="swagger_spec",result="hit"} 1' in text
+
+        assert 'rate_limit_requests_total{limiter="login_ip",result="allowed"} 0' in text
+
+
+    def test_multiprocess_metrics(self):
+
+        directory = tempfile.mkdtemp()
+
+        # Run this worker with a snapshot directory shared with other workers
+        db.drop_all()
+
+        self.appctx.pop()
+
+        self.app = create_app(config=type('MultiprocessConfig', (config_dict['test'],), {'METRICS_MULTIPROC_DIR': directory}))
+
+        self.appctx = self.app.app_context()
+
+        self.appctx.push()
+
+        self.client = self.app.test_client()
+
+        db.create_all()
+
+
+        # Another worker's snapshot is added to this worker's counters
+        labels = [["namespace", "healthz"], ["route", "/healthz"], ["method", "GET"], ["status", "200"]]
+        snapshot = [
+            ["http_requests_total", labels, 2],
+            ["db_pool_connections", [["engine", "primary"], ["state", "checked_out"]], 3]
+        ]
+
+        # A pid that has exited keeps its counters but not its gauges
+        with open(os.path.join(directory, 'metrics_999999999.json'), 'w') as file:
+            json.dump(snapshot, file)
+
+        response = self.client.get('/healthz')
+
+        assert response.json == {"status": "ok"}
+
+        text = self.client.get('/metrics').data.decode()
+
+        assert 'http_requests_total{namespace="healthz",route="/healthz",method="GET",status="200"} 3' in text
+
+        assert 'db_pool_connections{engine="primary",state="checked_out"} 3' not in text
+
+        assert os.path.exists(os.path.join(directory, f'metrics_{os.getpid()}.json'))
+
+
+    def test_readiness(self):
+
+        response = self.client.get('/readyz')
+
+        assert response.status_code == 200
+
+        assert response.json == {"status": "ready"}
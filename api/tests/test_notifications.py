@@ -0,0 +1,247 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from .. import create_app
+from ..config.config import config_dict
+from ..utils import db
+from ..utils.notifications import FileSink, notifications
+from ..models.admin import Admin
+from ..models.notifications import GradeNotification
+from flask_jwt_extended import create_access_token
+
+
+# Records every delivery, failing the first `failures` calls
+class RecordingSink:
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+
+    def send(self, student_id, batch):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("sink unavailable")
+        self.batches.append((student_id, batch))
+
+
+class NotificationTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self.app = create_app(config=config_dict['test'])
+
+        self.appctx = self.app.app_context()
+
+        self.appctx.push()
+
+        self.client = self.app.test_client()
+
+        db.create_all()
+
+
+    def tearDown(self):
+
+        db.drop_all()
+
+        self.appctx.pop()
+
+        self.app = None
+
+        self.client = None
+
+
+    def test_grade_notifications(self):
+
+        # Activate a test admin
+        admin_signup_data = {
+            "first_name": "Test",
+            "last_name": "Admin",
+            "email": "testadmin@gmail.com",
+            "password": "password"
+        }
+
+        response = self.client.post('/admin/register', json=admin_signup_data)
+
+        admin = Admin.query.filter_by(email='testadmin@gmail.com').first()
+
+        token = create_access_token(identity=admin.id)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+
+        # A student taking two courses
+        student_signup_data = {
+            "first_name": "Test",
+            "last_name": "Student",
+            "email": "teststudent@gmail.com",
+            "password": "password",
+            "matric_no": "ZSCH/23/03/0001"
+        }
+
+        response = self.client.post('/students/register', json=student_signup_data, headers=headers)
+
+        for name, teacher in (("First Course", "First Teacher"), ("Second Course", "Second Teacher")):
+            response = self.client.post('/courses', json={"name": name, "teacher": teacher}, headers=headers)
+
+        response = self.client.post('/courses/1/students/2', headers=headers)
+
+        response = self.client.post('/courses/2/students/2', headers=headers)
+
+
+        # Uploading a grade commits its notification without delivering it
+        sink = self.app.extensions['notifications'].sink = RecordingSink(failures=1)
+
+        response = self.client.post('/students/2/grades', json={"course_id": 1, "percent_grade": 81.0}, headers=headers)
+
+        assert response.status_code == 201
+
+        notification = GradeNotification.query.one()
+
+        assert notification.student_id == 2
+
+        assert notification.event == 'published'
+
+        assert notification.status == 'pending'
+
+        assert sink.batches == []
+
+
+        # A failed delivery is retried after a backoff
+        assert notifications.dispatch() == 1
+
+        db.session.expire_all()
+
+        assert notification.status == 'pending'
+
+        assert notification.attempts == 1
+
+        assert notification.last_error == "ConnectionError: sink unavailable"
+
+        assert notification.next_attempt_at > datetime.utcnow()
+
+        assert notifications.dispatch() == 0
+
+
+        # Once due again, it goes out together with the student's later
+        # notifications in a single batch
+        notification.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+        response = self.client.put('/students/2/grades/2', json={"percent_grade": 64.0}, headers=headers)
+
+        response = self.client.put('/students/grades/1', json={"percent_grade": 85.0}, headers=headers)
+
+        notifications.drain()
+
+        assert len(sink.batches) == 1
+
+        student_id, batch = sink.batches[0]
+
+        assert student_id == 2
+
+        assert [(item["event"], item["course_name"], item["percent_grade"]) for item in batch] == [
+            ("published", "First Course", 81.0),
+            ("published", "Second Course", 64.0),
+            ("updated", "First Course", 85.0)
+        ]
+
+        assert GradeNotification.query.filter_by(status='sent').count() == 3
+
+
+        # A rejected upload queues no notification
+        response = self.client.post('/students/2/grades', json={"course_id": 1, "percent_grade": 50.0}, headers=headers)
+
+        assert response.status_code == 409
+
+        assert GradeNotification.query.count() == 3
+
+
+        # Deliveries that keep failing are given up on
+        self.app.extensions['notifications'].max_attempts = 2
+        self.app.extensions['notifications'].retry_base = 0
+        self.app.extensions['notifications'].sink = RecordingSink(failures=2)
+
+        response = self.client.put('/students/2/grades/1', json={"percent_grade": 90.0}, headers=headers)
+
+        notifications.drain()
+
+        failed = GradeNotification.query.filter_by(status='failed').one()
+
+        assert failed.attempts == 2
+
+
+        # Delivery results are exported as metrics
+        response = self.client.get('/metrics')
+
+        assert 'notifications_total{result="sent"} 3' in response.text
+
+        assert 'notifications_total{result="retried"} 2' in response.text
+
+        assert 'notifications_total{result="failed"} 1' in response.text
+
+        assert 'notification_delivery_seconds_count 3' in response.text
+
+
+        # Delivery runs outside any transaction, on rows claimed with a lease
+        seen = []
+
+        class ClaimCheckingSink(RecordingSink):
+
+            def send(self, student_id, batch):
+                seen.append((db.session().in_transaction(), [
+                    notification.status for notification in GradeNotification.query.filter(
+                        GradeNotification.id.in_([item["id"] for item in batch])
+                    )
+                ]))
+                super().send(student_id, batch)
+
+        sink = self.app.extensions['notifications'].sink = ClaimCheckingSink()
+
+        response = self.client.put('/students/grades/1', json={"percent_grade": 70.0}, headers=headers)
+
+        notifications.drain()
+
+        assert seen == [(False, ['sending'])]
+
+        assert GradeNotification.query.filter_by(status='sent').count() == 4
+
+
+        # A batch claimed by another dispatcher is left alone until its lease expires
+        claimed = GradeNotification.query.filter_by(status='failed').one()
+
+        claimed.status = 'sending'
+        claimed.next_attempt_at = datetime.utcnow() + timedelta(minutes=5)
+        db.session.commit()
+
+        assert notifications.dispatch() == 0
+
+        claimed.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+        assert notifications.dispatch() == 1
+
+        assert [item["id"] for item in sink.batches[-1][1]] == [claimed.id]
+
+        assert GradeNotification.query.filter_by(status='sent').count() == 5
+
+
+    def test_file_sink(self):
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'notifications.jsonl')
+            sink = FileSink(path)
+
+            sink.send(2, [{"id": 1, "event": "published"}])
+            sink.send(3, [{"id": 2, "event": "updated"}])
+
+            with open(path) as file:
+                lines = [json.loads(line) for line in file]
+
+        assert lines == [
+            {"student_id": 2, "notifications": [{"id": 1, "event": "published"}]},
+            {"student_id": 3, "notifications": [{"id": 2, "event": "updated"}]}
+        ]
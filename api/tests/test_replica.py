@@ -0,0 +1,185 @@
+import os
+import tempfile
+import unittest
+from .. import create_app
+from ..config.config import config_dict
+from ..utils import db
+from ..models.admin import Admin
+from ..models.students import Student
+from flask_jwt_extended import create_access_token
+from werkzeug.security import generate_password_hash
+
+class ReplicaTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+        class ReplicaConfig(config_dict['test']):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(self.tmpdir.name, 'primary.sqlite3')
+            SQLALCHEMY_REPLICA_URI = 'sqlite:///' + os.path.join(self.tmpdir.name, 'replica.sqlite3')
+
+        self.app = create_app(config=ReplicaConfig)
+
+        self.appctx = self.app.app_context()
+
+        self.appctx.push()
+
+        self.client = self.app.test_client()
+
+        db.create_all()
+
+        db.metadata.create_all(self.app.extensions['replica_engine'])
+
+
+    def tearDown(self):
+
+        db.session.remove()
+
+        db.engine.dispose()
+
+        self.app.extensions['replica_engine'].dispose()
+
+        self.appctx.pop()
+
+        self.tmpdir.cleanup()
+
+        self.app = None
+
+        self.client = None
+
+
+    def test_replica_routing(self):
+
+        # Seed the same admin on both databases, as replication would
+        for engine in (db.engine, self.app.extensions['replica_engine']):
+            with engine.begin() as connection:
+                connection.execute(db.metadata.tables['users'].insert().values(
+                    id=1, first_name="Test", last_name="Admin", email="testadmin@gmail.com",
+                    password_hash=generate_password_hash("password"), user_type="admin"
+                ))
+                connection.execute(Admin.__table__.insert().values(id=1))
+
+        token = create_access_token(identity=1)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+
+        # Writes go to the primary
+        student_signup_data = {
+            "first_name": "Test",
+            "last_name": "Student",
+            "email": "teststudent@gmail.com",
+            "password": "password",
+            "matric_no": "ZSCH/23/03/0001"
+        }
+
+        response = self.client.post('/students/register', json=student_signup_data, headers=headers)
+
+        assert response.status_code == 201
+
+        with db.engine.connect() as connection:
+            assert connection.execute(Student.__table__.select()).all() != []
+
+        with self.app.extensions['replica_engine'].connect() as connection:
+            assert connection.execute(Student.__table__.select()).all() == []
+
+
+        # The writer reads its own write from the primary during the pin window
+        response = self.client.get('/students', headers=headers)
+
+        assert [student["email"] for student in response.json] == ["teststudent@gmail.com"]
+
+
+        # Once the pin expires, reads are served by the (lagging) replica
+        self.app.extensions['replica_pins'].clear()
+
+        response = self.client.get('/students', headers=headers)
+
+        assert response.status_code == 200
+
+        assert response.json == []
+
+
+
+    def test_current_user_reads_own_write(self):
+
+        # Seed the same student on both databases, as replication would
+        for engine in (db.engine, self.app.extensions['replica_engine']):
+            with engine.begin() as connection:
+                connection.execute(db.metadata.tables['users'].insert().values(
+                    id=1, first_name="Test", last_name="Student", email="teststudent@gmail.com",
+                    password_hash=generate_password_hash("password"), user_type="student"
+                ))
+                connection.execute(Student.__table__.insert().values(id=1, matric_no="ZSCH/23/03/0001"))
+
+        token = create_access_token(identity=1)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+        student_update_data = {
+            "first_name": "Renamed",
+            "last_name": "Student",
+            "email": "teststudent@gmail.com",
+            "password": "password"
+        }
+
+        # Each request gets its own app context and session, as in production
+        self.appctx.pop()
+
+        try:
+            response = self.client.put('/students/1', json=student_update_data, headers=headers)
+
+            assert response.status_code == 200
+
+
+            # The student's own read right after the write sees it, even though
+            # the current user is loaded before the JWT identity is available
+            response = self.client.get('/students/1', headers=headers)
+
+            assert response.status_code == 200
+
+            assert response.json["first_name"] == "Renamed"
+
+        finally:
+            self.appctx.push()
+
+
+    def test_analytics_build_reads_primary(self):
+
+        for engine in (db.engine, self.app.extensions['replica_engine']):
+            with engine.begin() as connection:
+                connection.execute(db.metadata.tables['users'].insert().values(
+                    id=1, first_name="Test", last_name="Admin", email="testadmin@gmail.com",
+                    password_hash=generate_password_hash("password"), user_type="admin"
+                ))
+                connection.execute(Admin.__table__.insert().values(id=1))
+
+        # A grade the replica has not caught up with yet
+        with db.engine.begin() as connection:
+            connection.execute(db.metadata.tables['courses'].insert().values(id=1, name="Biology", teacher="Teacher B"))
+            connection.execute(db.metadata.tables['users'].insert().values(
+                id=2, first_name="Test", last_name="Student", email="teststudent@gmail.com",
+                password_hash=generate_password_hash("password"), user_type="student"
+            ))
+            connection.execute(Student.__table__.insert().values(id=2, matric_no="ZSCH/23/03/0001"))
+            connection.execute(db.metadata.tables['grades'].insert().values(
+                id=1, student_id=2, course_id=1, percent_grade=72.0, letter_grade="C"
+            ))
+
+        token = create_access_token(identity=1)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+        # The index is built from the primary even though GETs read the replica
+        response = self.client.get('/analytics/index', headers=headers)
+
+        assert response.status_code == 200
+
+        assert response.json["grades"] == 1
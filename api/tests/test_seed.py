@@ -0,0 +1,144 @@
+import unittest
+from .. import create_app
+from ..config.config import config_dict
+from ..utils import db
+from ..models.admin import Admin
+from ..models.grades import Grade
+from ..models.courses import Course
+from ..models.students import Student
+from ..models.student_course import StudentCourse
+from ..models.archive import ArchivedStudent, ArchivedGrade
+from ..utils.grade_conversions import get_letter_grade
+from flask_jwt_extended import create_access_token
+
+class SeedTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self.app = create_app(config=config_dict['test'])
+
+        self.appctx = self.app.app_context()
+
+        self.appctx.push()
+
+        self.client = self.app.test_client()
+
+        db.create_all()
+
+
+    def tearDown(self):
+
+        db.drop_all()
+
+        self.appctx.pop()
+
+        self.app = None
+
+        self.client = None
+
+
+    def seed(self, *args):
+
+        result = self.app.test_cli_runner().invoke(args=['seed', '--batch-size', '50'] + list(args))
+
+        assert result.exit_code == 0, result.output
+
+        return [
+            (grade.student_id, grade.course_id, grade.percent_grade)
+            for grade in Grade.query.order_by(Grade.id)
+        ]
+
+
+    def test_seed(self):
+
+        # Seed a small school
+        grades = self.seed('--admins', '2', '--students', '100', '--courses', '8', '--seed', '7')
+
+        assert Admin.query.count() == 2
+
+        assert Student.query.count() == 100
+
+        assert Course.query.count() == 8
+
+        assert len({course.teacher for course in Course.query}) == 8
+
+        enrollments = StudentCourse.query.all()
+
+        assert len({(row.student_id, row.course_id) for row in enrollments}) == len(enrollments)
+
+        assert 0 < len(grades) <= len(enrollments)
+
+        assert all(0 <= percent_grade <= 100 for student_id, course_id, percent_grade in grades)
+
+        assert all(grade.letter_grade == get_letter_grade(grade.percent_grade) for grade in Grade.query)
+
+
+        # Seeded users sign in with the shared password
+        student = Student.query.first()
+
+        response = self.client.post('/auth/login', json={"email": student.email, "password": "password"})
+
+        assert response.status_code == 201
+
+
+        # The same seed produces the same data
+        db.drop_all()
+
+        db.create_all()
+
+        assert self.seed('--admins', '2', '--students', '100', '--courses', '8', '--seed', '7') == grades
+
+        db.drop_all()
+
+        db.create_all()
+
+        assert self.seed('--admins', '2', '--students', '100', '--courses', '8', '--seed', '8') != grades
+
+
+        # Seeding again adds to the existing rows
+        self.seed('--admins', '0', '--students', '10', '--courses', '1')
+
+        assert Student.query.count() == 110
+
+        assert Course.query.count() == 9
+
+
+    def test_seed_after_archive(self):
+
+        self.seed('--admins', '1', '--students', '10', '--courses', '2')
+
+        admin = Admin.query.first()
+
+        token = create_access_token(identity=admin.id)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+
+        # Archive every seeded student, freeing the newest IDs in the hot tables
+        response = self.client.post('/jobs/students/archive', json={"matric_prefix": "SEED/"}, headers=headers)
+
+        response = self.client.get(f'/jobs/{response.json["id"]}', headers=headers)
+
+        assert response.json["status"] == "succeeded"
+
+        assert Student.query.count() == 0
+
+        archived_student_ids = {student.id for student in ArchivedStudent.query}
+
+        archived_grade_ids = {grade.id for grade in ArchivedGrade.query}
+
+        assert len(archived_student_ids) == 10 and archived_grade_ids
+
+
+        # Seeding again never hands out an archived ID
+        self.seed('--admins', '0', '--students', '10', '--courses', '0')
+
+        assert Student.query.count() == 10
+
+        assert min(student.id for student in Student.query) > max(archived_student_ids)
+
+        self.seed('--admins', '0', '--students', '10', '--courses', '2')
+
+        assert min(grade.id for grade in Grade.query) > max(archived_grade_ids)
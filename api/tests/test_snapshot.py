@@ -0,0 +1,226 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from .. import create_app
+from ..config.config import config_dict
+from ..utils import db
+from ..utils.search import search_students
+from ..utils.snapshot import snapshot_transaction
+from ..models.admin import Admin
+from ..models.users import User
+from ..models.grades import Grade
+from ..models.students import Student
+from ..models.grade_audit import GradeAudit
+from flask_jwt_extended import create_access_token
+from sqlalchemy import func, select
+from werkzeug.security import generate_password_hash
+
+class SnapshotTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+        self.app = create_app(config=config_dict['test'])
+
+        self.appctx = self.app.app_context()
+
+        self.appctx.push()
+
+        self.client = self.app.test_client()
+
+        db.create_all()
+
+
+    def tearDown(self):
+
+        db.drop_all()
+
+        self.appctx.pop()
+
+        self.tmpdir.cleanup()
+
+        self.app = None
+
+        self.client = None
+
+
+    def test_snapshot_round_trip(self):
+
+        # Activate a test admin
+        admin_signup_data = {
+            "first_name": "Test",
+            "last_name": "Admin",
+            "email": "testadmin@gmail.com",
+            "password": "password"
+        }
+
+        response = self.client.post('/admin/register', json=admin_signup_data)
+
+        admin = Admin.query.filter_by(email='testadmin@gmail.com').first()
+
+        token = create_access_token(identity=admin.id)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+
+        # Register students, a course, enrollments and grades
+        for number in range(1, 4):
+            student_signup_data = {
+                "first_name": "Test",
+                "last_name": f"Student{number}",
+                "email": f"student{number}@gmail.com",
+                "password": "password",
+                "matric_no": f"ZSCH/23/03/000{number}"
+            }
+
+            response = self.client.post('/students/register', json=student_signup_data, headers=headers)
+
+        response = self.client.post('/courses', json={"name": "Test Course", "teacher": "Test Teacher"}, headers=headers)
+
+        for student_id in (2, 3, 4):
+            response = self.client.post(f'/courses/1/students/{student_id}', headers=headers)
+
+            response = self.client.post(
+                f'/students/{student_id}/grades',
+                json={"student_id": student_id, "course_id": 1, "percent_grade": 60 + student_id},
+                headers=headers
+            )
+
+
+        # A deleted student's ID is only remembered by sqlite_sequence
+        response = self.client.post('/students/register', json={
+            "first_name": "Test", "last_name": "Student4", "email": "student4@gmail.com",
+            "password": "password", "matric_no": "ZSCH/23/03/0004"
+        }, headers=headers)
+
+        response = self.client.delete('/students/5', headers=headers)
+
+        assert response.status_code == 200
+
+
+        # Export every table in small batches
+        snapshot_dir = os.path.join(self.tmpdir.name, 'snapshot')
+
+        result = self.app.test_cli_runner().invoke(args=['snapshot', 'export', snapshot_dir, '--batch-size', '2'])
+
+        assert result.exit_code == 0, result.output
+
+        with open(os.path.join(snapshot_dir, 'manifest.json')) as manifest_file:
+            manifest = json.load(manifest_file)
+
+        tables = {entry['name']: entry for entry in manifest['tables']}
+
+        assert tables['users']['rows'] == 4
+
+        assert tables['grades']['rows'] == 3
+
+        assert tables['users']['level'] < tables['students']['level'] < tables['grades']['level']
+
+        assert manifest['last_ids']['users'] == 5
+
+        with gzip.open(os.path.join(snapshot_dir, 'users.ndjson.gz'), 'rt') as snapshot_file:
+            assert [json.loads(line)['user_type'] for line in snapshot_file] == ['admin', 'student', 'student', 'student']
+
+
+        # Import into a fresh database
+        class TargetConfig(config_dict['test']):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(self.tmpdir.name, 'target.sqlite3')
+
+        target = create_app(config=TargetConfig)
+
+        with target.app_context():
+            db.create_all()
+
+            result = target.test_cli_runner().invoke(args=['snapshot', 'import', snapshot_dir, '--batch-size', '2'])
+
+            assert result.exit_code == 0, result.output
+
+            # Joined rows load back as their subclasses
+            users = User.query.order_by(User.id).all()
+
+            assert [type(user) for user in users] == [Admin, Student, Student, Student]
+
+            assert users[1].matric_no == "ZSCH/23/03/0001"
+
+            assert [grade.percent_grade for grade in Grade.query.order_by(Grade.id)] == [62, 63, 64]
+
+            assert GradeAudit.query.count() == 3
+
+            assert all(record.created_at.year > 2000 for record in GradeAudit.query)
+
+            # Search triggers index the imported students
+            assert [student['id'] for student in search_students('student2')[0]] == [3]
+
+            # IDs handed out before the export are never handed out again
+            user = User(first_name="Test", last_name="Student5", email="student5@gmail.com", password_hash="x", user_type="admin")
+
+            db.session.add(user)
+
+            db.session.commit()
+
+            assert user.id == 6
+
+            db.session.delete(user)
+
+            db.session.commit()
+
+
+            # A second import refuses to overwrite data unless asked to
+            result = target.test_cli_runner().invoke(args=['snapshot', 'import', snapshot_dir])
+
+            assert result.exit_code != 0
+
+            assert "not empty" in result.output
+
+            result = target.test_cli_runner().invoke(args=['snapshot', 'import', snapshot_dir, '--replace'])
+
+            assert result.exit_code == 0, result.output
+
+            assert User.query.count() == 4
+
+            db.session.remove()
+
+            db.engine.dispose()
+
+
+    def test_snapshot_reads_one_moment(self):
+
+        class FileConfig(config_dict['test']):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(self.tmpdir.name, 'live.sqlite3')
+
+        app = create_app(config=FileConfig)
+
+        with app.app_context():
+            db.create_all()
+
+            # In WAL mode writers can commit while the export reads
+            with db.engine.connect() as connection:
+                connection.exec_driver_sql('PRAGMA journal_mode=WAL')
+
+            users = db.metadata.tables['users']
+
+            def add_user(number):
+                with db.engine.begin() as connection:
+                    connection.execute(users.insert().values(
+                        first_name="Test", last_name=f"User{number}", email=f"testuser{number}@gmail.com",
+                        password_hash=generate_password_hash("password"), user_type="admin"
+                    ))
+
+            add_user(1)
+
+            # Rows committed while the export runs are left out of every table
+            with snapshot_transaction(db.engine) as connection:
+                assert connection.execute(select(func.count()).select_from(users)).scalar() == 1
+
+                add_user(2)
+
+                assert connection.execute(select(func.count()).select_from(users)).scalar() == 1
+
+            db.session.remove()
+
+            db.engine.dispose()
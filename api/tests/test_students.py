@@ -1,10 +1,15 @@
 import unittest
+from unittest import mock
 from .. import create_app
 from ..config.config import config_dict
 from ..utils import db
 from ..models.admin import Admin
+from ..models.users import User
 from ..models.students import Student
+from ..models.student_course import StudentCourse
+from ..models.grades import Grade
 from flask_jwt_extended import create_access_token
+from sqlalchemy import event
 
 class UserTestCase(unittest.TestCase):
     
@@ -114,6 +119,16 @@ class UserTestCase(unittest.TestCase):
         }
 
 
+        # Retrieve only selected fields
+        response = self.client.get('/students/2?fields=id,matric_no', headers=headers)
+
+        assert response.json == {"id": 2, "matric_no": "ZSCH/23/03/0001"}
+
+        response = self.client.get('/students?fields=first_name', headers=headers)
+
+        assert response.json == [{"first_name": "Test"}]
+
+
         # Update a student's details
         student_update_data = {
             "first_name": "Sample",
@@ -192,6 +207,7 @@ class UserTestCase(unittest.TestCase):
 
         assert response.json == [{
             "course_name": "Test Course",
+            "term_id": None,
             "grade_id": 1,
             "percent_grade": 85.7,
             "letter_grade": "B"
@@ -216,17 +232,434 @@ class UserTestCase(unittest.TestCase):
         }
 
 
+        # Retrieve grades within a threshold
+        response = self.client.get('/students/grades?min_percent=90&sort=-percent_grade', headers=headers)
+
+        assert response.status_code == 200
+
+        assert response.json == [{
+            "id": 1,
+            "student_id": 2,
+            "course_id": 1,
+            "term_id": None,
+            "percent_grade": 91.5,
+            "letter_grade": "A"
+        }]
+
+        response = self.client.get('/students/grades?max_percent=50', headers=headers)
+
+        assert response.json == []
+
+
         # Calculate a student's CGPA
         response = self.client.get('/students/2/cgpa', headers=headers)
         assert response.status_code == 200
         assert response.json["message"] == "Sample Student's CGPA is 4.0"
 
 
+        # Retrieve a student's summary in a fixed number of queries
+        statements = []
+
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', count_statement)
+
+        response = self.client.get('/students/2/summary', headers=headers)
+
+        event.remove(db.engine, 'before_cursor_execute', count_statement)
+
+        assert response.status_code == 200
+
+        assert len(statements) <= 3
+
+        assert response.json == {
+            "profile": {
+                "id": 2,
+                "first_name": "Sample",
+                "last_name": "Student",
+                "email": "samplestudent@gmail.com",
+                "matric_no": "ZSCH/23/03/0001",
+                "user_type": "student"
+            },
+            "courses": [{
+                "id": 1,
+                "name": "Test Course",
+                "teacher": "Test Teacher"
+            }],
+            "grades": [{
+                "course_name": "Test Course",
+                "term_id": None,
+                "grade_id": 1,
+                "percent_grade": 91.5,
+                "letter_grade": "A"
+            }],
+            "cgpa": 4.0
+        }
+
+
         # Delete a grade
         response = self.client.delete('/students/grades/1', headers=headers)
         assert response.status_code == 200
 
 
+        # Retrieve the grade audit trail
+        response = self.client.get('/audit/grades?grade_id=1', headers=headers)
+
+        assert response.status_code == 200
+
+        assert [record["action"] for record in response.json] == ["delete", "update", "create"]
+
+        assert response.json[1]["old_percent_grade"] == 85.7
+
+        assert response.json[1]["new_percent_grade"] == 91.5
+
+        assert response.json[1]["old_letter_grade"] == "B"
+
+        assert response.json[1]["new_letter_grade"] == "A"
+
+        assert response.json[0]["old_percent_grade"] == 91.5
+
+        assert response.json[0]["new_percent_grade"] is None
+
+        assert all(record["admin_id"] == 1 for record in response.json)
+
+
         # Delete a student
         response = self.client.delete('/students/2', headers=headers)
-        assert response.status_code == 200
\ No newline at end of file
+        assert response.status_code == 200
+
+        assert StudentCourse.query.filter_by(student_id=2).count() == 0
+
+        assert User.query.get(2) is None
+
+        response = self.client.delete('/students/2', headers=headers)
+        assert response.status_code == 404
+
+    def test_student_search(self):
+
+        # Activate a test admin
+        admin_signup_data = {
+            "first_name": "Test",
+            "last_name": "Admin",
+            "email": "testadmin@gmail.com",
+            "password": "password"
+        }
+
+        response = self.client.post('/admin/register', json=admin_signup_data)
+
+        admin = Admin.query.filter_by(email='testadmin@gmail.com').first()
+
+        token = create_access_token(identity=admin.id)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+
+        # Register test students
+        students = [
+            ("Ada", "Lovelace", "ada@gmail.com", "ZSCH/23/03/0001"),
+            ("Alan", "Turing", "alan@gmail.com", "ZSCH/23/03/0002"),
+            ("Grace", "Hopper", "grace@gmail.com", "ZSCH/22/09/0003")
+        ]
+
+        for first_name, last_name, email, matric_no in students:
+            student_signup_data = {
+                "first_name": first_name,
+                "last_name": last_name,
+                "email": email,
+                "password": "password",
+                "matric_no": matric_no
+            }
+
+            response = self.client.post('/students/register', json=student_signup_data, headers=headers)
+
+
+        # Search by partial name
+        response = self.client.get('/students/search?q=lov', headers=headers)
+
+        assert response.status_code == 200
+
+        assert response.json == {
+            "page": 1,
+            "per_page": 20,
+            "has_next": False,
+            "results": [{
+                "id": 2,
+                "first_name": "Ada",
+                "last_name": "Lovelace",
+                "email": "ada@gmail.com",
+                "matric_no": "ZSCH/23/03/0001",
+                "user_type": "student"
+            }]
+        }
+
+
+        # Search by matric number prefix, paginated
+        response = self.client.get('/students/search?q=zsch/23&per_page=1', headers=headers)
+
+        assert response.status_code == 200
+
+        assert len(response.json["results"]) == 1
+
+        assert response.json["has_next"] is True
+
+        response = self.client.get('/students/search?q=zsch/23&per_page=1&page=2', headers=headers)
+
+        assert response.json["has_next"] is False
+
+        assert response.json["results"][0]["matric_no"].startswith("ZSCH/23")
+
+
+        # Updated details are searchable
+        student_update_data = {
+            "first_name": "Grace",
+            "last_name": "Brewster",
+            "email": "grace@gmail.com",
+            "password": "password"
+        }
+
+        response = self.client.put('/students/4', json=student_update_data, headers=headers)
+
+        response = self.client.get('/students/search?q=brew', headers=headers)
+
+        assert [student["id"] for student in response.json["results"]] == [4]
+
+        response = self.client.get('/students/search?q=hopper', headers=headers)
+
+        assert response.json["results"] == []
+
+
+        # Deleted students drop out of the index
+        response = self.client.delete('/students/2', headers=headers)
+
+        response = self.client.get('/students/search?q=ada', headers=headers)
+
+        assert response.json["results"] == []
+
+    def test_grade_upsert(self):
+
+        # Activate a test admin
+        admin_signup_data = {
+            "first_name": "Test",
+            "last_name": "Admin",
+            "email": "testadmin@gmail.com",
+            "password": "password"
+        }
+
+        response = self.client.post('/admin/register', json=admin_signup_data)
+
+        admin = Admin.query.filter_by(email='testadmin@gmail.com').first()
+
+        token = create_access_token(identity=admin.id)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+
+        # Register a student enrolled in two courses
+        student_signup_data = {
+            "first_name": "Test",
+            "last_name": "Student",
+            "email": "teststudent@gmail.com",
+            "password": "password",
+            "matric_no": "ZSCH/23/03/0001"
+        }
+
+        response = self.client.post('/students/register', json=student_signup_data, headers=headers)
+
+        for name, teacher in (("First Course", "First Teacher"), ("Second Course", "Second Teacher")):
+            response = self.client.post('/courses', json={"name": name, "teacher": teacher}, headers=headers)
+
+        response = self.client.post('/courses/1/students/2', headers=headers)
+
+        response = self.client.post('/courses/2/students/2', headers=headers)
+
+
+        # PUT creates the grade, then replaces it
+        response = self.client.put('/students/2/grades/1', json={"percent_grade": 72.5}, headers=headers)
+
+        assert response.status_code == 201
+
+        assert response.json == {
+            "grade_id": 1,
+            "student_id": 2,
+            "course_id": 1,
+            "term_id": None,
+            "percent_grade": 72.5,
+            "letter_grade": "C"
+        }
+
+        response = self.client.put('/students/2/grades/1', json={"percent_grade": 93.0}, headers=headers)
+
+        assert response.status_code == 200
+
+        assert response.json["grade_id"] == 1
+
+        assert response.json["letter_grade"] == "A"
+
+        assert Grade.query.filter_by(student_id=2, course_id=1).count() == 1
+
+        response = self.client.get('/audit/grades?grade_id=1', headers=headers)
+
+        assert [record["action"] for record in response.json] == ["update", "create"]
+
+        assert response.json[0]["old_percent_grade"] == 72.5
+
+
+        # POST does not create a second grade for the course
+        grade_upload_data = {
+            "course_id": 1,
+            "percent_grade": 50.0
+        }
+
+        response = self.client.post('/students/2/grades', json=grade_upload_data, headers=headers)
+
+        assert response.status_code == 409
+
+        assert Grade.query.get(1).percent_grade == 93.0
+
+
+        # Retried POSTs with the same Idempotency-Key replay the first response
+        grade_upload_data = {
+            "course_id": 2,
+            "percent_grade": 65.0
+        }
+
+        retry_headers = dict(headers, **{"Idempotency-Key": "upload-2-2"})
+
+        response = self.client.post('/students/2/grades', json=grade_upload_data, headers=retry_headers)
+
+        assert response.status_code == 201
+
+        first_response = response.json
+
+        response = self.client.post('/students/2/grades', json=grade_upload_data, headers=retry_headers)
+
+        assert response.status_code == 201
+
+        assert response.headers["Idempotent-Replayed"] == "true"
+
+        assert response.json == first_response
+
+        assert Grade.query.filter_by(student_id=2, course_id=2).count() == 1
+
+
+        # Reusing the key for a different request is rejected
+        response = self.client.post(
+            '/students/2/grades', json={"course_id": 2, "percent_grade": 70.0}, headers=retry_headers
+        )
+
+        assert response.status_code == 422
+
+
+        # A conflict found by the database, after the view rolled back, is stored and replayed too
+        conflict_headers = dict(headers, **{"Idempotency-Key": "upload-2-1"})
+
+        with mock.patch.object(Grade, 'get_by_enrollment', return_value=None):
+            response = self.client.post('/students/2/grades', json={"course_id": 1, "percent_grade": 50.0}, headers=conflict_headers)
+
+        assert response.status_code == 409
+
+        response = self.client.post('/students/2/grades', json={"course_id": 1, "percent_grade": 50.0}, headers=conflict_headers)
+
+        assert response.status_code == 409
+
+        assert response.headers["Idempotent-Replayed"] == "true"
+
+    def test_current_user_queries(self):
+
+        # Activate a test admin
+        admin_signup_data = {
+            "first_name": "Test",
+            "last_name": "Admin",
+            "email": "testadmin@gmail.com",
+            "password": "password"
+        }
+
+        response = self.client.post('/admin/register', json=admin_signup_data)
+
+        admin = Admin.query.filter_by(email='testadmin@gmail.com').first()
+
+        token = create_access_token(identity=admin.id)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+
+        # Register, enroll and grade a student
+        student_signup_data = {
+            "first_name": "Test",
+            "last_name": "Student",
+            "email": "teststudent@gmail.com",
+            "password": "password",
+            "matric_no": "ZSCH/23/03/0001"
+        }
+
+        response = self.client.post('/students/register', json=student_signup_data, headers=headers)
+
+        response = self.client.post('/courses', json={"name": "Test Course", "teacher": "Test Teacher"}, headers=headers)
+
+        response = self.client.post('/courses/1/students/2', headers=headers)
+
+        response = self.client.post('/students/2/grades', json={"course_id": 1, "percent_grade": 75.0}, headers=headers)
+
+        student_headers = {
+            "Authorization": f"Bearer {create_access_token(identity=2)}"
+        }
+
+
+        # The current user is loaded once, as a Student, and reused by the view
+        statements = []
+
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        db.session.remove()
+
+        event.listen(db.engine, 'before_cursor_execute', count_statement)
+
+        response = self.client.get('/students/2/grades', headers=student_headers)
+
+        event.remove(db.engine, 'before_cursor_execute', count_statement)
+
+        assert response.status_code == 200
+
+        assert len(statements) == 2
+
+        assert sum('FROM users' in statement for statement in statements) == 1
+
+
+        # Admin checks reuse the loaded admin
+        statements.clear()
+
+        db.session.remove()
+
+        event.listen(db.engine, 'before_cursor_execute', count_statement)
+
+        response = self.client.get('/students/grades', headers=headers)
+
+        event.remove(db.engine, 'before_cursor_execute', count_statement)
+
+        assert response.status_code == 200
+
+        assert len(statements) == 2
+
+
+        # Students are refused admin routes without another lookup
+        response = self.client.get('/students/grades', headers=student_headers)
+
+        assert response.status_code == 403
+
+
+        # Tokens of deleted users are rejected
+        response = self.client.delete('/students/2', headers=headers)
+
+        response = self.client.get('/students/2/grades', headers=student_headers)
+
+        assert response.status_code == 401
+
+        assert response.json["error"] == "user_not_found"
@@ -0,0 +1,43 @@
+import unittest
+from .. import create_app
+from ..config.config import config_dict
+
+class SwaggerTestCase(unittest.TestCase):
+
+    def test_swagger_spec_cached(self):
+
+        app = create_app(config=config_dict['test'])
+
+        client = app.test_client()
+
+        response = client.get('/swagger.json')
+
+        assert response.status_code == 200
+
+        assert response.json["info"]["title"] == "Student Management API"
+
+        etag = response.headers["ETag"]
+
+
+        # Repeat requests reuse the encoded spec and support revalidation
+        response = client.get('/swagger.json')
+
+        assert response.headers["ETag"] == etag
+
+        response = client.get('/swagger.json', headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+
+
+    def test_docs_disabled(self):
+
+        class NoDocsConfig(config_dict['test']):
+            API_DOCS = False
+
+        app = create_app(config=NoDocsConfig)
+
+        client = app.test_client()
+
+        assert client.get('/swagger.json').status_code == 404
+
+        assert client.get('/').status_code == 404
@@ -0,0 +1,215 @@
+import os
+import shutil
+import tempfile
+import unittest
+from .. import create_app
+from ..config.config import config_dict
+from ..utils import db
+from ..utils.tenants import TenantEngines
+from flask_jwt_extended import create_access_token, decode_token
+
+def tenant_config(directory, names, **settings):
+    class TenantConfig(config_dict['test']):
+        TENANTS = {name: 'sqlite:///' + os.path.join(directory, f'{name}.sqlite3') for name in names}
+        TENANT_DOMAIN = 'zeschool.test'
+    for key, value in settings.items():
+        setattr(TenantConfig, key, value)
+    return TenantConfig
+
+
+# No app context is pushed here, so every request gets its own session
+# as in production, rather than one session shared across tenants
+class TenantTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.TemporaryDirectory()
+
+        self.app = create_app(config=tenant_config(self.directory.name, ('north', 'south'), TENANT_ENGINE_LIMIT=1))
+
+        self.client = self.app.test_client()
+
+        for name in ('north', 'south'):
+            db.metadata.create_all(self.app.extensions['tenants'].engine(name))
+
+
+    def tearDown(self):
+
+        self.app.extensions['tenants'].dispose()
+
+        self.directory.cleanup()
+
+        self.app = None
+
+        self.client = None
+
+
+    def test_tenants(self):
+
+        admin_signup_data = {
+            "first_name": "Test",
+            "last_name": "Admin",
+            "email": "testadmin@gmail.com",
+            "password": "password"
+        }
+
+        # Requests must name a known school; probes do not
+        response = self.client.post('/admin/register', json=admin_signup_data)
+
+        assert response.status_code == 400
+
+        response = self.client.post('/admin/register', json=admin_signup_data, headers={"X-Tenant": "east"})
+
+        assert response.status_code == 404
+
+        response = self.client.get('/healthz')
+
+        assert response.status_code == 200
+
+
+        # Each school has its own database, so the same email registers in both
+        for school in ('north', 'south'):
+            response = self.client.post('/admin/register', json=admin_signup_data, headers={"X-Tenant": school})
+
+            assert response.status_code == 201
+
+        login_data = {"email": "testadmin@gmail.com", "password": "password"}
+
+        response = self.client.post('/auth/login', json=login_data, headers={"X-Tenant": "north"})
+
+        assert response.status_code == 201
+
+        north = {"Authorization": f"Bearer {response.json['access_token']}", "X-Tenant": "north"}
+
+        response = self.client.post('/courses', json={"name": "Maths", "teacher": "Ada"}, headers=north)
+
+        assert response.status_code == 201
+
+        response = self.client.get('/courses', headers=north)
+
+        assert [course["name"] for course in response.json] == ["Maths"]
+
+
+        # The token carries its school: it selects the tenant on its own,
+        # and is refused by any other school
+        response = self.client.get('/courses', headers={"Authorization": north["Authorization"]})
+
+        assert response.status_code == 200
+
+        assert len(response.json) == 1
+
+        response = self.client.get('/courses', headers={**north, "X-Tenant": "south"})
+
+        assert response.status_code == 401
+
+        assert response.json["error"] == "wrong_tenant"
+
+
+        # South is reached through its subdomain and sees none of north's data
+        response = self.client.post('/auth/login', json=login_data, base_url='http://south.zeschool.test')
+
+        south = {"Authorization": f"Bearer {response.json['access_token']}"}
+
+        response = self.client.get('/courses', headers=south, base_url='http://south.zeschool.test')
+
+        assert response.status_code == 200
+
+        assert response.json == []
+
+
+        # Background writes land in the tenant's own database
+        response = self.client.get('/audit/grades', headers=south, base_url='http://south.zeschool.test')
+
+        assert response.status_code == 200
+
+
+        # Only the most recently used engine is kept open
+        assert list(self.app.extensions['tenants'].live()) == ['south']
+
+
+        # Delivering notifications visits every school without opening or
+        # evicting the engines kept for requests
+        assert self.app.extensions['notifications'].dispatch() == 0
+
+        assert list(self.app.extensions['tenants'].live()) == ['south']
+
+
+        # Tenant queries are counted, and readiness covers the engines kept open
+        response = self.client.get('/metrics')
+
+        assert 'db_queries_total{engine="tenant:north"}' in response.text
+
+        assert 'db_queries_total{engine="tenant:south"}' in response.text
+
+        response = self.client.get('/readyz')
+
+        assert response.status_code == 200
+
+        registry = self.app.extensions['tenants']
+
+        registry.uris['west'] = 'sqlite:///' + os.path.join(self.directory.name, 'missing', 'west.sqlite3')
+
+        registry.engine('west')
+
+        response = self.client.get('/readyz')
+
+        assert response.status_code == 503
+
+        assert response.json["database"] == "tenant:west"
+
+
+    def test_tenant_names(self):
+
+        # Names are matched lowercase, as the header and subdomain are read
+        registry = TenantEngines({" North ": "sqlite://", "south": "sqlite://"}, 1, {})
+
+        assert registry.names() == ["north", "south"]
+
+        assert "north" in registry
+
+        with self.assertRaises(ValueError):
+            TenantEngines({"North": "sqlite://", "north": "sqlite://"}, 1, {})
+
+
+    def test_tenant_tokens(self):
+
+        # Tokens created while serving a school carry its name
+        with self.app.test_request_context('/courses', headers={"X-Tenant": "north"}):
+            self.app.preprocess_request()
+            token = create_access_token(identity=1)
+
+            assert decode_token(token)["tenant"] == "north"
+
+
+    def test_tenant_migrations(self):
+
+        # New schools start from the schema the first migration builds on
+        template = os.path.join(os.path.dirname(__file__), '..', 'config', 'db.sqlite3')
+        for name in ('east', 'west'):
+            shutil.copyfile(template, os.path.join(self.directory.name, f'{name}.sqlite3'))
+
+        app = create_app(config=tenant_config(self.directory.name, ('east', 'west')))
+
+        runner = app.test_cli_runner()
+
+        result = runner.invoke(args=['tenants', 'upgrade'])
+
+        assert result.exit_code == 0, result.output
+
+        assert "Upgrading east to head" in result.output
+
+        assert "Upgrading west to head" in result.output
+
+        result = runner.invoke(args=['tenants', 'list'])
+
+        lines = result.output.strip().splitlines()
+
+        assert [line.split('\t')[0] for line in lines] == ['east', 'west']
+
+        assert all(line.split('\t')[2] != '-' for line in lines)
+
+        result = runner.invoke(args=['tenants', 'upgrade', '--tenant', 'nowhere'])
+
+        assert result.exit_code != 0
+
+        app.extensions['tenants'].dispose()
@@ -0,0 +1,305 @@
+import unittest
+from .. import create_app
+from ..config.config import config_dict
+from ..utils import db
+from ..models.admin import Admin
+from ..models.grades import Grade
+from ..models.terms import Term
+from flask_jwt_extended import create_access_token
+
+class TermTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self.app = create_app(config=config_dict['test'])
+
+        self.appctx = self.app.app_context()
+
+        self.appctx.push()
+
+        self.client = self.app.test_client()
+
+        db.create_all()
+
+
+    def tearDown(self):
+
+        db.drop_all()
+
+        self.appctx.pop()
+
+        self.app = None
+
+        self.client = None
+
+
+    def test_terms(self):
+
+        # Activate a test admin
+        admin_signup_data = {
+            "first_name": "Test",
+            "last_name": "Admin",
+            "email": "testadmin@gmail.com",
+            "password": "password"
+        }
+
+        response = self.client.post('/admin/register', json=admin_signup_data)
+
+        admin = Admin.query.filter_by(email='testadmin@gmail.com').first()
+
+        token = create_access_token(identity=admin.id)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+
+        # Open a term
+        term_data = {
+            "name": "2023/2024 First Semester",
+            "starts_on": "2023-09-01",
+            "ends_on": "2024-01-31"
+        }
+
+        response = self.client.post('/terms', json=term_data, headers=headers)
+
+        assert response.status_code == 201
+
+        assert response.json["status"] == "open"
+
+        response = self.client.post('/terms', json=term_data, headers=headers)
+
+        assert response.status_code == 409
+
+
+        # Enroll and grade students, who are placed in the open term
+        response = self.client.post('/jobs/students/import', json={"students": [
+            {
+                "first_name": "Test",
+                "last_name": f"Student{number}",
+                "email": f"teststudent{number}@gmail.com",
+                "password": "password",
+                "matric_no": f"ZSCH/23/03/000{number}"
+            }
+            for number in range(1, 3)
+        ]}, headers=headers)
+
+        response = self.client.post('/courses', json={"name": "Biology", "teacher": "Teacher B"}, headers=headers)
+
+        response = self.client.post('/courses', json={"name": "Algebra", "teacher": "Teacher A"}, headers=headers)
+
+        for student_id in (2, 3):
+            for course_id in (1, 2):
+                response = self.client.post(f'/courses/{course_id}/students/{student_id}', headers=headers)
+                assert response.json["term_id"] == 1
+
+        for student_id, course_id, percent_grade in [(2, 1, 95.0), (2, 2, 72.0), (3, 1, 85.0)]:
+            response = self.client.post(f'/students/{student_id}/grades', json={"course_id": course_id, "percent_grade": percent_grade}, headers=headers)
+
+
+        # An open term's GPA is aggregated on request
+        response = self.client.get('/students/2/terms/1/gpa', headers=headers)
+
+        assert response.status_code == 200
+
+        assert response.json == {
+            "student_id": 2,
+            "term_id": 1,
+            "term_name": "2023/2024 First Semester",
+            "term_status": "open",
+            "courses": 2,
+            "graded": 2,
+            "gpa": 3.15
+        }
+
+
+        # A retaken course in the next term is graded separately
+        response = self.client.post('/terms', json={"name": "2023/2024 Second Semester", "starts_on": "2024-02-01", "ends_on": "2024-06-30"}, headers=headers)
+
+        response = self.client.post('/courses/1/students/2', headers=headers)
+
+        assert response.json["term_id"] == 2
+
+        response = self.client.post('/students/2/grades', json={"course_id": 1, "percent_grade": 65.0}, headers=headers)
+
+        response = self.client.get('/students/2/grades?term_id=2', headers=headers)
+
+        assert [(grade["course_name"], grade["letter_grade"]) for grade in response.json] == [("Biology", "D")]
+
+        response = self.client.get('/students/2/summary', headers=headers)
+
+        assert [course["id"] for course in response.json["courses"]] == [1, 2]
+
+        assert [(grade["course_name"], grade["term_id"], grade["letter_grade"]) for grade in response.json["grades"]] == [
+            ("Biology", 1, "A"), ("Algebra", 1, "C"), ("Biology", 2, "D")
+        ]
+
+        assert response.json["cgpa"] == 2.53
+
+        response = self.client.get('/students/2/grades', headers=headers)
+
+        assert [(grade["course_name"], grade["term_id"], grade["letter_grade"]) for grade in response.json] == [
+            ("Biology", 1, "A"), ("Algebra", 1, "C"), ("Biology", 2, "D")
+        ]
+
+        response = self.client.get('/students/2/cgpa', headers=headers)
+
+        assert response.json["message"].endswith("CGPA is 2.53")
+
+        response = self.client.get('/courses/1/students', headers=headers)
+
+        assert sorted(student["id"] for student in response.json) == [2, 3]
+
+        response = self.client.get('/students/grades?term_id=1&sort=id', headers=headers)
+
+        assert [grade["percent_grade"] for grade in response.json] == [95.0, 72.0, 85.0]
+
+
+        # Closing a term precomputes its GPAs
+        response = self.client.get('/terms/1/gpa', headers=headers)
+
+        assert response.status_code == 409
+
+        response = self.client.post('/terms/1/close', headers=headers)
+
+        assert response.status_code == 202
+
+        response = self.client.get(f'/jobs/{response.json["id"]}', headers=headers)
+
+        assert response.json["status"] == "succeeded"
+
+        assert response.json["result"] == "Closed 2023/2024 First Semester, computed 2 term GPAs"
+
+        response = self.client.get('/terms/1/gpa?sort=-gpa', headers=headers)
+
+        assert response.status_code == 200
+
+        assert [(row["student_id"], row["courses"], row["graded"], row["gpa"]) for row in response.json] == [
+            (2, 2, 2, 3.15),
+            (3, 2, 1, 1.65)
+        ]
+
+        response = self.client.get('/students/3/terms/1/gpa', headers=headers)
+
+        assert response.json["term_status"] == "closed"
+
+        assert response.json["gpa"] == 1.65
+
+
+        # Closed terms take no new enrollments or grade changes and cannot be closed again
+        response = self.client.post('/courses/2/students/2?term_id=1', headers=headers)
+
+        assert response.status_code == 409
+
+        response = self.client.post('/students/3/grades', json={"course_id": 2, "percent_grade": 50.0}, headers=headers)
+
+        assert response.status_code == 409
+
+        response = self.client.put('/students/3/grades/1?term_id=1', json={"percent_grade": 50.0}, headers=headers)
+
+        assert response.status_code == 409
+
+        response = self.client.put('/students/grades/1', json={"percent_grade": 50.0}, headers=headers)
+
+        assert response.status_code == 409
+
+        response = self.client.delete('/students/grades/1', headers=headers)
+
+        assert response.status_code == 409
+
+        response = self.client.delete('/courses/1/students/2?term_id=1', headers=headers)
+
+        assert response.status_code == 409
+
+        # Dropping a course defaults to the enrollment in the open term
+        response = self.client.delete('/courses/1/students/2', headers=headers)
+
+        assert response.status_code == 200
+
+        response = self.client.delete('/courses/1/students/2?term_id=2', headers=headers)
+
+        assert response.status_code == 404
+
+        response = self.client.delete('/courses/1/students/2', headers=headers)
+
+        assert response.status_code == 409
+
+        response = self.client.get('/students/2/terms/1/gpa', headers=headers)
+
+        assert response.json["gpa"] == 3.15
+
+        # Recomputing letter grades leaves closed terms alone
+        for grade in Grade.query.filter(Grade.id.in_([1, 4])):
+            grade.letter_grade = "F"
+
+        db.session.commit()
+
+        response = self.client.post('/jobs/grades/recompute', headers=headers)
+
+        response = self.client.get(f'/jobs/{response.json["id"]}', headers=headers)
+
+        assert response.json["result"] == "Recomputed 4 grades, 1 changed, 3 in closed terms skipped"
+
+        assert [(grade.term_id, grade.letter_grade) for grade in Grade.query.filter(Grade.id.in_([1, 4])).order_by(Grade.id)] == [
+            (1, "F"), (2, "D")
+        ]
+
+        response = self.client.post('/terms/1/close', headers=headers)
+
+        assert response.status_code == 409
+
+
+    def test_term_closing(self):
+
+        admin_signup_data = {
+            "first_name": "Test",
+            "last_name": "Admin",
+            "email": "testadmin@gmail.com",
+            "password": "password"
+        }
+
+        response = self.client.post('/admin/register', json=admin_signup_data)
+
+        admin = Admin.query.filter_by(email='testadmin@gmail.com').first()
+
+        token = create_access_token(identity=admin.id)
+
+        headers = {
+            "Authorization": f"Bearer {token}"
+        }
+
+        response = self.client.post('/terms', json={"name": "2023/2024 First Semester", "starts_on": "2023-09-01", "ends_on": "2024-01-31"}, headers=headers)
+
+        response = self.client.post('/students/register', json={
+            "first_name": "Test",
+            "last_name": "Student",
+            "email": "teststudent@gmail.com",
+            "password": "password",
+            "matric_no": "ZSCH/23/03/0001"
+        }, headers=headers)
+
+        response = self.client.post('/courses', json={"name": "Biology", "teacher": "Teacher B"}, headers=headers)
+
+        response = self.client.post('/courses/1/students/2', headers=headers)
+
+
+        # Only one close request gets through while the rollover job is pending
+        assert Term.start_closing(1)
+
+        response = self.client.post('/terms/1/close', headers=headers)
+
+        assert response.status_code == 409
+
+        response = self.client.get('/terms/1', headers=headers)
+
+        assert response.json["status"] == "closing"
+
+
+        # A closing term already takes no grades
+        response = self.client.post('/students/2/grades', json={"course_id": 1, "percent_grade": 50.0}, headers=headers)
+
+        assert response.status_code == 409
+
+        response = self.client.delete('/courses/1/students/2', headers=headers)
+
+        assert response.status_code == 409
@@ -0,0 +1,92 @@
+import unittest
+from sqlalchemy import event
+from .. import create_app
+from ..config.config import config_dict
+from ..utils import db
+from ..utils.unit_of_work import unit_of_work, save_all, after_commit
+from ..models.courses import Course
+
+class UnitOfWorkTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self.app = create_app(config=config_dict['test'])
+
+        self.appctx = self.app.app_context()
+
+        self.appctx.push()
+
+        db.create_all()
+
+        self.commits = 0
+
+        event.listen(db.session, 'after_commit', self.count_commit)
+
+
+    def tearDown(self):
+
+        event.remove(db.session, 'after_commit', self.count_commit)
+
+        db.drop_all()
+
+        self.appctx.pop()
+
+        self.app = None
+
+
+    def count_commit(self, session):
+        self.commits += 1
+
+
+    def test_unit_of_work(self):
+
+        # Model helpers commit once at the end of the block
+        callbacks = []
+
+        with unit_of_work():
+            course = Course(name="Test Course", teacher="Test Teacher")
+            course.save()
+
+            assert course.id == 1
+
+            course.name = "Sample Course"
+            course.update()
+
+            save_all([Course(name=f"Course {number}", teacher=f"Teacher {number}") for number in range(3)])
+
+            after_commit(lambda: callbacks.append(self.commits))
+
+            assert self.commits == 0
+
+            assert callbacks == []
+
+        assert self.commits == 1
+
+        assert callbacks == [1]
+
+        assert Course.query.count() == 4
+
+
+        # Nested blocks join the outer one, and errors roll everything back
+        try:
+            with unit_of_work():
+                Course(name="Rolled Back", teacher="Rolled Back").save()
+
+                with unit_of_work():
+                    Course.get_by_id(1).delete()
+
+                raise RuntimeError("Abort")
+        except RuntimeError:
+            pass
+
+        assert self.commits == 1
+
+        assert Course.query.count() == 4
+
+        assert Course.query.filter_by(name="Rolled Back").first() is None
+
+
+        # Outside a unit of work, helpers commit straight away
+        Course(name="Direct", teacher="Direct").save()
+
+        assert self.commits == 2
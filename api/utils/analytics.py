@@ -0,0 +1,424 @@
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from itertools import islice
+from datetime import datetime
+from flask import current_app, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from . import db
+from .metrics import metrics
+from .tenants import current_tenant
+
+# Session.info key holding the grade changes of the open transaction
+CHANGES_KEY = 'analytics_changes'
+
+# Staged when grades changed in a way the index cannot follow row by row,
+# e.g. a bulk delete or a database cascade, so it is rebuilt instead
+STALE = ('stale',)
+
+# Deleting a row from these tables cascades to grades in the database
+CASCADE_TABLES = frozenset(['users', 'students', 'courses'])
+
+# Letter grades from the lowest, with the grade each starts at, as in get_letter_grade
+LETTER_BOUNDS = [('F', 0), ('E', 50), ('D', 60), ('C', 70), ('B', 80), ('A', 90)]
+
+
+def _float32(value:float) -> float:
+    return array('f', [value])[0]
+
+
+def _round(value):
+    return None if value is None else round(float(value), 2)
+
+
+# One course's grades as parallel arrays, 16 bytes a grade, kept in percent
+# grade order so that threshold and range counts are binary searches. Term
+# IDs are stored as 0 for grades without a term, like the grades unique index.
+class CourseColumns:
+
+    __slots__ = ('grade_ids', 'student_ids', 'term_ids', 'percents')
+
+    def __init__(self):
+        self.grade_ids = array('i')
+        self.student_ids = array('i')
+        self.term_ids = array('i')
+        self.percents = array('f')
+
+    def __len__(self):
+        return len(self.grade_ids)
+
+    # Only for rows arriving in percent grade order, as when building
+    def append(self, grade_id, student_id, term_id, percent):
+        self.grade_ids.append(grade_id)
+        self.student_ids.append(student_id or 0)
+        self.term_ids.append(term_id or 0)
+        self.percents.append(percent)
+
+    def set(self, grade_id, student_id, term_id, percent):
+        self.remove(grade_id)
+        position = bisect_right(self.percents, _float32(percent))
+        self.grade_ids.insert(position, grade_id)
+        self.student_ids.insert(position, student_id or 0)
+        self.term_ids.insert(position, term_id or 0)
+        self.percents.insert(position, percent)
+
+    def remove(self, grade_id):
+        try:
+            position = self.grade_ids.index(grade_id)
+        except ValueError:
+            return
+        for column in (self.grade_ids, self.student_ids, self.term_ids, self.percents):
+            del column[position]
+
+    def nbytes(self) -> int:
+        return sum(sys.getsizeof(column) for column in (self.grade_ids, self.student_ids, self.term_ids, self.percents))
+
+    # The percent grades, optionally of one term, still in ascending order
+    def values(self, term_id=None):
+        if term_id is None:
+            return self.percents
+        return [percent for percent, term in zip(self.percents, self.term_ids) if term == term_id]
+
+    # Positions of the grades under the threshold, lowest grade first
+    def below(self, threshold:float, term_id=None):
+        end = bisect_left(self.percents, threshold)
+        if term_id is None:
+            return range(end)
+        return [position for position in range(end) if self.term_ids[position] == term_id]
+
+
+# Count, total, extremes, histogram and letter grades, accumulated from
+# ascending runs of grades by binary search rather than a pass per grade
+class _Tally:
+
+    def __init__(self, bins:int=10):
+        self.bins = bins
+        self.count = 0
+        self.total = 0.0
+        self.low = None
+        self.high = None
+        self.histogram = [0] * bins
+        self.letters = {letter: 0 for letter, bound in reversed(LETTER_BOUNDS)}
+
+    def add(self, values):
+        if not len(values):
+            return
+        self.count += len(values)
+        self.total += sum(values)
+        self.low = values[0] if self.low is None else min(self.low, values[0])
+        self.high = values[-1] if self.high is None else max(self.high, values[-1])
+
+        # The last bin also holds grades of exactly 100
+        edges = [0] + [bisect_left(values, 100 * number / self.bins) for number in range(1, self.bins)] + [len(values)]
+        for number in range(self.bins):
+            self.histogram[number] += edges[number + 1] - edges[number]
+
+        edges = [0] + [bisect_left(values, bound) for letter, bound in LETTER_BOUNDS[1:]] + [len(values)]
+        for number, (letter, bound) in enumerate(LETTER_BOUNDS):
+            self.letters[letter] += edges[number + 1] - edges[number]
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'mean': _round(self.total / self.count) if self.count else None,
+            'min': _round(self.low),
+            'max': _round(self.high)
+        }
+
+    def distribution(self) -> dict:
+        width = 100 / self.bins
+        return {
+            **self.summary(),
+            'histogram': [
+                {'low': _round(number * width), 'high': _round((number + 1) * width), 'count': count}
+                for number, count in enumerate(self.histogram)
+            ],
+            'letters': self.letters
+        }
+
+
+# Per-process columnar copy of the grades table, grouped by course, for
+# analytics that would otherwise scan the table. Built from the database
+# and kept current from this process's commits; writes made by other
+# processes show up when the index is next rebuilt.
+class GradeIndex:
+
+    def __init__(self):
+        self.courses = {}
+        self.lock = threading.RLock()
+        self.build_lock = threading.Lock()
+        self.stale = True
+        self.built_at = None
+        self.built_on = None
+        self.build_seconds = None
+        self._building = False
+        self._replay = []
+
+    def needs_build(self, max_age:float) -> bool:
+        return self.stale or self.built_at is None or bool(max_age and time.monotonic() - self.built_at > max_age)
+
+    # Read every committed grade into new columns, then swap them in. Changes
+    # committed while reading are applied again afterwards; they set or remove
+    # whole grades, so applying one the read already saw does no harm.
+    def build(self, batch_size:int):
+        started = time.perf_counter()
+        with self.lock:
+            self._building = True
+            self._replay = []
+
+        grades = db.metadata.tables['grades']
+        stmt = select(
+            grades.c.id, grades.c.course_id, grades.c.student_id, grades.c.term_id, grades.c.percent_grade
+        ).where(grades.c.course_id.is_not(None)).order_by(grades.c.course_id, grades.c.percent_grade, grades.c.id)
+
+        # Read from the primary even while serving a GET: a lagging replica
+        # would miss changes committed before the build started, which are
+        # not replayed
+        courses = {}
+        try:
+            result = db.session.execute(stmt.execution_options(yield_per=batch_size), bind_arguments={'primary': True})
+            for rows in result.partitions():
+                for grade_id, course_id, student_id, term_id, percent in rows:
+                    columns = courses.get(course_id)
+                    if columns is None:
+                        columns = courses[course_id] = CourseColumns()
+                    columns.append(grade_id, student_id, term_id, percent)
+        except BaseException:
+            with self.lock:
+                self._building = False
+                self._replay = []
+            raise
+
+        with self.lock:
+            self.courses = courses
+            self.stale = False
+            self._building = False
+            replay, self._replay = self._replay, []
+            self._apply(replay)
+            self.built_at = time.monotonic()
+            self.built_on = datetime.utcnow()
+            self.build_seconds = time.perf_counter() - started
+
+    # Build unless another thread already has while this one waited, and
+    # return whether this call built it
+    def ensure_built(self, batch_size:int, max_age:float) -> bool:
+        if not self.needs_build(max_age):
+            return False
+        with self.build_lock:
+            if self.needs_build(max_age):
+                self.build(batch_size)
+                return True
+        return False
+
+    def apply(self, changes:list):
+        with self.lock:
+            if self._building:
+                self._replay.extend(changes)
+            if self.built_at is not None:
+                self._apply(changes)
+
+    def _apply(self, changes:list):
+        for change in changes:
+            if change is STALE:
+                self.stale = True
+            elif change[0] == 'upsert':
+                action, grade_id, old_course_id, course_id, student_id, term_id, percent = change
+                if old_course_id != course_id and old_course_id in self.courses:
+                    self.courses[old_course_id].remove(grade_id)
+                if course_id is not None:
+                    columns = self.courses.get(course_id)
+                    if columns is None:
+                        columns = self.courses[course_id] = CourseColumns()
+                    columns.set(grade_id, student_id, term_id, percent)
+            else:
+                action, grade_id, course_id = change
+                if course_id in self.courses:
+                    self.courses[course_id].remove(grade_id)
+
+    def stats(self) -> dict:
+        with self.lock:
+            grades = sum(len(columns) for columns in self.courses.values())
+            nbytes = sys.getsizeof(self.courses) + sum(columns.nbytes() for columns in self.courses.values())
+            return {
+                'courses': len(self.courses),
+                'grades': grades,
+                'bytes': nbytes,
+                'bytes_per_grade': _round(nbytes / grades) if grades else None,
+                'built_at': self.built_on,
+                'build_seconds': _round(self.build_seconds),
+                'stale': self.stale
+            }
+
+    # Count, mean, extremes, histogram and letter grades of one course, or of
+    # every course when course_id is None
+    def distribution(self, course_id=None, term_id=None, bins:int=10) -> dict:
+        tally = _Tally(bins)
+        with self.lock:
+            if course_id is None:
+                courses = self.courses.values()
+            else:
+                courses = [self.courses[course_id]] if course_id in self.courses else []
+            for columns in courses:
+                tally.add(columns.values(term_id))
+        return tally.distribution()
+
+    def course_averages(self, term_id=None) -> list:
+        averages = []
+        with self.lock:
+            for course_id in sorted(self.courses):
+                tally = _Tally()
+                tally.add(self.courses[course_id].values(term_id))
+                if tally.count:
+                    averages.append({'course_id': course_id, **tally.summary()})
+        return averages
+
+    # Grades under the threshold, lowest first, with how many there are in all
+    def at_risk(self, threshold:float, course_id=None, term_id=None, limit:int=100):
+        runs, total = [], 0
+        with self.lock:
+            if course_id is None:
+                courses = self.courses.items()
+            else:
+                courses = [(course_id, self.courses[course_id])] if course_id in self.courses else []
+
+            # Each course's grades are already in order, so merging them
+            # only reads as far as the first `limit` grades overall
+            for course, columns in courses:
+                positions = columns.below(threshold, term_id)
+                total += len(positions)
+                runs.append([
+                    (columns.percents[position], columns.student_ids[position], course, columns.grade_ids[position])
+                    for position in positions[:limit]
+                ])
+            found = list(islice(merge(*runs), limit))
+
+        return [
+            {'student_id': student_id, 'course_id': course, 'grade_id': grade_id, 'percent_grade': _round(percent)}
+            for percent, student_id, course, grade_id in found
+        ], total
+
+
+class GradeAnalytics:
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    # One index per tenant, each built on its first query. A single school's
+    # index is built at startup instead, unless the database is not migrated
+    # yet and there are no grades to read.
+    def init_app(self, app):
+        if not app.config['ANALYTICS_INDEX_ENABLED']:
+            return
+
+        indexes = app.extensions['grade_analytics'] = {}
+        if app.config['TENANTS']:
+            return
+
+        index = indexes[None] = GradeIndex()
+        with app.app_context():
+            try:
+                index.build(app.config['ANALYTICS_BATCH_SIZE'])
+            except (OperationalError, ProgrammingError):
+                app.logger.info("Grade analytics index not built, the grades table is not ready")
+            finally:
+                db.session.remove()
+
+    @property
+    def enabled(self) -> bool:
+        return 'grade_analytics' in current_app.extensions
+
+    # The current tenant's index, rebuilt first if it is stale or older than
+    # ANALYTICS_MAX_AGE. A rebuild counts as a cache miss, a ready index as a hit.
+    @property
+    def index(self) -> GradeIndex:
+        indexes = current_app.extensions['grade_analytics']
+        index = indexes.get(current_tenant())
+        if index is None:
+            index = indexes.setdefault(current_tenant(), GradeIndex())
+        built = index.ensure_built(current_app.config['ANALYTICS_BATCH_SIZE'], current_app.config['ANALYTICS_MAX_AGE'])
+        metrics.count_cache('grade_analytics', not built)
+        return index
+
+
+analytics = GradeAnalytics()
+
+
+def _enabled() -> bool:
+    return has_app_context() and 'grade_analytics' in current_app.extensions
+
+
+def _stage(session, change):
+    session.info.setdefault(CHANGES_KEY, []).append(change)
+
+
+def _upsert_change(grade, old_course_id):
+    return ('upsert', grade.id, old_course_id, grade.course_id, grade.student_id, grade.term_id, grade.percent_grade)
+
+
+# Stage a grade written with a Core statement run with the analytics_tracked
+# execution option, which the ORM flush hooks below do not see
+def track_grade(grade):
+    if _enabled():
+        _stage(db.session(), _upsert_change(grade, grade.course_id))
+
+
+# Grade changes are staged as they are flushed, with their values read at
+# flush time, and applied to the index only once the transaction commits
+@event.listens_for(Session, 'after_flush')
+def _stage_flushed_grades(session, flush_context):
+    if not _enabled():
+        return
+
+    for instance in list(session.new) + list(session.dirty):
+        if getattr(instance, '__tablename__', None) == 'grades':
+            history = inspect(instance).attrs.course_id.history
+            old_course_id = history.deleted[0] if history.deleted else instance.course_id
+            _stage(session, _upsert_change(instance, old_course_id))
+
+    for instance in session.deleted:
+        tablename = getattr(instance, '__tablename__', None)
+        if tablename == 'grades':
+            _stage(session, ('delete', instance.id, instance.course_id))
+        elif tablename in CASCADE_TABLES:
+            _stage(session, STALE)
+
+
+# Bulk and Core writes through the session change grades the flush hooks
+# never see, so they mark the index stale
+@event.listens_for(Session, 'do_orm_execute')
+def _stage_bulk_writes(orm_execute_state):
+    state = orm_execute_state
+    if not (state.is_insert or state.is_update or state.is_delete) or not _enabled():
+        return
+    if state.execution_options.get('analytics_tracked'):
+        return
+
+    tablename = getattr(getattr(state.statement, 'table', None), 'name', None)
+    if tablename == 'grades' or (state.is_delete and tablename in CASCADE_TABLES):
+        _stage(state.session, STALE)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_committed_grades(session):
+    changes = session.info.pop(CHANGES_KEY, None)
+    if changes and _enabled():
+        index = current_app.extensions['grade_analytics'].get(current_tenant())
+        if index is not None:
+            index.apply(changes)
+
+
+# A rolled back savepoint may have undone some of the staged changes
+# without saying which, so the index is rebuilt after the commit
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_rolled_back_grades(session, previous_transaction):
+    if previous_transaction.nested:
+        if session.info.get(CHANGES_KEY):
+            _stage(session, STALE)
+    else:
+        session.info.pop(CHANGES_KEY, None)
@@ -0,0 +1,137 @@
+import atexit
+import logging
+import queue
+import threading
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import insert
+from . import db
+from .tenants import current_tenant
+from .unit_of_work import after_commit
+from ..models.grade_audit import GradeAudit
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+# Per-app queue of grade audit records, each with the tenant it belongs
+# to, drained in batched inserts.
+# With AUDIT_BACKGROUND a daemon thread does the draining; otherwise
+# records are written once the request has been torn down.
+class AuditQueue:
+
+    def __init__(self, app):
+        self.app = app
+        self.queue = queue.Queue()
+        self.batch_size = app.config['AUDIT_BATCH_SIZE']
+        self.shutdown_timeout = app.config['AUDIT_SHUTDOWN_TIMEOUT']
+        self.thread = None
+
+        if app.config['AUDIT_BACKGROUND']:
+            self.thread = threading.Thread(target=self._run, name='grade-audit-writer', daemon=True)
+            self.thread.start()
+            atexit.register(self.stop)
+
+    def put(self, tenant, record:dict):
+        self.queue.put((tenant, record))
+
+    def _next_batch(self, first=None) -> list:
+        batch = [] if first is None else [first]
+        while len(batch) < self.batch_size:
+            try:
+                record = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is _STOP:
+                # Leave the sentinel for the writer loop to see
+                self.queue.task_done()
+                self.queue.put(_STOP)
+                break
+            batch.append(record)
+        return batch
+
+    # Batch items are (tenant, record) pairs, written to each tenant's database
+    def _write(self, batch:list):
+        by_tenant = {}
+        for tenant, record in batch:
+            by_tenant.setdefault(tenant, []).append(record)
+
+        try:
+            for tenant, records in by_tenant.items():
+                try:
+                    with self.app.app_context():
+                        engine = self.app.extensions['tenants'].engine(tenant) if tenant is not None else db.engine
+                        with engine.begin() as connection:
+                            connection.execute(insert(GradeAudit.__table__), records)
+                except Exception:
+                    logger.exception("Failed to write %d grade audit records", len(records))
+        finally:
+            for _ in batch:
+                self.queue.task_done()
+
+    def _run(self):
+        while True:
+            record = self.queue.get()
+            if record is _STOP:
+                self.queue.task_done()
+                break
+            self._write(self._next_batch(record))
+
+    # Write everything queued so far, from the writer thread if there is one
+    def flush(self):
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.join()
+            return
+
+        batch = self._next_batch()
+        while batch:
+            self._write(batch)
+            batch = self._next_batch()
+
+    # Drain the queue and stop the writer thread
+    def stop(self):
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join(self.shutdown_timeout)
+        self.flush()
+
+
+class AuditLog:
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['grade_audit'] = AuditQueue(app)
+
+        if not app.config['AUDIT_BACKGROUND']:
+            @app.teardown_request
+            def flush_grade_audit(exception):
+                app.extensions['grade_audit'].flush()
+
+    # Queue an audit record for a grade change, without touching the database.
+    # Inside a unit of work the record is only queued once the change commits.
+    def record(self, action:str, grade, admin_id:int, old_percent_grade=None, old_letter_grade=None):
+        audit_queue = current_app.extensions['grade_audit']
+        record = {
+            'grade_id': grade.id,
+            'student_id': grade.student_id,
+            'course_id': grade.course_id,
+            'action': action,
+            'old_percent_grade': old_percent_grade,
+            'new_percent_grade': grade.percent_grade if action != 'delete' else None,
+            'old_letter_grade': old_letter_grade,
+            'new_letter_grade': grade.letter_grade if action != 'delete' else None,
+            'admin_id': admin_id,
+            'created_at': datetime.utcnow()
+        }
+        tenant = current_tenant()
+        after_commit(lambda: audit_queue.put(tenant, record))
+
+    def flush(self):
+        current_app.extensions['grade_audit'].flush()
+
+
+audit_log = AuditLog()
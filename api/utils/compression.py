@@ -0,0 +1,212 @@
+import gzip
+import threading
+import time
+import zlib
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Encoders keyed by Content-Encoding token, each offering a one-shot
+# compress and an incremental compressor for streamed bodies
+class GzipEncoder:
+
+    def __init__(self, level:int):
+        self.level = level
+
+    def compress(self, data:bytes) -> bytes:
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def stream(self, chunks):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+class BrotliEncoder:
+
+    def __init__(self, level:int):
+        self.level = level
+
+    def compress(self, data:bytes) -> bytes:
+        return brotli.compress(data, quality=self.level)
+
+    def stream(self, chunks):
+        compressor = brotli.Compressor(quality=self.level)
+        for chunk in chunks:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+class ZstdEncoder:
+
+    def __init__(self, level:int):
+        self.level = level
+
+    def compress(self, data:bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def stream(self, chunks):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+# Encoders this worker can offer, best first; gzip is always available
+def available_encoders(config) -> dict:
+    encoders = {}
+    if brotli is not None:
+        encoders['br'] = BrotliEncoder(config['COMPRESS_BR_LEVEL'])
+    if zstandard is not None:
+        encoders['zstd'] = ZstdEncoder(config['COMPRESS_ZSTD_LEVEL'])
+    encoders['gzip'] = GzipEncoder(config['COMPRESS_GZIP_LEVEL'])
+    return encoders
+
+
+# Bytes in, bytes out and time spent per encoding, for the metrics endpoint
+class CompressionStats:
+
+    def __init__(self):
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def record(self, encoding:str, size_in:int, size_out:int, seconds:float):
+        with self.lock:
+            counter = self.counters.setdefault(
+                encoding, {'responses': 0, 'bytes_in': 0, 'bytes_out': 0, 'seconds': 0.0}
+            )
+            counter['responses'] += 1
+            counter['bytes_in'] += size_in
+            counter['bytes_out'] += size_out
+            counter['seconds'] += seconds
+
+    def stats(self) -> dict:
+        with self.lock:
+            stats = {}
+            for encoding, counter in self.counters.items():
+                stats[encoding] = dict(counter)
+                stats[encoding]['ratio'] = (
+                    counter['bytes_out'] / counter['bytes_in'] if counter['bytes_in'] else None
+                )
+            return stats
+
+
+class Compression:
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['compression'] = {
+            'encoders': available_encoders(app.config),
+            'stats': CompressionStats()
+        }
+
+        if app.config['COMPRESS_ENABLED']:
+            app.after_request(self.compress_response)
+
+    def stats(self) -> dict:
+        return current_app.extensions['compression']['stats'].stats()
+
+    # Pick the encoding with the highest client q-value, preferring ours on ties
+    def negotiate(self, encoders:dict):
+        best, best_quality = None, 0
+        for encoding in encoders:
+            quality = request.accept_encodings[encoding]
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def compress_response(self, response):
+        config = current_app.config
+
+        if response.mimetype not in config['COMPRESS_MIMETYPES']:
+            return response
+
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or 'Content-Range' in response.headers
+                or 'X-Sendfile' in response.headers):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        extension = current_app.extensions['compression']
+        encoding = self.negotiate(extension['encoders'])
+        if encoding is None:
+            return response
+        encoder = extension['encoders'][encoding]
+
+        if response.is_streamed:
+            # Files and generators are compressed chunk by chunk as they are sent
+            response.response = self._stream(encoder, encoding, response.response, extension['stats'])
+            response.direct_passthrough = False
+            response.headers.pop('Content-Length', None)
+            response.headers.pop('Accept-Ranges', None)
+        else:
+            data = response.get_data()
+            if len(data) < config['COMPRESS_MIN_SIZE']:
+                return response
+
+            started = time.perf_counter()
+            compressed = encoder.compress(data)
+            extension['stats'].record(encoding, len(data), len(compressed), time.perf_counter() - started)
+            response.set_data(compressed)
+
+        response.headers['Content-Encoding'] = encoding
+
+        # The compressed body is a different representation of the same resource
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+        return response
+
+    def _stream(self, encoder, encoding, body, stats):
+        size_in = size_out = 0
+        seconds = 0.0
+
+        def counted():
+            nonlocal size_in
+            for chunk in body:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                size_in += len(chunk)
+                yield chunk
+
+        try:
+            chunks = encoder.stream(counted())
+            while True:
+                started = time.perf_counter()
+                try:
+                    data = next(chunks)
+                except StopIteration:
+                    break
+                finally:
+                    seconds += time.perf_counter() - started
+                size_out += len(data)
+                yield data
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+            stats.record(encoding, size_in, size_out, seconds)
+
+
+compression = Compression()
@@ -1,15 +1,29 @@
 from ..models.users import User
-from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from ..models.admin import Admin
+from ..models.students import Student
+from . import db
+from flask_jwt_extended import current_user, verify_jwt_in_request
+from sqlalchemy import select
+from sqlalchemy.orm import with_polymorphic
 from functools import wraps
 from http import HTTPStatus
 
+# Load the user behind a JWT as their Student or Admin subclass in a single
+# query. Registered as the JWTManager user_lookup_loader, which keeps the
+# result on g as current_user, and the instance stays in the session's
+# identity map so later Student.get_by_id() calls for it need no query.
+# It runs before the JWT identity is known to the replica pins, and a stale
+# replica row would then be reused for the whole request, so it always reads
+# from the primary.
+def load_user(identity):
+    users = with_polymorphic(User, [Student, Admin])
+    return db.session.execute(
+        select(users).where(users.id == identity), bind_arguments={'primary': True}
+    ).scalars().first()
+
 # Get the authorized user type
-def get_user_type(id:int):
-    user = User.query.filter_by(id=id).first()
-    if user:
-        return user.user_type
-    else:
-        return None
+def get_user_type():
+    return current_user.user_type if current_user else None
 
 # Custom decorator to verify admin access
 def admin_required():
@@ -17,10 +31,9 @@ def admin_required():
         @wraps(fn)
         def decorator(*args, **kwargs):
             verify_jwt_in_request()
-            claims = get_jwt()
-            if get_user_type(claims['sub']) == 'admin':
+            if get_user_type() == 'admin':
                 return fn(*args, **kwargs)
             else:
                 return {"message": "Administrator access required"}, HTTPStatus.FORBIDDEN
         return decorator
-    return wrapper
\ No newline at end of file
+    return wrapper
@@ -0,0 +1,65 @@
+from flask import request
+from werkzeug.exceptions import BadRequest
+
+# Comparison operators available to list filters
+OPERATORS = {
+    'eq': lambda column, value: column == value,
+    'prefix': lambda column, value: column.startswith(value, autoescape=True),
+    'min': lambda column, value: column >= value,
+    'max': lambda column, value: column <= value
+}
+
+OPERATOR_DESCRIPTIONS = {
+    'eq': "Equal to",
+    'prefix': "Starts with",
+    'min': "Greater than or equal to",
+    'max': "Less than or equal to"
+}
+
+
+# Convert a query string value to the column's Python type
+def _cast(column, param:str, value:str):
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+
+    try:
+        return python_type(value)
+    except (TypeError, ValueError):
+        raise BadRequest(f"Invalid value for '{param}': {value}")
+
+
+# Swagger params documenting a resource's filters and sortable fields
+def filter_params(filters:dict, sorts:dict) -> dict:
+    params = {}
+    for param, (column, operator) in filters.items():
+        params[param] = f"{OPERATOR_DESCRIPTIONS[operator]} - filters on {column.key}"
+    params['sort'] = "Comma-separated fields to sort by, prefix with '-' for descending: " + ", ".join(sorts)
+    return params
+
+
+# Translate ?<filter>=value and ?sort=-field,field into WHERE and ORDER BY clauses.
+# Filters map a query parameter to (column, operator); sorts map a field name
+# to an indexed column, and any field outside that allow-list is rejected.
+def apply_filters(query, filters:dict, sorts:dict, default_sort:str=None):
+    for param, (column, operator) in filters.items():
+        value = request.args.get(param)
+        if value is None or value == '':
+            continue
+        query = query.filter(OPERATORS[operator](column, _cast(column, param, value)))
+
+    sort = request.args.get('sort', default_sort)
+    if not sort:
+        return query
+
+    order_by = []
+    for field in sort.split(','):
+        field = field.strip()
+        name = field.lstrip('-')
+        if name not in sorts:
+            raise BadRequest(f"Cannot sort by '{name}'. Sortable fields: {', '.join(sorts)}")
+        column = sorts[name]
+        order_by.append(column.desc() if field.startswith('-') else column.asc())
+
+    return query.order_by(*order_by)
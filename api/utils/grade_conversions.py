@@ -1,3 +1,5 @@
+from sqlalchemy import case
+
 # Convert grade from percentage value to a letter
 def get_letter_grade(percent_grade):
     if percent_grade >= 90:
@@ -24,4 +26,14 @@ def convert_grade_to_gpa(letter_grade):
     elif letter_grade == 'D':
         return 1.3
     else:
-        return 0
\ No newline at end of file
+        return 0
+
+# The same conversion as a SQL expression, for aggregating GPAs in the database
+def gpa_points(letter_grade_column):
+    return case(
+        (letter_grade_column == 'A', 4.0),
+        (letter_grade_column == 'B', 3.3),
+        (letter_grade_column == 'C', 2.3),
+        (letter_grade_column == 'D', 1.3),
+        else_=0.0
+    )
@@ -0,0 +1,99 @@
+import hashlib
+import json
+from datetime import datetime
+from functools import wraps
+from http import HTTPStatus
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+from . import db
+from ..models.idempotency import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+
+def request_fingerprint() -> str:
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(request.path.encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _replay(stored:IdempotencyKey, fingerprint:str):
+    # The request that reserved the key rolled back before storing a response
+    if stored is None:
+        return {"message": f"A request with {IDEMPOTENCY_HEADER} was interrupted, retry it"}, HTTPStatus.CONFLICT
+
+    if stored.request_hash != fingerprint:
+        return {
+            "message": f"{IDEMPOTENCY_HEADER} {stored.key} was already used for a different request"
+        }, HTTPStatus.UNPROCESSABLE_ENTITY
+
+    if stored.status_code is None:
+        return {"message": f"A request with {IDEMPOTENCY_HEADER} {stored.key} is still in progress"}, HTTPStatus.CONFLICT
+
+    return json.loads(stored.response), stored.status_code, {'Idempotent-Replayed': 'true'}
+
+
+# Make a POST safe to retry: the first request with a given Idempotency-Key
+# runs and its response is stored, later ones with the same key and body
+# get that response back. The key is reserved before the view runs, so a
+# concurrent retry waits on the unique constraint rather than running twice.
+# Apply below @unit_of_work() so the response is stored in the same commit.
+def idempotent():
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if key is None:
+                return fn(*args, **kwargs)
+
+            if not key or len(key) > 100:
+                return {"message": f"{IDEMPOTENCY_HEADER} must be 1 to 100 characters"}, HTTPStatus.BAD_REQUEST
+
+            user_id = get_jwt_identity()
+            fingerprint = request_fingerprint()
+
+            stored = IdempotencyKey.get_by_key(user_id, key)
+            if stored is not None and stored.created_at < datetime.utcnow() - current_app.config['IDEMPOTENCY_KEY_TTL']:
+                db.session.delete(stored)
+                db.session.flush()
+                stored = None
+
+            if stored is not None:
+                return _replay(stored, fingerprint)
+
+            record = IdempotencyKey(
+                key=key, user_id=user_id, method=request.method, path=request.path, request_hash=fingerprint
+            )
+            try:
+                db.session.add(record)
+                db.session.flush()
+            except IntegrityError:
+                db.session.rollback()
+                return _replay(IdempotencyKey.get_by_key(user_id, key), fingerprint)
+
+            result = fn(*args, **kwargs)
+
+            # A view that rolls the session back, e.g. after losing an insert
+            # race, takes the reservation with it, so the key is reserved again
+            if inspect(record).transient:
+                record = IdempotencyKey(
+                    key=key, user_id=user_id, method=request.method, path=request.path, request_hash=fingerprint
+                )
+                db.session.add(record)
+
+            body, status = (result[0], result[1]) if isinstance(result, tuple) else (result, HTTPStatus.OK)
+            record.status_code = int(status)
+            record.response = json.dumps(body)
+            try:
+                db.session.flush()
+            except IntegrityError:
+                # A retry took the key meanwhile and stores its own response
+                db.session.rollback()
+
+            return result
+        return decorator
+    return wrapper
@@ -0,0 +1,102 @@
+import atexit
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from . import db
+from .tenants import current_tenant, tenant_context
+from ..models.jobs import Job
+
+logger = logging.getLogger(__name__)
+
+
+# Handle given to a running task for reporting progress and its result file.
+# Progress is stored on the job row and saved with the task's next commit,
+# so it never needs a second connection competing for the database.
+class JobContext:
+
+    def __init__(self, job, result_dir:str):
+        self.job = job
+        self.result_dir = result_dir
+
+    @property
+    def id(self) -> str:
+        return self.job.id
+
+    def progress(self, done:int, total:int=None):
+        self.job.progress = done
+        if total is not None:
+            self.job.total = total
+
+    def set_result_path(self, path:str):
+        self.job.result_path = path
+
+
+# Per-app executor running jobs off the request path, with no broker.
+# JOBS_EAGER runs each job inline instead, which keeps tests deterministic.
+class JobExecutor:
+
+    def __init__(self, app):
+        self.app = app
+        self.eager = app.config['JOBS_EAGER']
+        self.result_dir = app.config['JOBS_RESULT_DIR']
+        self.executor = None
+
+        if not self.eager:
+            self.executor = ThreadPoolExecutor(
+                max_workers=app.config['JOBS_MAX_WORKERS'], thread_name_prefix='job'
+            )
+            atexit.register(self.executor.shutdown, wait=True)
+
+    def submit(self, name:str, task, created_by:int=None, **kwargs) -> Job:
+        job = Job(
+            id = uuid.uuid4().hex,
+            name = name,
+            status = 'queued',
+            created_by = created_by
+        )
+        job.save()
+
+        if self.eager:
+            self._run(job.id, task, kwargs, current_tenant())
+        else:
+            self.executor.submit(self._run, job.id, task, kwargs, current_tenant())
+
+        return job
+
+    def _run(self, job_id:str, task, kwargs:dict, tenant=None):
+        with tenant_context(self.app, tenant):
+            job = db.session.get(Job, job_id)
+            job.status = 'running'
+            job.started_at = datetime.utcnow()
+            db.session.commit()
+
+            try:
+                job.result = task(JobContext(job, self.result_dir), **kwargs)
+                job.status = 'succeeded'
+            except Exception as error:
+                logger.exception("Job %s (%s) failed", job_id, job.name)
+                db.session.rollback()
+                job.status = 'failed'
+                job.error = str(error)
+
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+
+
+class JobRunner:
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['job_runner'] = JobExecutor(app)
+
+    # Queue a task and return its job row immediately
+    def submit(self, name:str, task, created_by:int=None, **kwargs) -> Job:
+        return current_app.extensions['job_runner'].submit(name, task, created_by=created_by, **kwargs)
+
+
+job_runner = JobRunner()
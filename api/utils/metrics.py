@@ -0,0 +1,362 @@
+import atexit
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from http import HTTPStatus
+from flask import current_app, g, request
+from sqlalchemy import event, text
+from . import db
+
+logger = logging.getLogger(__name__)
+
+# Request latency buckets in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Metric families exposed on /metrics: name -> (type, help)
+FAMILIES = {
+    'http_requests_total': ('counter', "HTTP requests by namespace, route, method and status"),
+    'http_request_duration_seconds': ('histogram', "HTTP request latency by namespace, route and method"),
+    'db_queries_total': ('counter', "SQL statements executed by engine"),
+    'db_pool_connections': ('gauge', "Pooled database connections by engine and state"),
+    'cache_requests_total': ('counter', "Lookups of the swagger_spec and grade_analytics caches by result"),
+    'rate_limit_requests_total': ('counter', "Rate limiter decisions by limiter and result"),
+    'compression_responses_total': ('counter', "Compressed responses by encoding"),
+    'compression_bytes_total': ('counter', "Bytes before and after compression by encoding"),
+    'compression_seconds_total': ('counter', "Time spent compressing by encoding"),
+    'notifications_total': ('counter', "Grade notifications by delivery result: sent, retried or failed"),
+    'notification_batches_total': ('counter', "Grade notification sink calls, one per student per dispatch"),
+    'notification_delivery_seconds': ('summary', "Time from a grade notification being queued to being sent")
+}
+
+SUFFIXES = ('_bucket', '_sum', '_count')
+
+
+def _family(sample:str) -> str:
+    if sample not in FAMILIES:
+        for suffix in SUFFIXES:
+            if sample.endswith(suffix):
+                return sample[:-len(suffix)]
+    return sample
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+# Render samples {(name, labels): value} in the Prometheus text format
+def render(samples:dict) -> str:
+    families = defaultdict(list)
+    for (name, labels), value in samples.items():
+        families[_family(name)].append((name, labels, value))
+
+    lines = []
+    for family in sorted(families):
+        kind, help_text = FAMILIES.get(family, ('untyped', family))
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} {kind}")
+        for name, labels, value in families[family]:
+            if labels:
+                label_text = ','.join(f'{key}="{_escape(label)}"' for key, label in labels)
+                lines.append(f"{name}{{{label_text}}} {_format_value(value)}")
+            else:
+                lines.append(f"{name} {_format_value(value)}")
+
+    return '\n'.join(lines) + '\n'
+
+
+# Counters for this worker process. Every update is a dict increment under
+# a lock, so instrumenting a request costs a few microseconds.
+class MetricsRegistry:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self.durations = {}
+        self.queries = defaultdict(int)
+        self.cache = defaultdict(int)
+
+    def observe_request(self, namespace:str, route:str, method:str, status:int, seconds:float):
+        with self.lock:
+            self.requests[(namespace, route, method, status)] += 1
+            if seconds is None:
+                return
+            histogram = self.durations.get((namespace, route, method))
+            if histogram is None:
+                histogram = self.durations[(namespace, route, method)] = [0] * (len(BUCKETS) + 1) + [0.0]
+            histogram[bisect.bisect_left(BUCKETS, seconds)] += 1
+            histogram[-1] += seconds
+
+    def count_query(self, engine:str):
+        with self.lock:
+            self.queries[engine] += 1
+
+    def count_cache(self, cache:str, hit:bool):
+        with self.lock:
+            self.cache[(cache, 'hit' if hit else 'miss')] += 1
+
+    def samples(self) -> dict:
+        samples = {}
+        with self.lock:
+            for (namespace, route, method, status), count in self.requests.items():
+                labels = (('namespace', namespace), ('route', route), ('method', method), ('status', str(status)))
+                samples[('http_requests_total', labels)] = count
+
+            for (namespace, route, method), histogram in self.durations.items():
+                labels = (('namespace', namespace), ('route', route), ('method', method))
+                cumulative = 0
+                for bound, count in zip(BUCKETS + (float('inf'),), histogram):
+                    cumulative += count
+                    samples[('http_request_duration_seconds_bucket', labels + (('le', _format_value(float(bound))),))] = cumulative
+                samples[('http_request_duration_seconds_sum', labels)] = histogram[-1]
+                samples[('http_request_duration_seconds_count', labels)] = cumulative
+
+            for engine, count in self.queries.items():
+                samples[('db_queries_total', (('engine', engine),))] = count
+
+            for (cache, result), count in self.cache.items():
+                samples[('cache_requests_total', (('cache', cache), ('result', result)))] = count
+
+        return samples
+
+
+# Connections checked out and held idle by an engine's pool, where the pool keeps count
+def pool_samples(name:str, engine) -> dict:
+    pool = engine.pool
+    samples = {}
+    for state, method in (('checked_out', 'checkedout'), ('idle', 'checkedin'), ('size', 'size')):
+        if hasattr(pool, method):
+            samples[('db_pool_connections', (('engine', name), ('state', state)))] = getattr(pool, method)()
+    return samples
+
+
+# Everything this worker knows: request, query and cache counters plus
+# the stats kept by the rate limiter, compression and notification extensions
+def collect(app) -> dict:
+    samples = app.extensions['metrics'].samples()
+
+    for name, engine in app.extensions['metrics_engines'].items():
+        samples.update(pool_samples(name, engine))
+
+    tenant_engines = app.extensions.get('tenants')
+    if tenant_engines is not None:
+        for name, engine in tenant_engines.live().items():
+            samples.update(pool_samples(f"tenant:{name}", engine))
+
+    for name, limiter in app.extensions.get('rate_limits', {}).items():
+        stats = limiter.stats()
+        for result in ('allowed', 'throttled'):
+            samples[('rate_limit_requests_total', (('limiter', name), ('result', result)))] = stats[result]
+
+    compression = app.extensions.get('compression')
+    if compression is not None:
+        for encoding, stats in compression['stats'].stats().items():
+            labels = (('encoding', encoding),)
+            samples[('compression_responses_total', labels)] = stats['responses']
+            samples[('compression_bytes_total', labels + (('direction', 'in'),))] = stats['bytes_in']
+            samples[('compression_bytes_total', labels + (('direction', 'out'),))] = stats['bytes_out']
+            samples[('compression_seconds_total', labels)] = stats['seconds']
+
+    dispatcher = app.extensions.get('notifications')
+    if dispatcher is not None:
+        stats = dispatcher.stats.stats()
+        for result in ('sent', 'retried', 'failed'):
+            samples[('notifications_total', (('result', result),))] = stats[result]
+        samples[('notification_batches_total', ())] = stats['batches']
+        samples[('notification_delivery_seconds_sum', ())] = stats['delivery_seconds']
+        samples[('notification_delivery_seconds_count', ())] = stats['sent']
+
+    return samples
+
+
+def _pid_alive(pid:int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+# With several worker processes, each one writes a snapshot of its samples
+# to METRICS_MULTIPROC_DIR and a scrape adds them together. Counters of
+# workers that have exited are kept; their gauges are dropped.
+class MultiprocessStore:
+
+    def __init__(self, directory:str, interval:float):
+        self.directory = directory
+        self.interval = interval
+        self.pid = os.getpid()
+        self.written_at = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, pid:int) -> str:
+        return os.path.join(self.directory, f"metrics_{pid}.json")
+
+    def maybe_write(self, app):
+        if time.monotonic() - self.written_at >= self.interval:
+            self.write(app)
+
+    def write(self, app):
+        self.written_at = time.monotonic()
+        # A forked worker inherits the store, so look the pid up each time
+        self.pid = os.getpid()
+        snapshot = [[name, list(labels), value] for (name, labels), value in collect(app).items()]
+        path = self.path(self.pid)
+        try:
+            with open(path + '.tmp', 'w') as file:
+                json.dump(snapshot, file)
+            os.replace(path + '.tmp', path)
+        except OSError:
+            logger.exception("Failed to write metrics snapshot %s", path)
+
+    def merge(self, app) -> dict:
+        self.pid = os.getpid()
+        samples = collect(app)
+        for filename in os.listdir(self.directory):
+            if not (filename.startswith('metrics_') and filename.endswith('.json')):
+                continue
+            try:
+                pid = int(filename[len('metrics_'):-len('.json')])
+            except ValueError:
+                continue
+            if pid == self.pid:
+                continue
+
+            try:
+                with open(os.path.join(self.directory, filename)) as file:
+                    snapshot = json.load(file)
+            except (OSError, ValueError):
+                continue
+
+            alive = _pid_alive(pid)
+            for name, labels, value in snapshot:
+                if FAMILIES.get(_family(name), ('untyped',))[0] == 'gauge' and not alive:
+                    continue
+                key = (name, tuple(tuple(label) for label in labels))
+                samples[key] = samples.get(key, 0) + value
+
+        return samples
+
+
+class Metrics:
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config['METRICS_ENABLED']:
+            return
+
+        registry = app.extensions['metrics'] = MetricsRegistry()
+
+        with app.app_context():
+            engines = {'primary': db.engine}
+        if 'replica_engine' in app.extensions:
+            engines['replica'] = app.extensions['replica_engine']
+        app.extensions['metrics_engines'] = engines
+
+        for name, engine in engines.items():
+            event.listen(engine, 'before_cursor_execute', self._query_counter(registry, name))
+
+        # Tenant engines come and go, so each is instrumented as it is created
+        tenant_engines = app.extensions.get('tenants')
+        if tenant_engines is not None:
+            tenant_engines.on_create.append(
+                lambda name, engine: event.listen(
+                    engine, 'before_cursor_execute', self._query_counter(registry, f"tenant:{name}")
+                )
+            )
+
+        store = None
+        if app.config.get('METRICS_MULTIPROC_DIR'):
+            store = MultiprocessStore(app.config['METRICS_MULTIPROC_DIR'], app.config['METRICS_FLUSH_INTERVAL'])
+            atexit.register(store.write, app)
+        app.extensions['metrics_store'] = store
+
+        app.before_request(self._start_timer)
+        app.after_request(self._observe)
+
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+        app.add_url_rule('/healthz', 'healthz', self.healthz_view)
+        app.add_url_rule('/readyz', 'readyz', self.readyz_view)
+
+    def _query_counter(self, registry, name):
+        def count(conn, cursor, statement, parameters, context, executemany):
+            registry.count_query(name)
+        return count
+
+    def _start_timer(self):
+        g.metrics_started = time.perf_counter()
+
+    def _observe(self, response):
+        started = g.pop('metrics_started', None)
+        seconds = time.perf_counter() - started if started is not None else None
+
+        rule = request.url_rule
+        if rule is None:
+            namespace, route = 'unmatched', 'unmatched'
+        else:
+            route = rule.rule
+            namespace = route.strip('/').split('/', 1)[0] or 'root'
+
+        current_app.extensions['metrics'].observe_request(
+            namespace, route, request.method, response.status_code, seconds
+        )
+
+        store = current_app.extensions['metrics_store']
+        if store is not None:
+            store.maybe_write(current_app._get_current_object())
+
+        return response
+
+    def count_cache(self, cache:str, hit:bool):
+        registry = current_app.extensions.get('metrics')
+        if registry is not None:
+            registry.count_cache(cache, hit)
+
+    def metrics_view(self):
+        app = current_app._get_current_object()
+        store = app.extensions['metrics_store']
+        samples = store.merge(app) if store is not None else collect(app)
+
+        return current_app.response_class(render(samples), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+    # Liveness: the process is up and serving requests
+    def healthz_view(self):
+        return {"status": "ok"}, HTTPStatus.OK
+
+    # Readiness: every database engine, and every tenant engine kept open,
+    # answers a trivial query
+    def readyz_view(self):
+        engines = dict(current_app.extensions['metrics_engines'])
+        tenant_engines = current_app.extensions.get('tenants')
+        if tenant_engines is not None:
+            for name, engine in tenant_engines.live().items():
+                engines[f"tenant:{name}"] = engine
+
+        for name, engine in engines.items():
+            try:
+                with engine.connect() as connection:
+                    connection.execute(text('SELECT 1'))
+            except Exception:
+                logger.exception("Readiness check failed for the %s database", name)
+                return {"status": "unavailable", "database": name}, HTTPStatus.SERVICE_UNAVAILABLE
+
+        return {"status": "ready"}, HTTPStatus.OK
+
+
+metrics = Metrics()
@@ -0,0 +1,312 @@
+import atexit
+import json
+import logging
+import threading
+import urllib.request
+from collections import defaultdict
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, select, update
+from . import db
+from .tenants import tenant_context
+from .unit_of_work import after_commit
+from ..models.notifications import GradeNotification
+
+logger = logging.getLogger(__name__)
+
+
+# Sinks deliver one student's due notifications in a single call and
+# raise when delivery fails, which schedules a retry of the whole batch
+class LogSink:
+
+    def send(self, student_id:int, notifications:list):
+        for notification in notifications:
+            logger.info("Notify student %s: %s", student_id, json.dumps(notification))
+
+
+# Appends one JSON line per batch, e.g. for a local mail pickup directory
+class FileSink:
+
+    def __init__(self, path:str):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def send(self, student_id:int, notifications:list):
+        line = json.dumps({'student_id': student_id, 'notifications': notifications})
+        with self.lock:
+            with open(self.path, 'a') as file:
+                file.write(line + '\n')
+
+
+# POSTs each batch as JSON; any error status raises HTTPError
+class HttpSink:
+
+    def __init__(self, url:str, timeout:float):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, student_id:int, notifications:list):
+        body = json.dumps({'student_id': student_id, 'notifications': notifications}).encode()
+        request = urllib.request.Request(
+            self.url, data=body, headers={'Content-Type': 'application/json'}, method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+# NOTIFY_SINK names a built-in sink, or is any object with a send method
+def make_sink(config):
+    sink = config['NOTIFY_SINK']
+    if not isinstance(sink, str):
+        return sink
+    if sink == 'log':
+        return LogSink()
+    if sink == 'file':
+        return FileSink(config['NOTIFY_FILE_PATH'])
+    if sink == 'http':
+        return HttpSink(config['NOTIFY_HTTP_URL'], config['NOTIFY_HTTP_TIMEOUT'])
+    raise ValueError(f"Unknown NOTIFY_SINK {sink!r}, expected log, file or http")
+
+
+class DeliveryStats:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.batches = 0
+        self.delivery_seconds = 0.0
+
+    def record(self, sent:int=0, retried:int=0, failed:int=0, delivery_seconds:float=0.0):
+        with self.lock:
+            self.batches += 1
+            self.sent += sent
+            self.retried += retried
+            self.failed += failed
+            self.delivery_seconds += delivery_seconds
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'sent': self.sent,
+                'retried': self.retried,
+                'failed': self.failed,
+                'batches': self.batches,
+                'delivery_seconds': self.delivery_seconds
+            }
+
+
+# Per-app dispatcher delivering the notification outbox. With
+# NOTIFY_BACKGROUND a daemon thread polls for due notifications and is woken
+# as soon as a new one commits; otherwise dispatch() is called directly.
+# The thread starts with the first request, so CLI commands never run it.
+class NotificationDispatcher:
+
+    def __init__(self, app):
+        self.app = app
+        self.sink = make_sink(app.config)
+        self.batch_size = app.config['NOTIFY_BATCH_SIZE']
+        self.max_attempts = app.config['NOTIFY_MAX_ATTEMPTS']
+        self.retry_base = app.config['NOTIFY_RETRY_BASE']
+        self.retry_max = app.config['NOTIFY_RETRY_MAX']
+        self.poll_interval = app.config['NOTIFY_POLL_INTERVAL']
+        self.lease = app.config['NOTIFY_LEASE']
+        self.stats = DeliveryStats()
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.background = app.config['NOTIFY_BACKGROUND']
+        self.thread = None
+        self.lock = threading.Lock()
+
+        if self.background:
+            app.before_request(self.start)
+
+    def start(self):
+        if self.thread is not None:
+            return
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='grade-notifier', daemon=True)
+                self.thread.start()
+                atexit.register(self.stop)
+
+    def wake(self):
+        if self.background:
+            self.start()
+        self.wakeup.set()
+
+    def _run(self):
+        while not self.stopping.is_set():
+            self.wakeup.wait(self.poll_interval)
+            self.wakeup.clear()
+            try:
+                while self.dispatch() and not self.stopping.is_set():
+                    pass
+            except Exception:
+                logger.exception("Failed to dispatch grade notifications")
+
+    def stop(self):
+        if self.thread is not None and self.thread.is_alive():
+            self.stopping.set()
+            self.wakeup.set()
+            self.thread.join(self.app.config['NOTIFY_SHUTDOWN_TIMEOUT'])
+
+    # Seconds before retry number `attempts`: doubling from NOTIFY_RETRY_BASE up to NOTIFY_RETRY_MAX
+    def backoff(self, attempts:int) -> timedelta:
+        return timedelta(seconds=min(self.retry_max, self.retry_base * 2 ** (attempts - 1)))
+
+    # Deliver a batch of due notifications from every tenant's outbox. Each
+    # tenant's engine is borrowed for its pass, so polling never opens or
+    # evicts the engines kept for requests.
+    def dispatch(self) -> int:
+        registry = self.app.extensions['tenants']
+        if not registry.names():
+            return self.dispatch_tenant(None)
+
+        total = 0
+        for tenant in registry.names():
+            with registry.borrow(tenant) as engine:
+                total += self.dispatch_tenant(tenant, engine)
+        return total
+
+    # Deliver one batch of due notifications with one sink call per student,
+    # and return how many were picked up. The batch is claimed and committed
+    # first, so no transaction or row lock is held while the sinks deliver,
+    # and the results are recorded in a second short transaction.
+    def dispatch_tenant(self, tenant, engine=None) -> int:
+        with tenant_context(self.app, tenant, engine):
+            lease, by_student = self._claim()
+
+            outcomes = []
+            for student_id, batch in by_student.items():
+                try:
+                    self.sink.send(student_id, [payload for id, payload in batch])
+                except Exception as error:
+                    logger.warning("Failed to notify student %s: %s", student_id, error)
+                    outcomes.append(([id for id, payload in batch], error))
+                else:
+                    outcomes.append(([id for id, payload in batch], None))
+
+            self._record(lease, outcomes)
+            return sum(len(batch) for batch in by_student.values())
+
+    # Mark due notifications 'sending' with a lease in next_attempt_at. The
+    # lease doubles as the claim's token, and once it expires the rows are due
+    # again, so a dispatcher dying mid-delivery never strands them. On
+    # PostgreSQL concurrent claims skip each other's locked rows.
+    def _claim(self):
+        now = datetime.utcnow()
+        lease = now + timedelta(seconds=self.lease)
+        due = and_(GradeNotification.status.in_(('pending', 'sending')), GradeNotification.next_attempt_at <= now)
+        claimable = (
+            select(GradeNotification.id)
+            .where(due)
+            .order_by(GradeNotification.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        db.session.execute(
+            update(GradeNotification)
+            .where(GradeNotification.id.in_(claimable), due)
+            .values(status='sending', next_attempt_at=lease)
+            .execution_options(synchronize_session=False)
+        )
+        notifications = db.session.execute(
+            select(GradeNotification)
+            .where(GradeNotification.status == 'sending', GradeNotification.next_attempt_at == lease)
+            .order_by(GradeNotification.id)
+        ).scalars().all()
+
+        by_student = defaultdict(list)
+        for notification in notifications:
+            by_student[notification.student_id].append((notification.id, dict(
+                json.loads(notification.payload), id=notification.id, event=notification.event,
+                created_at=notification.created_at.isoformat()
+            )))
+
+        db.session.commit()
+        return lease, by_student
+
+    # Rows whose lease expired and were claimed again are left to their new claim
+    def _record(self, lease, outcomes:list):
+        ids = [id for batch_ids, error in outcomes for id in batch_ids]
+        if not ids:
+            return
+        claimed = {
+            notification.id: notification for notification in db.session.execute(
+                select(GradeNotification)
+                .where(
+                    GradeNotification.id.in_(ids), GradeNotification.status == 'sending',
+                    GradeNotification.next_attempt_at == lease
+                )
+                .with_for_update()
+            ).scalars()
+        }
+
+        for batch_ids, error in outcomes:
+            batch = [claimed[id] for id in batch_ids if id in claimed]
+            if error is None:
+                self._sent(batch)
+            else:
+                self._failed(batch, error)
+
+        db.session.commit()
+
+    def _sent(self, batch:list):
+        sent_at = datetime.utcnow()
+        for notification in batch:
+            notification.status = 'sent'
+            notification.attempts += 1
+            notification.sent_at = sent_at
+            notification.last_error = None
+        self.stats.record(
+            sent=len(batch),
+            delivery_seconds=sum((sent_at - notification.created_at).total_seconds() for notification in batch)
+        )
+
+    def _failed(self, batch:list, error:Exception):
+        now = datetime.utcnow()
+        retried = failed = 0
+        for notification in batch:
+            notification.attempts += 1
+            notification.last_error = f"{type(error).__name__}: {error}"[:500]
+            if notification.attempts >= self.max_attempts:
+                notification.status = 'failed'
+                failed += 1
+            else:
+                notification.status = 'pending'
+                notification.next_attempt_at = now + self.backoff(notification.attempts)
+                retried += 1
+        self.stats.record(retried=retried, failed=failed)
+
+    # Dispatch until nothing is due, for tests and shutdown
+    def drain(self):
+        while self.dispatch():
+            pass
+
+
+class Notifications:
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['notifications'] = NotificationDispatcher(app)
+
+    # Add a notification about the grade to the current transaction, and wake
+    # the dispatcher once it commits
+    def queue(self, event:str, grade, course) -> GradeNotification:
+        notification = GradeNotification.queue(event, grade, course)
+        after_commit(current_app.extensions['notifications'].wake)
+        return notification
+
+    def dispatch(self) -> int:
+        return current_app.extensions['notifications'].dispatch()
+
+    def drain(self):
+        current_app.extensions['notifications'].drain()
+
+
+notifications = Notifications()
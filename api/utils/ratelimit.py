@@ -0,0 +1,132 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import case, create_engine, insert, update
+from sqlalchemy.exc import IntegrityError
+from . import db
+from .tenants import current_tenant
+from ..models.rate_limits import RateLimitBucket
+
+
+# Token buckets held in this worker's memory, shared by every limiter. At
+# most max_keys are kept, in least recently used order: each take moves its
+# bucket to the end, and the buckets left idle longest, which are the most
+# refilled, are forgotten first at a constant cost per take.
+class MemoryBackend:
+
+    def __init__(self, max_keys:int=100000):
+        self.buckets = OrderedDict()
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+
+    # Take a token from the bucket, returning (allowed, tokens left)
+    def take(self, key:str, capacity:float, rate:float, now:float):
+        with self.lock:
+            tokens, updated_at = self.buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.buckets[key] = (tokens, now)
+
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+
+        return allowed, tokens
+
+
+# Token buckets in a database table, so limits hold across worker processes.
+# Each take is a conditional UPDATE, which the database serialises.
+class DatabaseBackend:
+
+    def __init__(self, uri:str=None):
+        self.engine = None
+        if uri:
+            self.engine = create_engine(uri)
+            RateLimitBucket.__table__.create(self.engine, checkfirst=True)
+
+    def take(self, key:str, capacity:float, rate:float, now:float):
+        table = RateLimitBucket.__table__
+        refilled = table.c.tokens + (now - table.c.updated_at) * rate
+        available = case((refilled > capacity, capacity), else_=refilled)
+
+        engine = self.engine or db.engine
+        for attempt in range(2):
+            with engine.begin() as connection:
+                result = connection.execute(
+                    update(table)
+                    .where(table.c.key == key, available >= 1)
+                    .values(tokens=available - 1, updated_at=now)
+                )
+            if result.rowcount:
+                return True, None
+
+            if attempt:
+                break
+
+            try:
+                with engine.begin() as connection:
+                    connection.execute(insert(table).values(key=key, tokens=capacity - 1, updated_at=now))
+                return True, None
+            except IntegrityError:
+                # Either the bucket is empty, or another worker just created it
+                continue
+
+        return False, 0
+
+
+class RateLimiter:
+
+    def __init__(self, name:str, limit:int, period:float, backend):
+        self.name = name
+        self.capacity = float(limit)
+        self.rate = limit / period
+        self.backend = backend
+        self.allowed = 0
+        self.throttled = 0
+
+    # Returns (allowed, seconds until the next token)
+    def hit(self, key:str):
+        tenant = current_tenant()
+        bucket = f"{self.name}:{key}" if tenant is None else f"{self.name}:{tenant}:{key}"
+        allowed, tokens = self.backend.take(bucket, self.capacity, self.rate, time.time())
+
+        if allowed:
+            self.allowed += 1
+            return True, 0
+
+        self.throttled += 1
+        missing = 1 - (tokens or 0)
+        return False, max(1, math.ceil(missing / self.rate))
+
+    def stats(self) -> dict:
+        return {'allowed': self.allowed, 'throttled': self.throttled}
+
+
+class RateLimits:
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if app.config['RATELIMIT_STORAGE'] == 'database':
+            backend = DatabaseBackend(app.config.get('RATELIMIT_STORAGE_URI'))
+        else:
+            backend = MemoryBackend()
+
+        app.extensions['rate_limits'] = {
+            name: RateLimiter(name, limit, period, backend)
+            for name, (limit, period) in app.config['RATE_LIMITS'].items()
+        }
+
+    def get(self, name:str) -> RateLimiter:
+        return current_app.extensions['rate_limits'][name]
+
+    def stats(self) -> dict:
+        return {name: limiter.stats() for name, limiter in current_app.extensions['rate_limits'].items()}
+
+
+rate_limits = RateLimits()
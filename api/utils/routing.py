@@ -0,0 +1,113 @@
+import threading
+import time
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from .tenants import current_tenant
+
+READ_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+
+# Who a read-your-writes pin applies to: the JWT identity, else the client address
+def pin_key() -> str:
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        identity = None
+
+    if identity is not None:
+        return f"user:{identity}"
+    return f"addr:{request.remote_addr}"
+
+
+# Short-lived pins sending a client back to the primary after it writes.
+# Pins live in this worker process, so the window holds per worker.
+class ReplicaPins:
+
+    def __init__(self, window:float):
+        self.window = window
+        self.pins = {}
+        self.lock = threading.Lock()
+
+    def pin(self, key:str):
+        now = time.monotonic()
+        with self.lock:
+            self.pins[key] = now + self.window
+            if len(self.pins) > 10000:
+                self.pins = {k: until for k, until in self.pins.items() if until > now}
+
+    def is_pinned(self, key:str) -> bool:
+        until = self.pins.get(key)
+        return until is not None and until > time.monotonic()
+
+    def clear(self):
+        with self.lock:
+            self.pins.clear()
+
+
+# Session that sends everything for a tenant to that tenant's database.
+# Otherwise reads made while serving GET requests go to the replica
+# engine, and everything else (writes, flushes, non-GET requests, background
+# threads and recently-writing clients) to the primary. A read that must see
+# the latest commit passes bind_arguments={'primary': True}.
+class RoutingSession(Session):
+
+    def get_bind(self, mapper=None, clause=None, bind=None, primary=False, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+        if engine is self._db.engines.get(None):
+            tenant = current_tenant()
+            if tenant is not None:
+                borrowed = g.get('tenant_engine')
+                return borrowed if borrowed is not None else current_app.extensions['tenants'].engine(tenant)
+
+            if not primary and self._reads_from_replica(clause):
+                return current_app.extensions['replica_engine']
+
+        return engine
+
+    def _reads_from_replica(self, clause) -> bool:
+        if self._flushing or clause is None or not getattr(clause, 'is_select', False):
+            return False
+
+        if not has_request_context() or request.method not in READ_METHODS:
+            return False
+
+        if 'replica_engine' not in current_app.extensions:
+            return False
+
+        return not current_app.extensions['replica_pins'].is_pinned(pin_key())
+
+
+class ReplicaRouter:
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    # The replica is kept out of SQLALCHEMY_BINDS so that create_all and
+    # migrations never target it; it only ever receives routed reads
+    def init_app(self, app):
+        replica_uri = app.config.get('SQLALCHEMY_REPLICA_URI')
+        if not replica_uri:
+            return
+
+        app.extensions['replica_engine'] = create_engine(
+            replica_uri, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+        )
+        app.extensions['replica_pins'] = ReplicaPins(app.config['REPLICA_PIN_SECONDS'])
+
+
+# Pin the writing client to the primary for the read-your-writes window
+@event.listens_for(RoutingSession, 'after_commit')
+def pin_after_write(session):
+    if not has_request_context() or not has_app_context():
+        return
+
+    pins = current_app.extensions.get('replica_pins')
+    if pins is not None:
+        pins.pin(pin_key())
+
+
+replica_router = ReplicaRouter()
@@ -0,0 +1,148 @@
+import re
+from sqlalchemy import DDL, event, select, table, column, literal_column, or_, and_, case, func
+from . import db
+from ..models.students import Student
+
+# SQLite keeps an FTS5 index of student names, emails and matric numbers,
+# maintained by triggers so that every write path (ORM or bulk) stays in sync
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS student_search USING fts5(
+        first_name, last_name, email, matric_no, prefix='2 3 4'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS student_search_insert AFTER INSERT ON students BEGIN
+        INSERT INTO student_search(rowid, first_name, last_name, email, matric_no)
+        SELECT users.id, users.first_name, users.last_name, users.email, NEW.matric_no
+        FROM users WHERE users.id = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS student_search_update_student AFTER UPDATE OF matric_no ON students BEGIN
+        UPDATE student_search SET matric_no = NEW.matric_no WHERE rowid = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS student_search_update_user AFTER UPDATE OF first_name, last_name, email ON users BEGIN
+        UPDATE student_search
+        SET first_name = NEW.first_name, last_name = NEW.last_name, email = NEW.email
+        WHERE rowid = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS student_search_delete AFTER DELETE ON students BEGIN
+        DELETE FROM student_search WHERE rowid = OLD.id;
+    END
+    """
+]
+
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Student.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+
+event.listen(
+    Student.__table__, 'after_drop',
+    DDL('DROP TABLE IF EXISTS student_search').execute_if(dialect='sqlite')
+)
+
+student_search = table('student_search', column('rowid'), column('rank'))
+
+SEARCH_COLUMNS = (
+    Student.id,
+    Student.first_name,
+    Student.last_name,
+    Student.email,
+    Student.matric_no,
+    Student.user_type
+)
+
+
+# Split a search string into lowercase word tokens, one list per search term
+def tokenize(query:str) -> list:
+    terms = []
+    for term in query.lower().split():
+        parts = re.findall(r'\w+', term)
+        if parts:
+            terms.append(parts)
+    return terms
+
+
+# Build an FTS5 MATCH expression where every term is a prefix phrase,
+# so 'ZSCH/23' matches the tokens 'zsch 23*' in order
+def fts_query(query:str) -> str:
+    return ' AND '.join('"{}"*'.format(' '.join(parts)) for parts in tokenize(query))
+
+
+def _fts_search(query:str):
+    match = fts_query(query)
+    if not match:
+        return None
+
+    return (
+        select(*SEARCH_COLUMNS)
+        .join(student_search, student_search.c.rowid == Student.id)
+        .where(literal_column('student_search').op('MATCH')(match))
+        .order_by(student_search.c.rank, Student.id)
+    )
+
+
+# Build a literal 'prefix%' pattern so the planner can use a prefix index
+def _starts_with(expression, prefix:str):
+    escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return expression.like(escaped + '%', escape='\\')
+
+
+# Prefix search on lower-cased columns, served by the text_pattern_ops indexes
+def _prefix_search(query:str):
+    terms = query.lower().split()
+    if not terms:
+        return None
+
+    matric_no = func.lower(Student.matric_no)
+    email = func.lower(Student.email)
+    last_name = func.lower(Student.last_name)
+    first_name = func.lower(Student.first_name)
+
+    conditions = [
+        or_(
+            _starts_with(matric_no, term),
+            _starts_with(email, term),
+            _starts_with(last_name, term),
+            _starts_with(first_name, term)
+        )
+        for term in terms
+    ]
+
+    # Exact matric or email hits first, then matric, surname and first name prefixes
+    first = terms[0]
+    rank = case(
+        (matric_no == first, 0),
+        (email == first, 0),
+        (_starts_with(matric_no, first), 1),
+        (_starts_with(last_name, first), 2),
+        (_starts_with(first_name, first), 3),
+        else_=4
+    )
+
+    return (
+        select(*SEARCH_COLUMNS)
+        .where(and_(*conditions))
+        .order_by(rank, Student.last_name, Student.first_name, Student.id)
+    )
+
+
+# Ranked, paginated student search by name, email or matric number
+def search_students(query:str, page:int=1, per_page:int=20):
+    if db.session.get_bind().dialect.name == 'sqlite':
+        stmt = _fts_search(query)
+    else:
+        stmt = _prefix_search(query)
+
+    if stmt is None:
+        return [], False
+
+    # Fetch one extra row to know whether another page exists
+    stmt = stmt.limit(per_page + 1).offset((page - 1) * per_page)
+    rows = db.session.execute(stmt).all()
+
+    return [row._asdict() for row in rows[:per_page]], len(rows) > per_page
@@ -0,0 +1,162 @@
+import random
+import time
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+from . import db
+from .grade_conversions import get_letter_grade
+from .snapshot import last_id, reset_sequences
+from ..models.terms import Term
+
+FIRST_NAMES = [
+    'Ada', 'Adaeze', 'Ahmed', 'Aisha', 'Alan', 'Amara', 'Ana', 'Chidi', 'Chen', 'Daniel', 'David', 'Emeka',
+    'Emma', 'Fatima', 'Grace', 'Hannah', 'Ibrahim', 'Ifeoma', 'James', 'Joy', 'Kemi', 'Kwame', 'Laura',
+    'Li', 'Maria', 'Mohammed', 'Ngozi', 'Olu', 'Priya', 'Ravi', 'Sade', 'Samuel', 'Sofia', 'Tunde', 'Yusuf', 'Zainab'
+]
+
+LAST_NAMES = [
+    'Adeyemi', 'Okafor', 'Balogun', 'Eze', 'Garcia', 'Hopper', 'Ibrahim', 'Johnson', 'Kim', 'Lovelace', 'Mensah',
+    'Nwosu', 'Obi', 'Okeke', 'Patel', 'Rossi', 'Smith', 'Turing', 'Uche', 'Wang', 'Williams', 'Yusuf'
+]
+
+SUBJECTS = [
+    'Mathematics', 'Physics', 'Chemistry', 'Biology', 'Computer Science', 'Economics', 'Literature',
+    'History', 'Geography', 'Statistics', 'Philosophy', 'Accounting'
+]
+
+
+def _name(rng):
+    return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+
+# Pick k distinct courses, favouring popular ones: course i is chosen with
+# weight 1 / (i + 1), so a few core courses fill up and the long tail stays small
+def _pick_courses(rng, course_ids:list, weights:list, k:int) -> list:
+    if k >= len(course_ids):
+        return list(course_ids)
+    chosen = set()
+    while len(chosen) < k:
+        chosen.update(rng.choices(course_ids, weights=weights, k=k - len(chosen)))
+    return sorted(chosen)
+
+
+# Rows buffered per table and written with one executemany each. Tables are
+# flushed in the order they were first used, parents before children, so
+# every flush satisfies the foreign keys.
+class _Batches:
+
+    def __init__(self, connection, batch_size:int):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.pending = {}
+        self.counts = {}
+
+    def add(self, table, row:dict):
+        self.pending.setdefault(table.name, (table, []))[1].append(row)
+
+    def full(self) -> bool:
+        return any(len(rows) >= self.batch_size for table, rows in self.pending.values())
+
+    def flush(self):
+        for name, (table, rows) in self.pending.items():
+            if rows:
+                self.connection.execute(insert(table), rows)
+                self.counts[name] = self.counts.get(name, 0) + len(rows)
+                rows.clear()
+
+
+@click.command('seed')
+@click.option('--admins', default=1, show_default=True, help="Admins to create.")
+@click.option('--students', default=1000, show_default=True, help="Students to create.")
+@click.option('--courses', default=40, show_default=True, help="Courses to create.")
+@click.option('--enrollments', default=5, show_default=True, help="Average courses per student.")
+@click.option('--graded', default=0.9, show_default=True, help="Share of enrollments that have a grade.")
+@click.option('--term-id', type=int, default=None, help="Term to enroll students in, defaults to the current term.")
+@click.option('--password', default='password', show_default=True, help="Password for every seeded user.")
+@click.option('--seed', 'seed_value', default=42, show_default=True, help="Random seed, the same seed gives the same data.")
+@click.option('--batch-size', default=5000, show_default=True, help="Rows inserted per statement.")
+@with_appcontext
+def seed_command(admins, students, courses, enrollments, graded, term_id, password, seed_value, batch_size):
+    """Fill the database with generated admins, students, courses, enrollments and grades."""
+    rng = random.Random(seed_value)
+    started = time.perf_counter()
+    tables = db.metadata.tables
+    users, admin, student_table = tables['users'], tables['admin'], tables['students']
+    course_table, student_course, grades = tables['courses'], tables['student_course'], tables['grades']
+
+    if term_id is None:
+        term = Term.current()
+        term_id = term.id if term else None
+
+    # Hashing is deliberately slow, so every seeded user shares one hash
+    password_hash = generate_password_hash(password)
+
+    with db.engine.begin() as connection:
+        batches = _Batches(connection, batch_size)
+
+        # Seeded rows carry their IDs, which start past every ID ever handed
+        # out so archived students and grades never get their IDs reused
+        user_id = last_id(connection, users) + 1
+        for number in range(admins):
+            first_name, last_name = _name(rng)
+            batches.add(users, {
+                'id': user_id, 'first_name': first_name, 'last_name': last_name,
+                'email': f"admin{user_id}@seed.zeschool.com", 'password_hash': password_hash, 'user_type': 'admin'
+            })
+            batches.add(admin, {'id': user_id})
+            user_id += 1
+
+        # Course names and teachers are unique, so both carry the course number
+        course_id = last_id(connection, course_table) + 1
+        course_ids, difficulty = [], {}
+        for number in range(courses):
+            first_name, last_name = _name(rng)
+            batches.add(course_table, {
+                'id': course_id,
+                'name': f"{rng.choice(SUBJECTS)} {100 + course_id}",
+                'teacher': f"{first_name} {last_name} ({course_id})"
+            })
+            course_ids.append(course_id)
+            difficulty[course_id] = rng.gauss(0, 5)
+            course_id += 1
+        weights = [1 / (rank + 1) for rank in range(len(course_ids))]
+
+        batches.flush()
+
+        for number in range(students):
+            first_name, last_name = _name(rng)
+            batches.add(users, {
+                'id': user_id, 'first_name': first_name, 'last_name': last_name,
+                'email': f"student{user_id}@seed.zeschool.com", 'password_hash': password_hash, 'user_type': 'student'
+            })
+            batches.add(student_table, {
+                'id': user_id,
+                'matric_no': f"SEED/{rng.randint(18, 24)}/{rng.choice(('03', '09'))}/{user_id:07d}"
+            })
+
+            if course_ids:
+                ability = rng.gauss(0, 8)
+                count = max(1, min(len(course_ids), round(rng.gauss(enrollments, 1.5))))
+                for chosen in _pick_courses(rng, course_ids, weights, count):
+                    batches.add(student_course, {'student_id': user_id, 'course_id': chosen, 'term_id': term_id})
+
+                    if rng.random() < graded:
+                        percent_grade = round(min(100.0, max(0.0, rng.gauss(68 + ability - difficulty[chosen], 10))), 1)
+                        batches.add(grades, {
+                            'student_id': user_id, 'course_id': chosen, 'term_id': term_id,
+                            'percent_grade': percent_grade, 'letter_grade': get_letter_grade(percent_grade)
+                        })
+
+            user_id += 1
+
+            if batches.full():
+                batches.flush()
+
+        batches.flush()
+
+    reset_sequences(db.engine, [users, course_table, student_course, grades])
+
+    for name in ('users', 'courses', 'student_course', 'grades'):
+        click.echo(f"Inserted {batches.counts.get(name, 0)} rows into {name}")
+    click.echo(f"Seeded in {time.perf_counter() - started:.1f}s")
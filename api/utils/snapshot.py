@@ -0,0 +1,256 @@
+import gzip
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime
+import click
+from flask.cli import AppGroup, with_appcontext
+from sqlalchemy import Date, DateTime, Integer, delete, func, insert, inspect, select, text
+from . import db
+
+SNAPSHOT_FORMAT = 1
+
+snapshot_cli = AppGroup('snapshot', help="Export or import a snapshot of every table.")
+
+
+def _encode(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+# Decoders turning JSON values back into column values, for columns that need one
+def _decoders(table) -> dict:
+    decoders = {}
+    for column in table.columns:
+        if isinstance(column.type, DateTime):
+            decoders[column.name] = datetime.fromisoformat
+        elif isinstance(column.type, Date):
+            decoders[column.name] = date.fromisoformat
+    return decoders
+
+
+# Foreign key depth of every table: tables at the same level only reference
+# tables at lower levels, so each level can be loaded in parallel
+def table_levels(tables) -> dict:
+    levels = {}
+    for table in tables:
+        referred = [
+            levels[key.column.table.name] for key in table.foreign_keys
+            if key.column.table is not table
+        ]
+        levels[table.name] = max(referred) + 1 if referred else 0
+    return levels
+
+
+def _alembic_revision(connection):
+    if not inspect(connection).has_table('alembic_version'):
+        return None
+    return connection.execute(text('SELECT version_num FROM alembic_version')).scalar()
+
+
+# A single read-only transaction for the whole export, so that every table
+# is read as of the same moment even while the database takes writes
+@contextmanager
+def snapshot_transaction(engine):
+    with engine.connect() as connection:
+        if engine.dialect.name == 'postgresql':
+            connection.execution_options(
+                isolation_level='SERIALIZABLE', postgresql_readonly=True, postgresql_deferrable=True
+            )
+        with connection.begin():
+            if engine.dialect.name == 'sqlite':
+                # pysqlite only opens a transaction before writes, so reads
+                # would each see the latest commit without an explicit BEGIN.
+                # Outside WAL mode, writers wait for the export to finish.
+                connection.exec_driver_sql('BEGIN')
+            yield connection
+
+
+# Stream one table to gzip-compressed NDJSON, a batch of rows at a time
+def export_table(connection, table, path:str, batch_size:int) -> int:
+    count = 0
+    with gzip.open(path, 'wt', encoding='utf-8') as snapshot_file:
+        result = connection.execution_options(yield_per=batch_size).execute(
+            select(table).order_by(*table.primary_key.columns)
+        )
+        for rows in result.mappings().partitions():
+            for row in rows:
+                snapshot_file.write(json.dumps(dict(row), default=_encode, separators=(',', ':')))
+                snapshot_file.write('\n')
+            count += len(rows)
+    return count
+
+
+# Load one table from its NDJSON file with batched executemany inserts
+def import_table(engine, table, path:str, batch_size:int) -> int:
+    decoders = _decoders(table)
+    count = 0
+    with engine.begin() as connection, gzip.open(path, 'rt', encoding='utf-8') as snapshot_file:
+        batch = []
+        for line in snapshot_file:
+            row = json.loads(line)
+            for name, decode in decoders.items():
+                if row.get(name) is not None:
+                    row[name] = decode(row[name])
+            batch.append(row)
+
+            if len(batch) >= batch_size:
+                connection.execute(insert(table), batch)
+                count += len(batch)
+                batch = []
+
+        if batch:
+            connection.execute(insert(table), batch)
+            count += len(batch)
+    return count
+
+
+# Columns keeping IDs handed out by another table, as the 6b0a66b019b2
+# migration lists them. Archived and audited rows outlive the hot rows,
+# so their IDs must never be handed out again.
+ARCHIVED_IDS = {
+    'users': [('archived_students', 'id')],
+    'grades': [('archived_grades', 'id'), ('grade_audit', 'grade_id')],
+    'student_course': [('archived_student_course', 'id')]
+}
+
+
+def _id_column(table):
+    columns = list(table.primary_key.columns)
+    if len(columns) == 1 and isinstance(columns[0].type, Integer):
+        return columns[0]
+    return None
+
+
+# The highest ID a table has ever handed out: its own rows, the archived and
+# audited rows that came from it, and its sequence or AUTOINCREMENT counter,
+# which remember rows since deleted
+def last_id(connection, table) -> int:
+    column = _id_column(table)
+    queries = [select(func.max(column))]
+    for name, archived in ARCHIVED_IDS.get(table.name, []):
+        queries.append(select(func.max(table.metadata.tables[name].c[archived])))
+
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        queries.append(text(
+            f"SELECT pg_sequence_last_value(pg_get_serial_sequence('{table.name}', '{column.name}')::regclass)"
+        ))
+    elif dialect == 'sqlite' and table.dialect_options['sqlite']['autoincrement']:
+        queries.append(text(f"SELECT seq FROM sqlite_sequence WHERE name = '{table.name}'"))
+
+    values = [connection.execute(query).scalar() for query in queries]
+    return max((value for value in values if value is not None), default=0)
+
+
+# Point PostgreSQL sequences and SQLite AUTOINCREMENT counters past every ID
+# handed out here or, for imports, in the source database. A sequence never
+# moves backwards, since last_id() already counts its current value.
+def reset_sequences(engine, tables, last_ids:dict=None):
+    last_ids = last_ids or {}
+    with engine.begin() as connection:
+        for table in tables:
+            column = _id_column(table)
+            if column is None:
+                continue
+            value = max(last_id(connection, table), last_ids.get(table.name) or 0)
+            if not value:
+                continue
+
+            if engine.dialect.name == 'postgresql':
+                connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', '{column.name}'), {value})"
+                ))
+            elif engine.dialect.name == 'sqlite' and table.dialect_options['sqlite']['autoincrement']:
+                connection.execute(text("DELETE FROM sqlite_sequence WHERE name = :name"), {'name': table.name})
+                connection.execute(
+                    text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"),
+                    {'name': table.name, 'seq': value}
+                )
+
+
+@snapshot_cli.command('export')
+@click.argument('directory', type=click.Path(file_okay=False))
+@click.option('--batch-size', default=1000, show_default=True, help="Rows fetched per round trip.")
+@with_appcontext
+def export_snapshot(directory, batch_size):
+    """Write every table to DIRECTORY as gzip-compressed NDJSON."""
+    os.makedirs(directory, exist_ok=True)
+    engine = db.engine
+    tables = db.metadata.sorted_tables
+    levels = table_levels(tables)
+
+    with snapshot_transaction(engine) as connection:
+        manifest = {
+            'format': SNAPSHOT_FORMAT,
+            'created_at': datetime.utcnow().isoformat(),
+            'dialect': engine.dialect.name,
+            'revision': _alembic_revision(connection),
+            # Counters are not tables, so the IDs already handed out travel here
+            'last_ids': {table.name: last_id(connection, table) for table in tables if _id_column(table) is not None},
+            'tables': []
+        }
+
+        for table in tables:
+            filename = f"{table.name}.ndjson.gz"
+            rows = export_table(connection, table, os.path.join(directory, filename), batch_size)
+            manifest['tables'].append({'name': table.name, 'file': filename, 'rows': rows, 'level': levels[table.name]})
+            click.echo(f"Exported {rows} rows from {table.name}")
+
+    with open(os.path.join(directory, 'manifest.json'), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+
+
+@snapshot_cli.command('import')
+@click.argument('directory', type=click.Path(exists=True, file_okay=False))
+@click.option('--batch-size', default=1000, show_default=True, help="Rows inserted per statement.")
+@click.option('--workers', default=4, show_default=True, help="Tables loaded at once, SQLite always uses one.")
+@click.option('--replace', is_flag=True, help="Delete existing rows before importing.")
+@with_appcontext
+def import_snapshot(directory, batch_size, workers, replace):
+    """Load a snapshot from DIRECTORY into the migrated, empty database."""
+    with open(os.path.join(directory, 'manifest.json')) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    if manifest['format'] != SNAPSHOT_FORMAT:
+        raise click.ClickException(f"Unsupported snapshot format {manifest['format']}")
+
+    engine = db.engine
+    with engine.connect() as connection:
+        revision = _alembic_revision(connection)
+    if manifest['revision'] and revision and manifest['revision'] != revision:
+        raise click.ClickException(
+            f"Snapshot is at revision {manifest['revision']} but the database is at {revision}, run flask db upgrade first"
+        )
+
+    tables = {table.name: table for table in db.metadata.sorted_tables}
+    entries = [entry for entry in manifest['tables'] if entry['name'] in tables]
+
+    with engine.begin() as connection:
+        for entry in reversed(entries):
+            table = tables[entry['name']]
+            if replace:
+                connection.execute(delete(table))
+            elif connection.execute(select(func.count()).select_from(table)).scalar():
+                raise click.ClickException(f"Table {table.name} is not empty, use --replace to overwrite it")
+
+    # SQLite allows a single writer, so tables are loaded one at a time there
+    if engine.dialect.name == 'sqlite':
+        workers = 1
+
+    levels = sorted({entry['level'] for entry in entries})
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        for level in levels:
+            batch = [entry for entry in entries if entry['level'] == level]
+            futures = {
+                entry['name']: executor.submit(
+                    import_table, engine, tables[entry['name']], os.path.join(directory, entry['file']), batch_size
+                )
+                for entry in batch
+            }
+            for name, future in futures.items():
+                click.echo(f"Imported {future.result()} rows into {name}")
+
+    reset_sequences(engine, [tables[entry['name']] for entry in entries], manifest.get('last_ids'))
@@ -0,0 +1,64 @@
+from flask import request
+from flask_restx import marshal
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import load_only
+from werkzeug.exceptions import BadRequest
+from . import db
+
+
+# Swagger param documenting a resource's sparse fieldset
+def fields_param(model) -> dict:
+    return {'fields': "Comma-separated fields to return: " + ", ".join(model)}
+
+
+# Read ?fields=a,b and validate it against the resource's Swagger model.
+# Returns None when the parameter is absent, meaning every field.
+def requested_fields(model) -> list:
+    value = request.args.get('fields')
+    if value is None or value.strip() == '':
+        return None
+
+    names = []
+    for name in value.split(','):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in model:
+            raise BadRequest(f"Unknown field '{name}'. Available fields: {', '.join(model)}")
+        if name not in names:
+            names.append(name)
+
+    return names
+
+
+# Query for an entity that only loads the requested columns; the primary key
+# and polymorphic discriminator are always loaded by the ORM
+def sparse_query(entity, names:list):
+    if names is None:
+        return entity.query
+
+    mapper = inspect(entity)
+    columns = [getattr(entity, name) for name in names if name in mapper.column_attrs]
+    if not columns:
+        columns = [mapper.get_property_by_column(mapper.primary_key[0]).class_attribute]
+
+    return entity.query.options(load_only(*columns))
+
+
+# Serialize data with the model, narrowed to the requested fields
+def marshal_fields(data, model, names:list):
+    if names is None:
+        return marshal(data, model)
+    return marshal(data, model, mask=','.join(names))
+
+
+# Select of a list endpoint's columns, each labelled with its response field
+# and narrowed to the requested fields. Rows come back as plain tuples, so
+# large lists skip building ORM instances and marshalling them.
+def sparse_select(columns:dict, names:list):
+    return select(*[column.label(name) for name, column in columns.items() if names is None or name in names])
+
+
+# Response dicts straight from the rows of a select
+def row_dicts(stmt) -> list:
+    return [dict(row) for row in db.session.execute(stmt).mappings()]
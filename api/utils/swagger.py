@@ -0,0 +1,57 @@
+import hashlib
+import json
+from http import HTTPStatus
+from flask import current_app, request
+from flask_restx import Api
+from flask_restx.api import SwaggerView
+from .metrics import metrics
+
+
+# Serve swagger.json from bytes encoded once per app, with an ETag so
+# clients and proxies can revalidate instead of downloading it again
+class CachedSwaggerView(SwaggerView):
+
+    def get(self):
+        metrics.count_cache('swagger_spec', self.api.spec_cache is not None)
+
+        if self.api.spec_cache is None:
+            schema = self.api.__schema__
+            if 'error' in schema:
+                return schema, HTTPStatus.INTERNAL_SERVER_ERROR
+
+            body = json.dumps(schema, separators=(',', ':')).encode()
+            self.api.spec_cache = (body, hashlib.sha1(body).hexdigest())
+
+        body, etag = self.api.spec_cache
+        response = current_app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+
+        return response.make_conditional(request)
+
+
+# Api whose Swagger spec is built on the first swagger.json request and
+# then cached, rather than being rebuilt or re-encoded on every request
+class CachedSpecApi(Api):
+
+    def __init__(self, *args, add_specs=True, **kwargs):
+        self.spec_cache = None
+        self.serve_specs = add_specs
+        super().__init__(*args, add_specs=add_specs, **kwargs)
+
+    # flask-restx drops add_specs when __init__ calls init_app, so pass it on
+    def init_app(self, app, **kwargs):
+        kwargs.setdefault('add_specs', self.serve_specs)
+        super().init_app(app, **kwargs)
+
+    def _register_specs(self, app_or_blueprint):
+        if self._add_specs:
+            endpoint = 'specs'
+            self._register_view(
+                app_or_blueprint,
+                CachedSwaggerView,
+                self.default_namespace,
+                '/' + self.default_swagger_filename,
+                endpoint=endpoint,
+                resource_class_args=(self,)
+            )
+            self.endpoints.add(endpoint)
@@ -0,0 +1,244 @@
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from http import HTTPStatus
+import click
+from flask import current_app, g, has_app_context, request
+from flask.cli import AppGroup
+from flask_jwt_extended import decode_token
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+# Endpoints served without a tenant: probes, metrics and the API docs
+EXEMPT_ENDPOINTS = frozenset(['metrics', 'healthz', 'readyz', 'doc', 'specs', 'root', 'static', 'restx_doc.static'])
+
+
+# The school the current request or background task works for, or None
+# when the app runs a single school on its default database
+def current_tenant():
+    if not has_app_context():
+        return None
+    return g.get('tenant')
+
+
+# Push an app context working for the tenant, for threads and commands
+# that run outside a request, optionally on an engine borrowed for it
+@contextmanager
+def tenant_context(app, tenant, engine=None):
+    with app.app_context():
+        g.tenant = tenant
+        if engine is not None:
+            g.tenant_engine = engine
+        yield
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+# Engines for each tenant's database, created on first use. Only the
+# TENANT_ENGINE_LIMIT most recently used are kept; disposing the rest
+# closes their idle pooled connections, and connections still checked out
+# are closed when returned. Tenant names are lowercase, as the header and
+# subdomain are read.
+class TenantEngines:
+
+    def __init__(self, uris:dict, limit:int, options:dict):
+        self.uris, named = {}, {}
+        for name, uri in uris.items():
+            key = name.strip().lower()
+            if key in named:
+                raise ValueError(f"Tenants {named[key]!r} and {name!r} differ only in case")
+            self.uris[key], named[key] = uri, name
+        self.limit = limit
+        self.options = options
+        self.engines = OrderedDict()
+        self.lock = threading.Lock()
+        # Called with (name, engine) for every engine created, e.g. to instrument it
+        self.on_create = []
+
+    def __contains__(self, name) -> bool:
+        return name in self.uris
+
+    def names(self) -> list:
+        return list(self.uris)
+
+    def engine(self, name:str):
+        with self.lock:
+            engine = self.engines.get(name)
+            if engine is not None:
+                self.engines.move_to_end(name)
+                return engine
+
+            url = make_url(self.uris[name])
+            # In-memory SQLite has no connection pool to size
+            options = {} if _is_memory_sqlite(url) else self.options
+            engine = self.engines[name] = self._create(name, url, **options)
+
+            while len(self.engines) > self.limit:
+                evicted_name, evicted = self.engines.popitem(last=False)
+                evicted.dispose()
+
+            return engine
+
+    def _create(self, name:str, url, **options):
+        engine = create_engine(url, **options)
+        for callback in self.on_create:
+            callback(name, engine)
+        return engine
+
+    # An engine for one pass over the tenant's database that leaves the kept
+    # engines alone, for background work visiting every tenant: the kept
+    # engine when there is one, else a poolless engine disposed afterwards
+    @contextmanager
+    def borrow(self, name:str):
+        with self.lock:
+            engine = self.engines.get(name)
+
+        url = make_url(self.uris[name])
+        if engine is not None or _is_memory_sqlite(url):
+            yield engine or self.engine(name)
+            return
+
+        engine = self._create(name, url, poolclass=NullPool)
+        try:
+            yield engine
+        finally:
+            engine.dispose()
+
+    def live(self) -> dict:
+        with self.lock:
+            return dict(self.engines)
+
+    def dispose(self):
+        with self.lock:
+            for engine in self.engines.values():
+                engine.dispose()
+            self.engines.clear()
+
+
+def _bearer_token():
+    header = request.headers.get('Authorization', '')
+    scheme, _, token = header.partition(' ')
+    return token.strip() if scheme.lower() == 'bearer' and token.strip() else None
+
+
+# The tenant named by the X-Tenant header, else by the subdomain under
+# TENANT_DOMAIN, else by the tenant claim of a valid access token
+def resolve_tenant():
+    config = current_app.config
+
+    tenant = request.headers.get(config['TENANT_HEADER'])
+    if tenant:
+        return tenant.strip().lower()
+
+    domain = config.get('TENANT_DOMAIN')
+    if domain:
+        host = request.host.split(':', 1)[0].lower()
+        suffix = '.' + domain.lower()
+        if host.endswith(suffix) and host != suffix[1:]:
+            return host[:-len(suffix)]
+
+    token = _bearer_token()
+    if token:
+        try:
+            return decode_token(token).get(config['TENANT_JWT_CLAIM'])
+        except Exception:
+            return None
+
+    return None
+
+
+# Claims added to every token created while serving a tenant
+def tenant_claims() -> dict:
+    tenant = current_tenant()
+    if tenant is None:
+        return {}
+    return {current_app.config['TENANT_JWT_CLAIM']: tenant}
+
+
+# A token only works for the tenant it was issued by
+def token_matches_tenant(jwt_payload:dict) -> bool:
+    return jwt_payload.get(current_app.config['TENANT_JWT_CLAIM']) == current_tenant()
+
+
+class Tenants:
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['tenants'] = TenantEngines(
+            app.config['TENANTS'], app.config['TENANT_ENGINE_LIMIT'], app.config['TENANT_ENGINE_OPTIONS']
+        )
+        app.cli.add_command(tenants_cli)
+
+        if app.config['TENANTS']:
+            app.before_request(self._select_tenant)
+
+    def _select_tenant(self):
+        g.pop('tenant', None)
+        if request.endpoint in EXEMPT_ENDPOINTS:
+            return None
+
+        tenant = resolve_tenant()
+        if tenant is None:
+            return {
+                "message": f"Name the school with the {current_app.config['TENANT_HEADER']} header or its subdomain"
+            }, HTTPStatus.BAD_REQUEST
+        if tenant not in current_app.extensions['tenants']:
+            return {"message": "Unknown school"}, HTTPStatus.NOT_FOUND
+
+        g.tenant = tenant
+        return None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(current_app.config['TENANTS'])
+
+    # Every tenant, or just the default database when running a single school
+    def names(self) -> list:
+        return current_app.extensions['tenants'].names() or [None]
+
+    def engine(self, tenant:str):
+        return current_app.extensions['tenants'].engine(tenant)
+
+
+tenants = Tenants()
+
+tenants_cli = AppGroup('tenants', help="Manage the schools' databases.")
+
+
+def _selected(names:tuple) -> list:
+    registry = current_app.extensions['tenants']
+    names = [name.strip().lower() for name in names]
+    for name in names:
+        if name not in registry:
+            raise click.BadParameter(f"Unknown tenant {name!r}", param_hint='--tenant')
+    return names or registry.names()
+
+
+@tenants_cli.command('list')
+def list_command():
+    """List the tenants and the migration revision of each database."""
+    from alembic.runtime.migration import MigrationContext
+
+    registry = current_app.extensions['tenants']
+    for name in registry.names():
+        with registry.engine(name).connect() as connection:
+            revision = MigrationContext.configure(connection).get_current_revision()
+        click.echo(f"{name}\t{make_url(registry.uris[name]).render_as_string(hide_password=True)}\t{revision or '-'}")
+
+
+@tenants_cli.command('upgrade')
+@click.argument('revision', default='head')
+@click.option('--tenant', 'names', multiple=True, help="Tenant to upgrade, every tenant by default. Repeatable.")
+def upgrade_command(revision, names):
+    """Run the migrations on every tenant's database, one after another."""
+    from flask_migrate import upgrade
+
+    for name in _selected(names):
+        click.echo(f"Upgrading {name} to {revision}")
+        upgrade(revision=revision, x_arg=[f"tenant={name}"])
@@ -0,0 +1,55 @@
+from http import HTTPStatus
+from sqlalchemy import distinct, func, select
+from . import db
+from .grade_conversions import gpa_points
+from ..models.grades import Grade
+from ..models.student_course import StudentCourse
+from ..models.terms import Term
+
+
+# Term GPA inputs per student, aggregated in the database using the
+# (student_id, term_id) indexes: rows of (student_id, courses, graded, points)
+def term_gpa_rows(term_id:int, student_ids:list=None) -> list:
+    enrolled = select(
+        StudentCourse.student_id,
+        func.count(distinct(StudentCourse.course_id)).label('courses')
+    ).where(StudentCourse.term_id == term_id)
+
+    graded = select(
+        Grade.student_id,
+        func.count(Grade.id).label('graded'),
+        func.sum(gpa_points(Grade.letter_grade)).label('points')
+    ).where(Grade.term_id == term_id)
+
+    if student_ids is not None:
+        enrolled = enrolled.where(StudentCourse.student_id.in_(student_ids))
+        graded = graded.where(Grade.student_id.in_(student_ids))
+
+    enrolled = enrolled.group_by(StudentCourse.student_id).subquery()
+    graded = graded.group_by(Grade.student_id).subquery()
+
+    return db.session.execute(
+        select(
+            enrolled.c.student_id,
+            enrolled.c.courses,
+            func.coalesce(graded.c.graded, 0),
+            func.coalesce(graded.c.points, 0.0)
+        )
+        .outerjoin(graded, graded.c.student_id == enrolled.c.student_id)
+        .order_by(enrolled.c.student_id)
+    ).all()
+
+
+# Ungraded courses count as zero points, as they do for the CGPA
+def term_gpa(courses:int, points:float):
+    if not courses:
+        return None
+    return float("{:.2f}".format(points / courses))
+
+
+# Enrollments and grades of a closing or closed term are frozen along with its term GPAs
+def closed_term_conflict(term_id):
+    term = Term.closed(term_id)
+    if term is None:
+        return None
+    return {"message": f"{term.name} is closed, its enrollments and grades can no longer change"}, HTTPStatus.CONFLICT
@@ -0,0 +1,64 @@
+from contextlib import contextmanager
+from . import db
+
+# Session.info keys tracking the open unit of work
+DEPTH_KEY = 'unit_of_work_depth'
+CALLBACKS_KEY = 'unit_of_work_after_commit'
+
+
+def in_unit_of_work() -> bool:
+    return db.session.info.get(DEPTH_KEY, 0) > 0
+
+
+# Commit the session, or just flush it inside a unit of work so that
+# IDs are still assigned while the commit waits for the end of the block
+def commit():
+    if in_unit_of_work():
+        db.session.flush()
+    else:
+        db.session.commit()
+
+
+# Save several instances with a single commit
+def save_all(instances):
+    db.session.add_all(instances)
+    commit()
+
+
+# Run a callback once the current unit of work commits, or straight away
+# outside of one. Callbacks are dropped if the unit of work rolls back.
+def after_commit(callback):
+    if in_unit_of_work():
+        db.session.info.setdefault(CALLBACKS_KEY, []).append(callback)
+    else:
+        callback()
+
+
+# Defer every model commit in the block to a single commit at the end.
+# Nested blocks join the outermost one; any exception rolls it all back.
+# Usable as a context manager or as a decorator on a Resource method.
+@contextmanager
+def unit_of_work():
+    info = db.session.info
+    depth = info.get(DEPTH_KEY, 0)
+    info[DEPTH_KEY] = depth + 1
+
+    try:
+        yield db.session
+    except BaseException:
+        info[DEPTH_KEY] = depth
+        if depth == 0:
+            info.pop(CALLBACKS_KEY, None)
+            db.session.rollback()
+        raise
+
+    info[DEPTH_KEY] = depth
+    if depth == 0:
+        callbacks = info.pop(CALLBACKS_KEY, [])
+        try:
+            db.session.commit()
+        except BaseException:
+            db.session.rollback()
+            raise
+        for callback in callbacks:
+            callback()
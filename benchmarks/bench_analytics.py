@@ -0,0 +1,103 @@
+"""
+Query time of the grade analytics, from SQL and from the in-memory index.
+
+Seeds a temporary SQLite file with flask seed, then answers the analytics
+queries both ways: as aggregate and filtered SELECTs over the grades table,
+and from the columnar index behind the /analytics endpoints. Reports the
+median wall time of several runs of each query, the index build time and
+its memory footprint.
+
+    python -m benchmarks.bench_analytics [students] [--runs 20]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark')
+
+from sqlalchemy import func, select
+
+from api import create_app
+from api.config.config import TestConfig
+from api.models.grades import Grade
+from api.utils import db
+from api.utils.analytics import analytics
+
+
+def make_config(uri):
+    class BenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = uri
+        SQLALCHEMY_ECHO = False
+        METRICS_ENABLED = False
+        ANALYTICS_MAX_AGE = 0
+    return BenchConfig
+
+
+def sql_averages():
+    return db.session.execute(
+        select(Grade.course_id, func.count(), func.avg(Grade.percent_grade), func.min(Grade.percent_grade),
+               func.max(Grade.percent_grade)).group_by(Grade.course_id)
+    ).all()
+
+
+def sql_at_risk(threshold:float):
+    stmt = select(Grade.student_id, Grade.course_id, Grade.id, Grade.percent_grade).where(Grade.percent_grade < threshold)
+    return db.session.execute(stmt.order_by(Grade.percent_grade, Grade.student_id).limit(100)).all()
+
+
+def sql_distribution(course_id:int):
+    bucket = func.min(func.cast(Grade.percent_grade / 10, db.Integer), 9)
+    return db.session.execute(
+        select(bucket, func.count()).where(Grade.course_id == course_id).group_by(bucket)
+    ).all()
+
+
+def median_ms(query, runs:int) -> float:
+    timings = []
+    for number in range(runs):
+        started = time.perf_counter()
+        query()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def run(students:int, runs:int):
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app(config=make_config('sqlite:///' + os.path.join(directory, 'bench.sqlite3')))
+
+        with app.app_context():
+            db.create_all()
+            result = app.test_cli_runner().invoke(args=['seed', '--admins', '0', '--students', str(students)])
+            if result.exit_code != 0:
+                raise SystemExit(result.output)
+
+            index = analytics.index
+            stats = index.stats()
+            course_id = min(index.courses)
+
+            queries = [
+                ('averages by course', sql_averages, lambda: index.course_averages()),
+                ('at risk under 50', lambda: sql_at_risk(50), lambda: index.at_risk(50)),
+                ('course distribution', lambda: sql_distribution(course_id), lambda: index.distribution(course_id))
+            ]
+
+            print(f"{stats['grades']} grades in {stats['courses']} courses, median of {runs} runs")
+            print(f"  index build     : {stats['build_seconds'] * 1000:8.1f} ms")
+            print(f"  index memory    : {stats['bytes'] / 2 ** 20:8.2f} MiB  ({stats['bytes_per_grade']} bytes per grade)")
+            for name, sql_query, index_query in queries:
+                sql_ms, index_ms = median_ms(sql_query, runs), median_ms(index_query, runs)
+                print(f"  {name:<20}: SQL {sql_ms:8.2f} ms  index {index_ms:8.3f} ms  ({sql_ms / index_ms:.0f}x faster)")
+
+            db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('students', type=int, nargs='?', default=20000)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    run(args.students, args.runs)
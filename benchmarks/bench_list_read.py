@@ -0,0 +1,101 @@
+"""
+CPU time and memory of the student list read paths.
+
+Seeds a temporary SQLite file with flask seed, then builds the GET
+/students response body both ways: loading Student instances through the
+joined users/students mapping and marshalling them with the Swagger model
+as before, and selecting the columns as plain rows mapped straight into
+dicts as the endpoint does now. Reports the median CPU time of several
+runs and the peak traced memory, both scaled to 10k rows.
+
+    python -m benchmarks.bench_list_read [rows] [--runs 5]
+"""
+import argparse
+import gc
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark')
+
+from flask_restx import marshal
+
+from api import create_app
+from api.config.config import TestConfig
+from api.models.students import Student
+from api.students.views import student_model, student_columns
+from api.utils import db
+from api.utils.sparse import sparse_select, row_dicts
+
+
+def make_config(uri):
+    class BenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = uri
+        SQLALCHEMY_ECHO = False
+        METRICS_ENABLED = False
+    return BenchConfig
+
+
+def orm_path():
+    return marshal(Student.query.all(), student_model)
+
+
+def core_path():
+    return row_dicts(sparse_select(student_columns, None))
+
+
+def measure(path, runs:int):
+    timings = []
+    for number in range(runs):
+        db.session.remove()
+        gc.collect()
+        start = time.process_time()
+        body = path()
+        timings.append(time.process_time() - start)
+
+    db.session.remove()
+    gc.collect()
+    tracemalloc.start()
+    body = path()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return statistics.median(timings), peak, body
+
+
+def run(rows:int, runs:int):
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app(config=make_config('sqlite:///' + os.path.join(directory, 'bench.sqlite3')))
+
+        with app.app_context():
+            db.create_all()
+            result = app.test_cli_runner().invoke(args=['seed', '--admins', '0', '--students', str(rows), '--courses', '0'])
+            if result.exit_code != 0:
+                raise SystemExit(result.output)
+
+            orm_seconds, orm_peak, orm_body = measure(orm_path, runs)
+            core_seconds, core_peak, core_body = measure(core_path, runs)
+
+            if orm_body != core_body:
+                raise SystemExit("The two paths returned different bodies")
+
+            db.session.remove()
+            db.engine.dispose()
+
+    scale = 10000 / rows
+    print(f"{rows} students, per 10k rows, median of {runs} runs")
+    print(f"  ORM + marshal   : {orm_seconds * scale * 1000:8.1f} ms CPU  {orm_peak * scale / 2 ** 20:8.1f} MiB peak")
+    print(f"  Core rows       : {core_seconds * scale * 1000:8.1f} ms CPU  {core_peak * scale / 2 ** 20:8.1f} MiB peak")
+    print(f"  saved           : {(orm_seconds - core_seconds) * scale * 1000:8.1f} ms CPU  "
+          f"{(orm_peak - core_peak) * scale / 2 ** 20:8.1f} MiB  ({orm_seconds / core_seconds:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('rows', type=int, nargs='?', default=10000)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    run(args.rows, args.runs)
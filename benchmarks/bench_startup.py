@@ -0,0 +1,82 @@
+"""
+Import and startup timings, for tracking cold starts over time.
+
+Each run happens in a fresh interpreter and measures importing the api
+package, create_app() with the test config, the first swagger.json
+request (spec generation) and a repeat request (served from cache).
+Prints the median of all runs; --record appends them as a JSON line
+with the commit and date so the history can be compared later.
+
+    python -m benchmarks.bench_startup [--runs 5] [--record benchmarks/startup_history.jsonl]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+PROBE = """
+import json, os, time
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark')
+start = time.perf_counter()
+import api
+from api.config.config import TestConfig
+imported = time.perf_counter()
+class BenchConfig(TestConfig):
+    SQLALCHEMY_ECHO = False
+app = api.create_app(config=BenchConfig)
+created = time.perf_counter()
+client = app.test_client()
+client.get('/swagger.json')
+first_spec = time.perf_counter()
+client.get('/swagger.json')
+cached_spec = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_spec_ms': (first_spec - created) * 1000,
+    'cached_spec_ms': (cached_spec - first_spec) * 1000
+}))
+"""
+
+
+def probe() -> dict:
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--record', help="JSON lines file to append the results to")
+    args = parser.parse_args()
+
+    runs = [probe() for _ in range(args.runs)]
+    medians = {key: round(statistics.median(run[key] for run in runs), 2) for key in runs[0]}
+
+    for key, value in medians.items():
+        print(f"{key:16} {value:10.2f}")
+
+    if args.record:
+        entry = {
+            'date': datetime.utcnow().isoformat(timespec='seconds'),
+            'commit': git_revision(),
+            'python': sys.version.split()[0],
+            'runs': args.runs,
+            **medians
+        }
+        with open(args.record, 'a') as history:
+            history.write(json.dumps(entry) + os.linesep)
@@ -0,0 +1,73 @@
+"""
+Write throughput of per-row commits versus a single unit of work.
+
+Inserts the same rows through the model helpers twice: once committing
+every save() as before, once inside unit_of_work() so the block commits
+once. Runs against a temporary SQLite file, and against PostgreSQL too
+when BENCH_POSTGRES_URL is set.
+
+    python -m benchmarks.bench_writes [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark')
+
+from api import create_app
+from api.config.config import TestConfig
+from api.models.courses import Course
+from api.utils import db
+from api.utils.unit_of_work import unit_of_work
+
+
+def make_config(uri):
+    class BenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = uri
+        SQLALCHEMY_ECHO = False
+    return BenchConfig
+
+
+def insert_rows(rows, prefix):
+    for number in range(rows):
+        Course(name=f"{prefix} Course {number}", teacher=f"{prefix} Teacher {number}").save()
+
+
+def run(label, uri, rows):
+    app = create_app(config=make_config(uri))
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        start = time.perf_counter()
+        insert_rows(rows, 'Single')
+        per_row = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with unit_of_work():
+            insert_rows(rows, 'Batched')
+        batched = time.perf_counter() - start
+
+        db.drop_all()
+        db.session.remove()
+        db.engine.dispose()
+
+    print(f"{label}: {rows} rows")
+    print(f"  commit per save : {per_row:8.3f}s  {rows / per_row:10.0f} rows/s")
+    print(f"  unit of work    : {batched:8.3f}s  {rows / batched:10.0f} rows/s")
+    print(f"  speedup         : {per_row / batched:8.1f}x")
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    with tempfile.TemporaryDirectory() as directory:
+        run('SQLite', 'sqlite:///' + os.path.join(directory, 'bench.sqlite3'), rows)
+
+    postgres_url = os.environ.get('BENCH_POSTGRES_URL')
+    if postgres_url:
+        run('PostgreSQL', postgres_url, rows)
+    else:
+        print("PostgreSQL: skipped, set BENCH_POSTGRES_URL to include it")
@@ -0,0 +1,320 @@
+"""
+Mixed-workload load test against a real WSGI server.
+
+Seeds a database with flask seed, serves create_app() from a threaded
+werkzeug server inside this process and drives it with a pool of client
+threads. Each client keeps one HTTP/1.1 connection and picks operations
+from the request mix: student logins, portal reads (the student summary),
+grade uploads and enrollments. Clients start evenly across the ramp-up
+period and run until the duration is up.
+
+Reports requests per second, latency percentiles and error rates per
+operation, plus how many server errors were lock waits ("database is
+locked" on SQLite, lock timeouts and deadlocks on PostgreSQL). Runs
+against a temporary SQLite file unless --database is given.
+
+    python -m benchmarks.load_harness [--clients 16] [--duration 30] [--ramp-up 5]
+        [--mix login=1,portal=6,grade=2,enroll=1] [--database postgresql://...] [--json]
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark')
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import select
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from api import create_app
+from api.config.config import TestConfig
+from api.utils import db
+
+OPERATIONS = ('login', 'portal', 'grade', 'enroll')
+
+LOCK_MESSAGES = ('database is locked', 'database table is locked', 'deadlock detected', 'lock timeout', 'could not obtain lock')
+
+
+def make_config(uri):
+    class LoadConfig(TestConfig):
+        TESTING = False
+        SQLALCHEMY_DATABASE_URI = uri
+        SQLALCHEMY_ECHO = False
+        JOBS_EAGER = False
+        # Every client logs in from 127.0.0.1, so the login limits would throttle the run
+        RATE_LIMITS = {
+            'login_ip': (10 ** 9, 1),
+            'login_account': (10 ** 9, 1)
+        }
+    return LoadConfig
+
+
+def parse_mix(text:str) -> dict:
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name not in OPERATIONS:
+            raise SystemExit(f"Unknown operation {name!r}, expected one of {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(values:list, fraction:float) -> float:
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(fraction * len(values)) - 1))
+    return values[index]
+
+
+class _KeepAliveHandler(WSGIRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+# Server-side exceptions, so lock waits can be told apart from other 500s.
+# Flask logs every unhandled exception on app.logger with its exc_info.
+class ErrorLog(logging.Handler):
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.errors = Counter()
+
+    def emit(self, record):
+        if not record.exc_info or record.exc_info[1] is None:
+            return
+        exception = record.exc_info[1]
+        message = str(exception).lower()
+        kind = 'lock_wait' if any(text in message for text in LOCK_MESSAGES) else type(exception).__name__
+        # logging.Handler.handle() holds self.lock around emit()
+        self.errors[kind] += 1
+
+
+class Results:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.failures = Counter()
+
+    def record(self, operation:str, seconds:float, status):
+        with self.lock:
+            self.latencies[operation].append(seconds)
+            self.statuses[operation][status] += 1
+            if status == 'connection_error' or status >= 500:
+                self.failures[operation] += 1
+
+
+# Seed the database and collect what the clients need to build requests
+def prepare(app, students:int, courses:int, seed:int) -> dict:
+    with app.app_context():
+        db.create_all()
+
+        result = app.test_cli_runner().invoke(args=[
+            'seed', '--admins', '1', '--students', str(students), '--courses', str(courses), '--seed', str(seed)
+        ])
+        if result.exit_code != 0:
+            raise SystemExit(result.output)
+
+        tables = db.metadata.tables
+        admin_id = db.session.execute(select(tables['admin'].c.id)).scalars().first()
+        emails = db.session.execute(
+            select(tables['users'].c.email).where(tables['users'].c.user_type == 'student')
+        ).scalars().all()
+        student_ids = db.session.execute(select(tables['students'].c.id)).scalars().all()
+        course_ids = db.session.execute(select(tables['courses'].c.id)).scalars().all()
+        enrollments = db.session.execute(
+            select(tables['student_course'].c.student_id, tables['student_course'].c.course_id)
+        ).all()
+
+        return {
+            'token': create_access_token(identity=admin_id),
+            'emails': emails,
+            'student_ids': student_ids,
+            'course_ids': course_ids,
+            'enrollments': [tuple(row) for row in enrollments]
+        }
+
+
+class Client:
+
+    def __init__(self, port:int, data:dict, rng:random.Random):
+        self.port = port
+        self.data = data
+        self.rng = rng
+        self.connection = None
+        self.headers = {'Authorization': f"Bearer {data['token']}", 'Content-Type': 'application/json'}
+
+    def request(self, method:str, path:str, body=None, headers=None):
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+        try:
+            self.connection.request(
+                method, path, body=json.dumps(body) if body is not None else None, headers=headers or self.headers
+            )
+            response = self.connection.getresponse()
+            response.read()
+            if response.getheader('Connection', '').lower() == 'close':
+                self.close()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            self.close()
+            return 'connection_error'
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def login(self):
+        body = {'email': self.rng.choice(self.data['emails']), 'password': 'password'}
+        return self.request('POST', '/auth/login', body, headers={'Content-Type': 'application/json'})
+
+    def portal(self):
+        return self.request('GET', f"/students/{self.rng.choice(self.data['student_ids'])}/summary")
+
+    def grade(self):
+        student_id, course_id = self.rng.choice(self.data['enrollments'])
+        body = {'percent_grade': round(self.rng.uniform(30, 100), 1)}
+        return self.request('PUT', f"/students/{student_id}/grades/{course_id}", body)
+
+    def enroll(self):
+        course_id = self.rng.choice(self.data['course_ids'])
+        return self.request('POST', f"/courses/{course_id}/students/{self.rng.choice(self.data['student_ids'])}")
+
+
+def run_client(number:int, port:int, data:dict, mix:dict, start_at:float, stop_at:float, seed:int, results:Results):
+    client = Client(port, data, random.Random(seed + number))
+    names, weights = list(mix), list(mix.values())
+
+    time.sleep(max(0.0, start_at - time.monotonic()))
+    while time.monotonic() < stop_at:
+        operation = client.rng.choices(names, weights=weights)[0]
+        started = time.perf_counter()
+        status = getattr(client, operation)()
+        results.record(operation, time.perf_counter() - started, status)
+
+    client.close()
+
+
+def report(results:Results, errors:ErrorLog, elapsed:float) -> dict:
+    summary = {'elapsed_s': round(elapsed, 2), 'operations': {}, 'server_errors': dict(errors.errors)}
+    all_latencies, total_failures = [], 0
+
+    for operation in OPERATIONS:
+        latencies = sorted(results.latencies.get(operation, []))
+        if not latencies:
+            continue
+        all_latencies.extend(latencies)
+        total_failures += results.failures[operation]
+        summary['operations'][operation] = {
+            'requests': len(latencies),
+            'rps': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 1),
+            'p90_ms': round(percentile(latencies, 0.90) * 1000, 1),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+            'max_ms': round(latencies[-1] * 1000, 1),
+            'error_rate': round(results.failures[operation] / len(latencies), 4),
+            'statuses': {str(status): count for status, count in sorted(results.statuses[operation].items(), key=str)}
+        }
+
+    all_latencies.sort()
+    summary['total'] = {
+        'requests': len(all_latencies),
+        'rps': round(len(all_latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(all_latencies, 0.50) * 1000, 1),
+        'p90_ms': round(percentile(all_latencies, 0.90) * 1000, 1),
+        'p99_ms': round(percentile(all_latencies, 0.99) * 1000, 1),
+        'mean_ms': round(statistics.fmean(all_latencies) * 1000, 1) if all_latencies else 0.0,
+        'error_rate': round(total_failures / len(all_latencies), 4) if all_latencies else 0.0,
+        'lock_waits': errors.errors.get('lock_wait', 0)
+    }
+    return summary
+
+
+def print_report(summary:dict):
+    print(f"{'operation':<10}{'requests':>10}{'rps':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errors':>9}")
+    for operation, stats in summary['operations'].items():
+        print(
+            f"{operation:<10}{stats['requests']:>10}{stats['rps']:>9}{stats['p50_ms']:>9}{stats['p90_ms']:>9}"
+            f"{stats['p99_ms']:>9}{stats['max_ms']:>9}{stats['error_rate']:>9.2%}"
+        )
+    total = summary['total']
+    print(
+        f"{'total':<10}{total['requests']:>10}{total['rps']:>9}{total['p50_ms']:>9}{total['p90_ms']:>9}"
+        f"{total['p99_ms']:>9}{'':>9}{total['error_rate']:>9.2%}"
+    )
+    print(f"lock waits: {total['lock_waits']}")
+    for kind, count in summary['server_errors'].items():
+        if kind != 'lock_wait':
+            print(f"server error {kind}: {count}")
+    for operation, stats in summary['operations'].items():
+        print(f"{operation} statuses: {', '.join(f'{status}={count}' for status, count in stats['statuses'].items())}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=30, help="Seconds to run after the first client starts")
+    parser.add_argument('--ramp-up', type=float, default=5, help="Seconds over which clients start")
+    parser.add_argument('--mix', default='login=1,portal=6,grade=2,enroll=1')
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--courses', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', help="Database URL, a temporary SQLite file by default")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+
+    with tempfile.TemporaryDirectory() as directory:
+        uri = args.database or 'sqlite:///' + os.path.join(directory, 'load.sqlite3')
+        app = create_app(config=make_config(uri))
+        data = prepare(app, args.students, args.courses, args.seed)
+
+        errors = ErrorLog()
+        app.logger.addHandler(errors)
+
+        server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=_KeepAliveHandler)
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+
+        results = Results()
+        started = time.monotonic()
+        stop_at = started + args.duration
+        try:
+            with ThreadPoolExecutor(max_workers=args.clients) as executor:
+                for number in range(args.clients):
+                    start_at = started + args.ramp_up * number / args.clients
+                    executor.submit(
+                        run_client, number, server.server_port, data, mix, start_at, stop_at, args.seed, results
+                    )
+        finally:
+            elapsed = time.monotonic() - started
+            server.shutdown()
+            server_thread.join()
+            with app.app_context():
+                db.session.remove()
+                db.engine.dispose()
+
+    summary = report(results, errors, elapsed)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
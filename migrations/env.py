@@ -4,6 +4,7 @@ from logging.config import fileConfig
 from flask import current_app
 
 from alembic import context
+import sqlalchemy as sa
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -16,6 +17,10 @@ logger = logging.getLogger('alembic.env')
 
 
 def get_engine():
+    # flask db upgrade -x tenant=NAME migrates that tenant's database
+    tenant = context.get_x_argument(as_dictionary=True).get('tenant')
+    if tenant:
+        return current_app.extensions['tenants'].engine(tenant)
     try:
         # this works with Flask-SQLAlchemy<3 and Alchemical
         return current_app.extensions['migrate'].db.get_engine()
@@ -51,6 +56,22 @@ def get_metadata():
     return target_db.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # The SQLite FTS5 student search tables and the PostgreSQL-only
+    # lower(col) prefix indexes are managed by hand-written migrations
+    if type_ == 'table' and name.startswith('student_search'):
+        return False
+    if type_ == 'index' and name.endswith('_lower'):
+        return False
+    # Expression indexes such as the grades coalesce(term_id, 0) key cannot
+    # be reflected, so autogenerate would keep proposing to add them again
+    if type_ == 'index' and not reflected and any(
+        not isinstance(expression, sa.Column) for expression in object.expressions
+    ):
+        return False
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +86,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -93,16 +115,28 @@ def run_migrations_online():
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        # SQLite batch migrations drop and recreate tables, which must not
+        # trigger ON DELETE CASCADE, so foreign keys are off while migrating
+        sqlite = connection.dialect.name == 'sqlite'
+        if sqlite:
+            connection.exec_driver_sql('PRAGMA foreign_keys=OFF')
+            connection.commit()
+
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
             process_revision_directives=process_revision_directives,
+            include_object=include_object,
             **current_app.extensions['migrate'].configure_args
         )
 
         with context.begin_transaction():
             context.run_migrations()
 
+        if sqlite:
+            connection.exec_driver_sql('PRAGMA foreign_keys=ON')
+            connection.commit()
+
 
 if context.is_offline_mode():
     run_migrations_offline()
@@ -0,0 +1,93 @@
+"""Add student search indexes
+
+Revision ID: 130749a397ec
+Revises: b4551c828b56
+Create Date: 2026-10-19 09:12:41.503118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '130749a397ec'
+down_revision = 'b4551c828b56'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_UPGRADE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS student_search USING fts5(
+        first_name, last_name, email, matric_no, prefix='2 3 4'
+    )
+    """,
+    """
+    INSERT INTO student_search(rowid, first_name, last_name, email, matric_no)
+    SELECT users.id, users.first_name, users.last_name, users.email, students.matric_no
+    FROM users JOIN students ON students.id = users.id
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS student_search_insert AFTER INSERT ON students BEGIN
+        INSERT INTO student_search(rowid, first_name, last_name, email, matric_no)
+        SELECT users.id, users.first_name, users.last_name, users.email, NEW.matric_no
+        FROM users WHERE users.id = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS student_search_update_student AFTER UPDATE OF matric_no ON students BEGIN
+        UPDATE student_search SET matric_no = NEW.matric_no WHERE rowid = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS student_search_update_user AFTER UPDATE OF first_name, last_name, email ON users BEGIN
+        UPDATE student_search
+        SET first_name = NEW.first_name, last_name = NEW.last_name, email = NEW.email
+        WHERE rowid = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS student_search_delete AFTER DELETE ON students BEGIN
+        DELETE FROM student_search WHERE rowid = OLD.id;
+    END
+    """
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS student_search_delete",
+    "DROP TRIGGER IF EXISTS student_search_update_user",
+    "DROP TRIGGER IF EXISTS student_search_update_student",
+    "DROP TRIGGER IF EXISTS student_search_insert",
+    "DROP TABLE IF EXISTS student_search"
+]
+
+POSTGRES_INDEXES = [
+    ('ix_users_first_name_lower', 'users', 'first_name'),
+    ('ix_users_last_name_lower', 'users', 'last_name'),
+    ('ix_users_email_lower', 'users', 'email'),
+    ('ix_students_matric_no_lower', 'students', 'matric_no')
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+
+    elif dialect == 'postgresql':
+        for name, table, column in POSTGRES_INDEXES:
+            op.execute(f"CREATE INDEX {name} ON {table} (lower({column}) text_pattern_ops)")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
+
+    elif dialect == 'postgresql':
+        for name, table, column in POSTGRES_INDEXES:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,116 @@
+"""Cascade student and course deletes
+
+Revision ID: 5d2f8a9c1e47
+Revises: 349c7efd260a
+Create Date: 2026-10-19 14:41:52.118307
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2f8a9c1e47'
+down_revision = '349c7efd260a'
+branch_labels = None
+depends_on = None
+
+
+# (table, column, referred table) for every foreign key that gains ON DELETE CASCADE
+FOREIGN_KEYS = [
+    ('students', 'id', 'users'),
+    ('student_course', 'student_id', 'students'),
+    ('student_course', 'course_id', 'courses'),
+    ('grades', 'student_id', 'students'),
+    ('grades', 'course_id', 'courses')
+]
+
+# The original foreign keys are unnamed; SQLite batch mode names them with this
+# convention when it reflects the table, PostgreSQL named them <table>_<column>_fkey
+SQLITE_NAMING_CONVENTION = {
+    'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'
+}
+
+# Rebuilding the students table in SQLite drops its triggers, so the
+# student search triggers are created again afterwards
+SQLITE_STUDENT_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS student_search_insert AFTER INSERT ON students BEGIN
+        INSERT INTO student_search(rowid, first_name, last_name, email, matric_no)
+        SELECT users.id, users.first_name, users.last_name, users.email, NEW.matric_no
+        FROM users WHERE users.id = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS student_search_update_student AFTER UPDATE OF matric_no ON students BEGIN
+        UPDATE student_search SET matric_no = NEW.matric_no WHERE rowid = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS student_search_delete AFTER DELETE ON students BEGIN
+        DELETE FROM student_search WHERE rowid = OLD.id;
+    END
+    """
+]
+
+
+def _replace_foreign_keys(ondelete):
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        tables = []
+        for table, column, referred in FOREIGN_KEYS:
+            if table not in tables:
+                tables.append(table)
+
+        for table in tables:
+            with op.batch_alter_table(table, naming_convention=SQLITE_NAMING_CONVENTION) as batch_op:
+                for fk_table, column, referred in FOREIGN_KEYS:
+                    if fk_table != table:
+                        continue
+                    name = f'fk_{table}_{column}_{referred}'
+                    batch_op.drop_constraint(name, type_='foreignkey')
+                    batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+
+        for statement in SQLITE_STUDENT_TRIGGERS:
+            op.execute(statement)
+
+    else:
+        for table, column, referred in FOREIGN_KEYS:
+            name = f'{table}_{column}_fkey'
+            op.drop_constraint(name, table, type_='foreignkey')
+            op.create_foreign_key(name, table, referred, [column], ['id'], ondelete=ondelete)
+
+
+# SQLite did not enforce the foreign keys before, so rows may already point
+# at deleted students or courses. They are removed first, as the cascades
+# would have, recording removed grades in the audit trail.
+def _delete_orphans():
+    orphan_students = "SELECT id FROM students WHERE id NOT IN (SELECT id FROM users)"
+    orphan_grades = (
+        "SELECT id FROM grades WHERE (student_id IS NOT NULL AND student_id NOT IN (SELECT id FROM students)) "
+        "OR (course_id IS NOT NULL AND course_id NOT IN (SELECT id FROM courses)) "
+        f"OR student_id IN ({orphan_students})"
+    )
+    op.execute(
+        "INSERT INTO grade_audit (grade_id, student_id, course_id, action, old_percent_grade, "
+        "old_letter_grade, created_at) "
+        "SELECT id, student_id, course_id, 'delete', percent_grade, letter_grade, CURRENT_TIMESTAMP FROM grades "
+        f"WHERE id IN ({orphan_grades})"
+    )
+    op.execute(f"DELETE FROM grades WHERE id IN ({orphan_grades})")
+    op.execute(
+        "DELETE FROM student_course WHERE (student_id IS NOT NULL AND student_id NOT IN (SELECT id FROM students)) "
+        "OR (course_id IS NOT NULL AND course_id NOT IN (SELECT id FROM courses)) "
+        f"OR student_id IN ({orphan_students})"
+    )
+    op.execute(f"DELETE FROM students WHERE id IN ({orphan_students})")
+
+
+def upgrade():
+    _delete_orphans()
+    _replace_foreign_keys('CASCADE')
+
+
+def downgrade():
+    _replace_foreign_keys(None)
@@ -0,0 +1,103 @@
+"""Never reuse user, grade and enrollment ids
+
+Revision ID: 6b0a66b019b2
+Revises: a66dee35e1d4
+Create Date: 2026-10-19 15:31:07.552905
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b0a66b019b2'
+down_revision = 'a66dee35e1d4'
+branch_labels = None
+depends_on = None
+
+
+# SQLite hands out max(id) + 1, so archiving the newest students, grades or
+# enrollments freed their IDs for new rows, which then collided with the
+# archive and the audit trail. AUTOINCREMENT tables never reuse an ID.
+# PostgreSQL sequences never did, so this revision only changes SQLite.
+# (table, tables holding IDs that came from it)
+TABLES = [
+    ('users', ['archived_students']),
+    ('grades', ['archived_grades']),
+    ('student_course', ['archived_student_course'])
+]
+
+# The student search triggers refer to users, which SQLite will not let a
+# rebuild drop, so they are dropped first and created again afterwards.
+# Batch mode cannot reflect expression indexes, so the grades key is too.
+SQLITE_SEARCH_TRIGGERS = {
+    'student_search_insert': """
+    CREATE TRIGGER IF NOT EXISTS student_search_insert AFTER INSERT ON students BEGIN
+        INSERT INTO student_search(rowid, first_name, last_name, email, matric_no)
+        SELECT users.id, users.first_name, users.last_name, users.email, NEW.matric_no
+        FROM users WHERE users.id = NEW.id;
+    END
+    """,
+    'student_search_update_student': """
+    CREATE TRIGGER IF NOT EXISTS student_search_update_student AFTER UPDATE OF matric_no ON students BEGIN
+        UPDATE student_search SET matric_no = NEW.matric_no WHERE rowid = NEW.id;
+    END
+    """,
+    'student_search_update_user': """
+    CREATE TRIGGER IF NOT EXISTS student_search_update_user AFTER UPDATE OF first_name, last_name, email ON users BEGIN
+        UPDATE student_search
+        SET first_name = NEW.first_name, last_name = NEW.last_name, email = NEW.email
+        WHERE rowid = NEW.id;
+    END
+    """,
+    'student_search_delete': """
+    CREATE TRIGGER IF NOT EXISTS student_search_delete AFTER DELETE ON students BEGIN
+        DELETE FROM student_search WHERE rowid = OLD.id;
+    END
+    """
+}
+
+
+def _rebuild(autoincrement):
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for name in SQLITE_SEARCH_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_index('uq_grades_student_id_course_id_term_id', table_name='grades')
+
+    for table, _ in TABLES:
+        with op.batch_alter_table(table, recreate='always', table_kwargs={'sqlite_autoincrement': autoincrement}):
+            pass
+
+    op.create_index(
+        'uq_grades_student_id_course_id_term_id', 'grades',
+        ['student_id', 'course_id', sa.text('coalesce(term_id, 0)')], unique=True
+    )
+
+    # The FTS5 search table only exists where SQLite was built with it
+    if sa.inspect(op.get_bind()).has_table('student_search'):
+        for statement in SQLITE_SEARCH_TRIGGERS.values():
+            op.execute(statement)
+
+    if not autoincrement:
+        return
+
+    # Start each sequence past every ID already handed out, archived or in the audit trail
+    for table, archives in TABLES:
+        sources = [f"SELECT MAX(id) AS id FROM {table}"] + [f"SELECT MAX(id) FROM {archive}" for archive in archives]
+        if table == 'grades':
+            sources.append("SELECT MAX(grade_id) FROM grade_audit")
+        op.execute(f"DELETE FROM sqlite_sequence WHERE name = '{table}'")
+        op.execute(
+            f"INSERT INTO sqlite_sequence (name, seq) "
+            f"SELECT '{table}', COALESCE(MAX(id), 0) FROM ({' UNION ALL '.join(sources)})"
+        )
+
+
+def upgrade():
+    _rebuild(True)
+
+
+def downgrade():
+    _rebuild(False)